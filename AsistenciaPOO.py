@@ -1,9 +1,13 @@
 import pandas as pd
 import numpy as np
 import os
-from datetime import datetime
-import win32com.client
-from typing import Tuple, Dict, Optional
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from typing import Tuple, Dict, Optional, List
+from lector_excel import leer_excel
+from rutero import CODIGOS_PROGRAMA, RuteroIndexado
+from escritor_excel import guardar_hojas
 
 
 class ConfiguracionAsistencia:
@@ -11,25 +15,18 @@ class ConfiguracionAsistencia:
     RUTA_BASE = r"C:\Users\lapmxdf558\Documents\JUAN\BONOS PY\ASISTENCIA"
     RUTA_SUP = r"C:\Users\lapmxdf558\Documents\JUAN\BONOS PY\ASISTENCIA\SUP"
     RUTA_PLANTILLA = r"C:\Users\lapmxdf558\Documents\JUAN\BONOS PY\ASISTENCIA\PLANTILLA ASISTENCIA.xlsm"
+    CARPETA_LOTE = "ASISTENCIA POR DIA"
     MACRO_NOMBRE = "ACONDICIONAR"
+    # False: los libros por supervisor se generan en Python (funciona sin Excel, también en Linux)
+    # True: se ejecuta la macro ACONDICIONAR de la plantilla con Excel (solo Windows)
+    USAR_MACRO = False
     HORAS_LABORALES = 8
     TIEMPO_TRASLADO = 1.5
     
     DIAS_VALIDOS = ["LUN", "MAR", "MIER", "JUE", "VIE", "SAB", "DOM"]
     SEMANAS_VALIDAS = range(1, 6)
     
-    MAPEO_COLUMNAS_RUTERO = {
-        "S1-LUNES": "LUN-S1", "S1-MARTES": "MAR-S1", "S1-MIERCOLES": "MIER-S1",
-        "S1-JUEVES": "JUE-S1", "S1-VIERNES": "VIE-S1", "S1-SABADO": "SAB-S1", "S1-DOMINGO": "DOM-S1",
-        "S2-LUNES": "LUN-S2", "S2-MARTES": "MAR-S2", "S2-MIERCOLES": "MIER-S2",
-        "S2-JUEVES": "JUE-S2", "S2-VIERNES": "VIE-S2", "S2-SABADO": "SAB-S2", "S2-DOMINGO": "DOM-S2",
-        "S3-LUNES": "LUN-S3", "S3-MARTES": "MAR-S3", "S3-MIERCOLES": "MIER-S3",
-        "S3-JUEVES": "JUE-S3", "S3-VIERNES": "VIE-S3", "S3-SABADO": "SAB-S3", "S3-DOMINGO": "DOM-S3",
-        "S4-LUNES": "LUN-S4", "S4-MARTES": "MAR-S4", "S4-MIERCOLES": "MIER-S4",
-        "S4-JUEVES": "JUE-S4", "S4-VIERNES": "VIE-S4", "S4-SABADO": "SAB-S4", "S4-DOMINGO": "DOM-S4",
-        "S5-LUNES": "LUN-S5", "S5-MARTES": "MAR-S5", "S5-MIERCOLES": "MIER-S5",
-        "S5-JUEVES": "JUE-S5", "S5-VIERNES": "VIE-S5", "S5-SABADO": "SAB-S5", "S5-DOMINGO": "DOM-S5"
-    }
+    MAPEO_COLUMNAS_RUTERO = CODIGOS_PROGRAMA
 
 
 class CargadorArchivos:
@@ -40,7 +37,7 @@ class CargadorArchivos:
     
     def cargar_efectividad(self) -> Optional[pd.DataFrame]:
         """Carga el archivo de Efectividad"""
-        return self._cargar_archivo('Efectividad', 'Efectividad')
+        return self._cargar_archivo('Efectividad', 'Efectividad', columnas=ProcesadorEfectividad.COLUMNAS)
     
     def cargar_personal(self) -> Optional[pd.DataFrame]:
         """Carga el archivo de Personal"""
@@ -52,13 +49,24 @@ class CargadorArchivos:
     
     def cargar_rutero(self) -> Optional[pd.DataFrame]:
         """Carga el archivo de Rutero"""
-        df = self._cargar_archivo('Rutero', 'RUTERO', skiprows=4)
+        columnas = (
+            ProcesadorRutero.COLUMNAS_FIJAS
+            + list(ConfiguracionAsistencia.MAPEO_COLUMNAS_RUTERO)
+            + ConstructorReporte.COLUMNAS_TIENDAS_RUTERO
+        )
+        df = self._cargar_archivo('Rutero', 'RUTERO', skiprows=4, columnas=columnas)
         if df is not None:
             df.columns = df.columns.str.strip()
         return df
     
-    def _cargar_archivo(self, keyword: str, sheet_name: str, skiprows: int = 0) -> Optional[pd.DataFrame]:
-        """Método genérico para cargar archivos Excel"""
+    def _cargar_archivo(
+        self, 
+        keyword: str, 
+        sheet_name: str, 
+        skiprows: int = 0, 
+        columnas: Optional[List[str]] = None
+    ) -> Optional[pd.DataFrame]:
+        """Método genérico para cargar archivos Excel (solo las columnas indicadas, si se dan)"""
         try:
             archivos = [f for f in os.listdir(self.ruta_base) if keyword in f]
             if not archivos:
@@ -66,7 +74,7 @@ class CargadorArchivos:
                 return None
             
             ruta_archivo = os.path.join(self.ruta_base, archivos[0])
-            df = pd.read_excel(ruta_archivo, sheet_name=sheet_name, skiprows=skiprows)
+            df = leer_excel(ruta_archivo, sheet_name=sheet_name, skiprows=skiprows, columnas=columnas)
             print(f"✓ Archivo cargado: {archivos[0]}")
             return df
         except Exception as e:
@@ -86,19 +94,20 @@ class CargadorArchivos:
 class ProcesadorEfectividad:
     """Procesa datos de efectividad y asistencia"""
     
+    COLUMNAS = [
+        "Fecha", "Usuario Coordinador", "Coordinador", "Usuario Supervisor", 
+        "Supervisor", "Usuario Promotor", "Personal Promotor", "Código Tienda", 
+        "Tienda", "Cadena", "Formato", "Canal de Distribución", "Check IN", 
+        "Check OUT", "Visitas Programadas", "Visitas Realizadas", "Tiempo en PDV"
+    ]
+    
     def __init__(self, config: ConfiguracionAsistencia):
         self.config = config
     
     def procesar_efectividad(self, df: pd.DataFrame) -> pd.DataFrame:
         """Procesa el dataframe de efectividad"""
         # Seleccionar columnas necesarias
-        columnas = [
-            "Fecha", "Usuario Coordinador", "Coordinador", "Usuario Supervisor", 
-            "Supervisor", "Usuario Promotor", "Personal Promotor", "Código Tienda", 
-            "Tienda", "Cadena", "Formato", "Canal de Distribución", "Check IN", 
-            "Check OUT", "Visitas Programadas", "Visitas Realizadas", "Tiempo en PDV"
-        ]
-        df = df[columnas].copy()
+        df = df[self.COLUMNAS].copy()
         
         # Procesar horas
         df = self._procesar_tiempo_pdv(df)
@@ -132,65 +141,58 @@ class ProcesadorEfectividad:
         
         return df
     
-    def calcular_horas_extremas(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Calcula horas máximas y mínimas por promotor"""
-        df_max = pd.pivot_table(
-            df, 
-            index="Usuario Promotor", 
-            values="Check OUT HORAS", 
-            aggfunc=self._horas_maximas
-        ).reset_index()
+    def _agrupar_por_promotor(self, df: pd.DataFrame, columnas: List[str]) -> pd.DataFrame:
+        """
+        Agrega por promotor en un solo groupby vectorizado
+        
+        Las horas de check en 0 (sin registro) se excluyen antes de tomar
+        máximo/mínimo; si un promotor no tiene ninguna hora válida queda en 0
+        
+        Args:
+            df: DataFrame de efectividad procesado
+            columnas: Columnas a agregar, en el orden de salida
+        
+        Returns:
+            DataFrame con 'Usuario Promotor' y una columna por agregado
+        """
+        agregaciones = {
+            "Check OUT HORAS": "max",
+            "Check IN HORAS": "min",
+            "PDV HNum": "sum",
+            "Visitas Realizadas": "sum"
+        }
         
-        df_min = pd.pivot_table(
-            df, 
-            index="Usuario Promotor", 
-            values="Check IN HORAS", 
-            aggfunc=self._horas_minimas
-        ).reset_index()
+        datos = df[["Usuario Promotor"] + columnas].copy()
+        for col in ("Check OUT HORAS", "Check IN HORAS"):
+            if col in columnas:
+                datos[col] = datos[col].where(datos[col] > 0)
         
-        df_checks = pd.merge(df_max, df_min, on="Usuario Promotor", how="inner")
-        df_checks["DIF"] = df_checks["Check OUT HORAS"] - df_checks["Check IN HORAS"]
+        df_agrupado = (
+            datos.groupby("Usuario Promotor", sort=True)
+            .agg({col: agregaciones[col] for col in columnas})
+        )
+        for col in ("Check OUT HORAS", "Check IN HORAS"):
+            if col in columnas:
+                df_agrupado[col] = df_agrupado[col].fillna(0)
         
-        return df_checks
-    
-    @staticmethod
-    def _horas_maximas(valores):
-        """Calcula hora máxima válida"""
-        horas_validas = [h for h in valores if h > 0]
-        return max(horas_validas) if horas_validas else 0
-    
-    @staticmethod
-    def _horas_minimas(valores):
-        """Calcula hora mínima válida"""
-        horas_validas = [h for h in valores if h > 0]
-        return min(horas_validas) if horas_validas else 0
+        return df_agrupado.reset_index()
     
     def consolidar_asistencia(self, df_efectividad: pd.DataFrame) -> pd.DataFrame:
         """Consolida información de asistencia"""
-        df_checks = self.calcular_horas_extremas(df_efectividad)
-        
-        # Horas en PDV por usuario
-        df_tpdv = pd.pivot_table(
-            df_efectividad, 
-            index="Usuario Promotor", 
-            values="PDV HNum", 
-            aggfunc="sum"
-        ).reset_index()
-        
-        df_hrs = pd.merge(df_checks, df_tpdv, on="Usuario Promotor", how="inner")
+        # Horas extremas, horas en PDV y visitas realizadas en una sola agregación
+        df_consolidado = self._agrupar_por_promotor(
+            df_efectividad,
+            ["Check OUT HORAS", "Check IN HORAS", "PDV HNum", "Visitas Realizadas"]
+        )
+        df_consolidado.insert(
+            3, "DIF", df_consolidado["Check OUT HORAS"] - df_consolidado["Check IN HORAS"]
+        )
         
-        # Clasificar asistencia
-        df_hrs = self._clasificar_asistencia(df_hrs)
+        # Clasificar asistencia (la columna va antes de las visitas, como en el reporte)
+        visitas = df_consolidado.pop("Visitas Realizadas")
+        df_consolidado = self._clasificar_asistencia(df_consolidado)
+        df_consolidado["Visitas Realizadas"] = visitas
         
-        # Visitas realizadas
-        df_realizadas = pd.pivot_table(
-            df_efectividad, 
-            index="Usuario Promotor", 
-            values="Visitas Realizadas", 
-            aggfunc="sum"
-        ).reset_index()
-        
-        df_consolidado = pd.merge(df_hrs, df_realizadas, on="Usuario Promotor", how="inner")
         df_consolidado = self._clasificar_cumplimiento(df_consolidado)
         
         return df_consolidado
@@ -233,45 +235,37 @@ class ProcesadorEfectividad:
 class ProcesadorRutero:
     """Procesa datos del rutero"""
     
+    COLUMNAS_FIJAS = ["ID_TIENDA", "Nombre de Tienda", "Usuario Virtual", "Usuario APP Promotor"]
+    
     def __init__(self, config: ConfiguracionAsistencia):
         self.config = config
     
-    def procesar_rutero(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Procesa el dataframe de rutero"""
-        df = df.rename(columns=self.config.MAPEO_COLUMNAS_RUTERO)
-        
-        columnas_fijas = ["ID_TIENDA", "Nombre de Tienda", "Usuario Virtual", "Usuario APP Promotor"]
-        columnas_rango = df.loc[:, "LUN-S1":"DOM-S5"].columns.tolist()
-        columnas_todas = columnas_fijas + columnas_rango
-        
-        df_filtrado = df[columnas_todas]
-        df_filtrado = pd.melt(
-            df_filtrado, 
-            columnas_fijas, 
-            value_name="Visitas Programadas", 
-            var_name="DIA-SEMANA"
-        )
-        
-        return df_filtrado
+    def procesar_rutero(self, df: pd.DataFrame) -> RuteroIndexado:
+        """Despivotea el programa del rutero una sola vez y lo indexa por promotor, semana y día"""
+        return RuteroIndexado(df, columna_promotor="Usuario APP Promotor")
     
-    def obtener_visitas_programadas(self, df_rutero: pd.DataFrame, dia: str, semana: int) -> pd.DataFrame:
+    def obtener_visitas_programadas(self, rutero: RuteroIndexado, dia: str, semana: int) -> pd.DataFrame:
         """Obtiene visitas programadas para un día y semana específicos"""
         codigo = f"{dia}-S{semana}"
-        df_programadas = df_rutero[df_rutero["DIA-SEMANA"] == codigo]
-        df_programadas = pd.pivot_table(
-            df_programadas, 
-            index="Usuario APP Promotor", 
-            values="Visitas Programadas", 
-            aggfunc="sum"
-        ).reset_index()
+        df_programadas = rutero.visitas_programadas(codigo)
         df_programadas = df_programadas.rename(columns={"Usuario APP Promotor": "Usuario Promotor"})
         
         return df_programadas
+    
+    def obtener_todas_visitas_programadas(self, rutero: RuteroIndexado) -> Dict[str, pd.DataFrame]:
+        """Visitas programadas de los 35 códigos DIA-SEMANA, tomadas del mismo agrupado del rutero"""
+        return {
+            f"{dia}-S{semana}": self.obtener_visitas_programadas(rutero, dia, semana)
+            for semana in self.config.SEMANAS_VALIDAS
+            for dia in self.config.DIAS_VALIDOS
+        }
 
 
 class ConstructorReporte:
     """Construye el reporte final de asistencia"""
     
+    COLUMNAS_TIENDAS_RUTERO = ["Codigo RO", "Nombre de Tienda", "Clasificacion"]
+    
     def __init__(self, config: ConfiguracionAsistencia):
         self.config = config
     
@@ -395,7 +389,7 @@ class ConstructorReporte:
     
     def construir_reporte_tiendas(self, df_efectividad: pd.DataFrame, df_rutero: pd.DataFrame) -> pd.DataFrame:
         """Construye el reporte por tiendas"""
-        df_tiendas_r = df_rutero[["Codigo RO", "Nombre de Tienda", "Clasificacion"]]
+        df_tiendas_r = df_rutero[self.COLUMNAS_TIENDAS_RUTERO]
         df_tiendas = pd.merge(
             df_efectividad, 
             df_tiendas_r, 
@@ -420,16 +414,23 @@ class GestorArchivos:
     """Gestiona la creación y manipulación de archivos"""
     
     @staticmethod
-    def guardar_excel(ruta: str, nombre: str, dataframes: Dict[str, pd.DataFrame]):
-        """Guarda múltiples dataframes en un archivo Excel"""
+    def guardar_excel(ruta: str, nombre: str, dataframes: Dict[str, pd.DataFrame]) -> bool:
+        """
+        Guarda múltiples dataframes en un archivo Excel
+        
+        Returns:
+            True si el archivo se escribió, False si hubo un error (ya reportado)
+        """
         ruta_completa = os.path.join(ruta, nombre)
         try:
             with pd.ExcelWriter(ruta_completa, engine='openpyxl') as writer:
                 for sheet_name, df in dataframes.items():
                     df.to_excel(writer, sheet_name=sheet_name, index=False)
             print(f"✓ Archivo creado: {nombre}")
+            return True
         except Exception as e:
             print(f"❌ Error al guardar Excel: {e}")
+            return False
     
     @staticmethod
     def limpiar_carpeta(ruta: str):
@@ -444,13 +445,108 @@ class GestorArchivos:
             print(f"❌ Error al limpiar carpeta: {e}")
 
 
+def _escribir_libro_supervisor(ruta: str, hojas: Dict[str, pd.DataFrame]) -> str:
+    """Envoltura a nivel de módulo para escribir el libro de un supervisor en otro proceso"""
+    guardar_hojas(ruta, hojas)
+    return ruta
+
+
+class DivisorSupervisores:
+    """Genera un libro por supervisor a partir del reporte principal (reemplaza la macro ACONDICIONAR)"""
+    
+    COLUMNA_SUPERVISOR = "Supervisor Asignado OK"
+    SIN_SUPERVISOR = "SIN SUPERVISOR"
+    
+    def __init__(self, ruta_salida: str, max_workers: Optional[int] = None):
+        """
+        Inicializa el divisor
+        
+        Args:
+            ruta_salida: Carpeta donde se escriben los libros (normalmente RUTA_SUP)
+            max_workers: Procesos para escribir los libros. None usa el número de CPUs
+        """
+        self.ruta_salida = ruta_salida
+        self.max_workers = max_workers
+    
+    @classmethod
+    def nombre_archivo(cls, supervisor) -> str:
+        """Nombre de archivo válido para un supervisor"""
+        if pd.isna(supervisor) or str(supervisor).strip() == "":
+            return cls.SIN_SUPERVISOR
+        return re.sub(r'[<>:"/\\|?*]+', "_", str(supervisor)).strip(" .") or cls.SIN_SUPERVISOR
+    
+    def dividir(
+        self, 
+        df_reporte: pd.DataFrame, 
+        df_supervisores: Optional[pd.DataFrame] = None
+    ) -> Dict[str, str]:
+        """
+        Escribe en paralelo un libro por supervisor
+        
+        Args:
+            df_reporte: Salida de construir_reporte_principal
+            df_supervisores: Salida de construir_reporte_supervisores (opcional); si se da,
+                             cada libro incluye también la fila de su supervisor
+        
+        Returns:
+            Diccionario nombre de archivo -> ruta de los libros escritos
+        """
+        os.makedirs(self.ruta_salida, exist_ok=True)
+        
+        # Agrupar una sola vez y armar las hojas de cada supervisor
+        libros = {}
+        for supervisor, df_grupo in df_reporte.groupby(self.COLUMNA_SUPERVISOR, dropna=False, sort=True):
+            nombre = self.nombre_archivo(supervisor)
+            base = nombre
+            copia = 2
+            while nombre in libros:
+                nombre = f"{base} ({copia})"
+                copia += 1
+            
+            hojas = {'ASISTENCIA': df_grupo}
+            if df_supervisores is not None:
+                filtro = (
+                    df_supervisores[self.COLUMNA_SUPERVISOR].isna() if pd.isna(supervisor)
+                    else df_supervisores[self.COLUMNA_SUPERVISOR] == supervisor
+                )
+                hojas['SUPERVISORES'] = df_supervisores[filtro]
+            libros[nombre] = hojas
+        
+        print(f"▶ Generando {len(libros)} libros de supervisor...")
+        escritos = {}
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futuros = {
+                executor.submit(
+                    _escribir_libro_supervisor,
+                    os.path.join(self.ruta_salida, f"{nombre}.xlsx"),
+                    hojas
+                ): nombre
+                for nombre, hojas in libros.items()
+            }
+            for futuro in as_completed(futuros):
+                nombre = futuros[futuro]
+                try:
+                    escritos[nombre] = futuro.result()
+                except Exception as e:
+                    print(f"❌ Error al escribir el libro de {nombre}: {e}")
+        
+        print(f"✓ Libros de supervisor creados: {len(escritos)} de {len(libros)}")
+        return escritos
+
+
 class EjecutorMacro:
     """Ejecuta macros de Excel"""
     
     @staticmethod
     def ejecutar_macro(ruta_libro: str, nombre_macro: str):
-        """Ejecuta una macro específica en un libro de Excel"""
+        """Ejecuta una macro específica en un libro de Excel (requiere Windows con Excel y pywin32)"""
         print("▶ Ejecutando macro...")
+        try:
+            import win32com.client
+        except ImportError:
+            print("⚠️  win32com no está disponible; use DivisorSupervisores (USAR_MACRO = False)")
+            return
+        
         excel = None
         try:
             excel = win32com.client.Dispatch("Excel.Application")
@@ -471,6 +567,11 @@ class EjecutorMacro:
                     print("⚠️  Excel ya estaba cerrado")
 
 
+def _guardar_reporte_en_proceso(ruta: str, nombre: str, dataframes: Dict[str, pd.DataFrame]) -> bool:
+    """Envoltura a nivel de módulo para guardar un reporte en otro proceso (debe poder serializarse)"""
+    return GestorArchivos.guardar_excel(ruta, nombre, dataframes)
+
+
 class InterfazUsuario:
     """Maneja la interacción con el usuario"""
     
@@ -523,12 +624,13 @@ class SistemaAsistencia:
         self.gestor = GestorArchivos()
         self.interfaz = InterfazUsuario()
     
-    def ejecutar(self):
-        """Ejecuta el flujo completo del sistema"""
-        print("\n" + "="*60)
-        print("SISTEMA DE PROCESAMIENTO DE ASISTENCIA")
-        print("="*60 + "\n")
+    def _cargar_y_procesar(self) -> Optional[Tuple]:
+        """
+        Carga los tres archivos una sola vez y procesa efectividad y rutero
         
+        Returns:
+            (df_efectividad, df_asistencia, df_personal, rutero, df_rutero_raw) o None si falta un archivo
+        """
         # 1. Cargar archivos
         print("📁 Cargando archivos...")
         df_efectividad = self.cargador.cargar_efectividad()
@@ -537,7 +639,7 @@ class SistemaAsistencia:
         
         if df_efectividad is None or df_personal is None or df_rutero_raw is None:
             print("❌ Error: No se pudieron cargar todos los archivos necesarios")
-            return
+            return None
         
         # 2. Procesar efectividad
         print("\n⚙️  Procesando datos de efectividad...")
@@ -546,57 +648,166 @@ class SistemaAsistencia:
         
         # 3. Procesar rutero
         print("⚙️  Procesando rutero...")
-        df_rutero = self.proc_rutero.procesar_rutero(df_rutero_raw)
+        rutero = self.proc_rutero.procesar_rutero(df_rutero_raw)
+        
+        return df_efectividad, df_asistencia, df_personal, rutero, df_rutero_raw
+    
+    def _construir_reportes(
+        self,
+        df_asistencia: pd.DataFrame,
+        df_programadas: pd.DataFrame,
+        df_personal: pd.DataFrame,
+        df_reporte_tiendas: pd.DataFrame
+    ) -> Dict[str, pd.DataFrame]:
+        """Construye las hojas del reporte de un día/semana"""
+        df_reporte_principal = self.constructor.construir_reporte_principal(
+            df_asistencia, df_programadas, df_personal
+        )
+        df_reporte_supervisores = self.constructor.construir_reporte_supervisores(
+            df_reporte_principal, df_personal
+        )
+        
+        return {
+            'ASISTENCIA': df_reporte_principal,
+            'SUPERVISORES': df_reporte_supervisores,
+            'TIENDAS': df_reporte_tiendas
+        }
+    
+    def ejecutar(self):
+        """Ejecuta el flujo completo del sistema"""
+        print("\n" + "="*60)
+        print("SISTEMA DE PROCESAMIENTO DE ASISTENCIA")
+        print("="*60 + "\n")
+        
+        datos = self._cargar_y_procesar()
+        if datos is None:
+            return
+        df_efectividad, df_asistencia, df_personal, rutero, df_rutero_raw = datos
         
         # 4. Solicitar día y semana
         dia = self.interfaz.solicitar_dia()
         semana = self.interfaz.solicitar_semana()
         
-        df_programadas = self.proc_rutero.obtener_visitas_programadas(df_rutero, dia, semana)
+        df_programadas = self.proc_rutero.obtener_visitas_programadas(rutero, dia, semana)
         
         # 5. Construir reportes
         print("\n📊 Construyendo reportes...")
-        df_reporte_principal = self.constructor.construir_reporte_principal(
-            df_asistencia, df_programadas, df_personal
-        )
-        df_reporte_supervisores = self.constructor.construir_reporte_supervisores(
-            df_reporte_principal, df_personal
-        )
         df_reporte_tiendas = self.constructor.construir_reporte_tiendas(
             df_efectividad, df_rutero_raw
         )
+        dataframes = self._construir_reportes(
+            df_asistencia, df_programadas, df_personal, df_reporte_tiendas
+        )
         
         # 6. Guardar archivo Excel
         print("\n💾 Guardando archivo Excel...")
-        fecha_hoy = datetime.today().strftime("%d%m%Y")
         nombre_archivo = "ASISTENCIA.xlsx"
         
-        dataframes = {
-            'ASISTENCIA': df_reporte_principal,
-            'SUPERVISORES': df_reporte_supervisores,
-            'TIENDAS': df_reporte_tiendas
-        }
-        
         self.gestor.guardar_excel(self.config.RUTA_BASE, nombre_archivo, dataframes)
         
         # 7. Limpiar carpeta supervisores
         print("\n🧹 Limpiando carpeta SUP...")
         self.gestor.limpiar_carpeta(self.config.RUTA_SUP)
         
-        # 8. Ejecutar macro
-        print("\n📝 Ejecutando macro de Excel...")
-        EjecutorMacro.ejecutar_macro(self.config.RUTA_PLANTILLA, self.config.MACRO_NOMBRE)
+        # 8. Libros por supervisor
+        if self.config.USAR_MACRO:
+            print("\n📝 Ejecutando macro de Excel...")
+            EjecutorMacro.ejecutar_macro(self.config.RUTA_PLANTILLA, self.config.MACRO_NOMBRE)
+        else:
+            print("\n📝 Dividiendo reporte por supervisor...")
+            DivisorSupervisores(self.config.RUTA_SUP).dividir(
+                dataframes['ASISTENCIA'], dataframes['SUPERVISORES']
+            )
         
         print("\n" + "="*60)
         print("✅ PROCESO COMPLETADO EXITOSAMENTE")
         print("="*60 + "\n")
+    
+    def ejecutar_lote(self, max_workers: Optional[int] = None):
+        """
+        Genera sin preguntar el reporte de los 35 días/semanas para el cierre de mes
+        
+        Los tres archivos se leen una sola vez, las visitas programadas de todos los
+        códigos salen del mismo agrupado del rutero y los libros se escriben en paralelo
+        en RUTA_BASE/CARPETA_LOTE como 'ASISTENCIA <DIA>-S<SEMANA>.xlsx'
+        
+        Args:
+            max_workers: Procesos para escribir los libros. None usa el número de CPUs
+        """
+        print("\n" + "="*60)
+        print("SISTEMA DE PROCESAMIENTO DE ASISTENCIA - MODO LOTE")
+        print("="*60 + "\n")
+        
+        datos = self._cargar_y_procesar()
+        if datos is None:
+            return
+        df_efectividad, df_asistencia, df_personal, rutero, df_rutero_raw = datos
+        
+        # 4. Visitas programadas de todos los códigos
+        programadas = self.proc_rutero.obtener_todas_visitas_programadas(rutero)
+        
+        # 5. Construir reportes (TIENDAS no depende del día y se calcula una vez)
+        print(f"\n📊 Construyendo {len(programadas)} reportes...")
+        df_reporte_tiendas = self.constructor.construir_reporte_tiendas(
+            df_efectividad, df_rutero_raw
+        )
+        
+        # 6. Construir y guardar en paralelo: cada reporte se arma justo antes de enviarse
+        # y hay a lo más dos por proceso en vuelo, para no tener los 35 en memoria a la vez
+        carpeta = os.path.join(self.config.RUTA_BASE, self.config.CARPETA_LOTE)
+        os.makedirs(carpeta, exist_ok=True)
+        print(f"\n💾 Guardando libros en {carpeta}...")
+        
+        errores = []
+        
+        def _revisar(terminados):
+            for futuro in terminados:
+                codigo = en_vuelo.pop(futuro)
+                try:
+                    if not futuro.result():
+                        errores.append(codigo)
+                except Exception as e:
+                    errores.append(codigo)
+                    print(f"❌ Error al guardar {codigo}: {e}")
+        
+        procesos = max_workers or os.cpu_count() or 1
+        limite = procesos * 2
+        en_vuelo = {}
+        with ProcessPoolExecutor(max_workers=procesos) as executor:
+            for codigo, df_programadas in programadas.items():
+                dataframes = self._construir_reportes(
+                    df_asistencia, df_programadas, df_personal, df_reporte_tiendas
+                )
+                futuro = executor.submit(
+                    _guardar_reporte_en_proceso, carpeta, f"ASISTENCIA {codigo}.xlsx", dataframes
+                )
+                en_vuelo[futuro] = codigo
+                del dataframes
+                
+                while len(en_vuelo) >= limite:
+                    terminados, _ = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                    _revisar(terminados)
+            
+            while en_vuelo:
+                terminados, _ = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                _revisar(terminados)
+        
+        print("\n" + "="*60)
+        if errores:
+            print(f"⚠️  LOTE TERMINADO CON {len(errores)} ERRORES: {', '.join(sorted(errores))}")
+        else:
+            print(f"✅ LOTE COMPLETADO: {len(programadas)} REPORTES")
+        print("="*60 + "\n")
 
 
-def main():
+def main(lote: bool = False):
     """Función principal"""
     try:
         sistema = SistemaAsistencia()
-        sistema.ejecutar()
+        if lote:
+            sistema.ejecutar_lote()
+        else:
+            sistema.ejecutar()
     except Exception as e:
         print(f"\n❌ Error fatal en el sistema: {e}")
         import traceback
@@ -604,4 +815,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(lote=len(sys.argv) > 1 and sys.argv[1] == "lote")
\ No newline at end of file
@@ -56,20 +56,19 @@ print("SE CONTRUYO BIEN LA BASE DE VENTAS SIN CRUZAR")
 #INVOCAR RUTERO
 import pandas as pd
 import os
+from rutero import buscar_rutero, cargar_rutero
 #----------------------------------------------------------------------------------------------------------------------------------------------------------------'
 ruta = "C:\\Users\\lapmxdf558\\Documents\\JUAN\\BONOS PY\\"  #<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<
 #----------------------------------------------------------------------------------------------------------------------------------------------------------------'
 
+#COLUMNAS DEL RUTERO QUE SE USAN EN TODO EL CONSOLIDADO
+COLRUTERO=["ID_TIENDA","Nombre Promotor","Usuario Virtual","Nombre Supervisor","Usuario Virtual Supervisor","Usuario APP Promotor","Numero de Visitas (Clasificacion)"]
+
 # BUSCAR ARCHIVOS QUE CONTENGAN 'Rutero'
-archivos = [f for f in os.listdir(ruta) if 'Rutero' in f]
-if archivos:
-    archivo_rutero = os.path.join(ruta, archivos[0])
-    dfrut = pd.read_excel(archivo_rutero, sheet_name='RUTERO',skiprows=4)
-    palabra=archivo_rutero.replace(ruta,"")
+archivo_rutero = buscar_rutero(ruta)
+if archivo_rutero:
+    dfrut = cargar_rutero(archivo_rutero, columnas=COLRUTERO)
 #SE CARGO EL RUTERO EN LA CARPETA
-    print("Archivo cargado:", palabra)
-else:
-    print("No se encontró ningún archivo con 'Rutero' en el nombre.")
 
 
 #CRUCE DE BASE DE VENTAS CON BASE DE RUTERO 
@@ -1,5 +1,49 @@
 import pandas as pd
+import random
 import re
+import sys
+import time
+import tracemalloc
+
+from lector_chat import LectorChat
+
+# Mapeo de términos a códigos estándar
+MAPEO_DETERMINANTES = {
+    'sc': 'SC',
+    'walmart': 'SC',
+    'wal mart': 'SC',
+    'superama': 'SC',
+    ' ba ': 'BA',
+    '#ba': 'BA',
+    'bodega aurrera': 'BA',
+    'bodega': 'BA',
+    'aurrera': 'BA',
+    'sm': 'SM',
+    "sam's": 'SM',
+    'sams': 'SM',
+    'sams club': 'SM',
+    'mi bodega': 'MB',
+    'mb': 'MB',
+}
+
+# Se prueban del término más largo al más corto (ordenado una sola vez)
+MAPEO_ORDENADO = sorted(MAPEO_DETERMINANTES.items(), key=lambda x: -len(x[0]))
+
+# Palabras que indican que una línea habla de una tienda (en minúsculas)
+KEYWORDS_TIENDA = [
+    'bodega', 'aurrera', 'ba ', '#ba', 
+    'walmart', 'wal mart', 'sc ', '#sc',
+    'sam', 'sams', 'sm ',
+    'superama', 'tienda', 'sucursal', 'soriana'
+]
+
+# Mensajes del sistema de WhatsApp (se comparan respetando mayúsculas)
+FRASES_SISTEMA = [
+    'creó el grupo', 'añadió', 'te añadió', 
+    'cambió', 'salió', 'eliminó', 'Los mensajes'
+]
+
+PATRON_NUMEROS = re.compile(r'\b\d{3,5}\b')
 
 def normalizar_determinante(texto):
     """
@@ -7,26 +51,7 @@ def normalizar_determinante(texto):
     """
     texto_lower = texto.lower()
     
-    # Mapeo de términos a códigos estándar
-    mapeo = {
-        'sc': 'SC',
-        'walmart': 'SC',
-        'wal mart': 'SC',
-        'superama': 'SC',
-        ' ba ': 'BA',
-        '#ba': 'BA',
-        'bodega aurrera': 'BA',
-        'bodega': 'BA',
-        'aurrera': 'BA',
-        'sm': 'SM',
-        "sam's": 'SM',
-        'sams': 'SM',
-        'sams club': 'SM',
-        'mi bodega': 'MB',
-        'mb': 'MB',
-    }
-    
-    for patron, codigo in sorted(mapeo.items(), key=lambda x: -len(x[0])):
+    for patron, codigo in MAPEO_ORDENADO:
         if patron in texto_lower:
             return codigo
     
@@ -54,57 +79,155 @@ def extraer_tipo_tienda_excel(id_completo):
 
 def extraer_numeros(texto):
     """Extrae todos los números de 3-5 dígitos de un texto"""
-    numeros = re.findall(r'\b\d{3,5}\b', str(texto))
+    numeros = PATRON_NUMEROS.findall(str(texto))
     return numeros
 
 def es_linea_tienda(linea):
     """Determina si una línea del chat menciona una tienda"""
     linea_lower = linea.lower()
     
-    keywords = [
-        'bodega', 'aurrera', 'ba ', '#ba', 
-        'walmart', 'wal mart', 'sc ', '#sc',
-        'sam', 'sams', 'sm ',
-        'superama', 'tienda', 'sucursal', 'soriana'
-    ]
-    
-    tiene_keyword = any(kw in linea_lower for kw in keywords)
-    tiene_numero = bool(re.search(r'\b\d{3,5}\b', linea))
+    tiene_keyword = any(kw in linea_lower for kw in KEYWORDS_TIENDA)
+    tiene_numero = bool(PATRON_NUMEROS.search(linea))
     
-    es_sistema = any(x in linea for x in [
-        'creó el grupo', 'añadió', 'te añadió', 
-        'cambió', 'salió', 'eliminó', 'Los mensajes'
-    ])
+    es_sistema = any(x in linea for x in FRASES_SISTEMA)
     
     return tiene_keyword and tiene_numero and not es_sistema
 
+def _patron_trie(terminos):
+    """Expresión regular de una alternancia de términos factorizada por prefijos comunes (un trie)"""
+    raiz = {}
+    for termino in terminos:
+        nodo = raiz
+        for caracter in termino:
+            nodo = nodo.setdefault(caracter, {})
+        nodo[''] = {}
+    
+    def _nodo(nodo):
+        hijos = [re.escape(c) + _nodo(sub) for c, sub in sorted(nodo.items()) if c != '']
+        if not hijos:
+            return ''
+        cuerpo = hijos[0] if len(hijos) == 1 else '(?:' + '|'.join(hijos) + ')'
+        # Si aquí termina un término lo que sigue es opcional (el cuantificador es codicioso)
+        return f'(?:{cuerpo})?' if '' in nodo else cuerpo
+    
+    return _nodo(raiz)
+
+def _compilar_tokenizador():
+    """
+    Arma el patrón de términos y lo que aporta cada término encontrado
+    
+    Todos los términos (keywords, determinantes y frases de sistema en minúsculas) van en un
+    solo patrón tipo trie que en cada posición consume el término más largo. Lo que aporta un
+    término incluye a los términos contenidos en él (ej. 'bodega aurrera' ya trae 'bodega' y
+    'aurrera') y las posiciones internas donde podría empezar otro término que se sale de él
+    (ej. 'sam' dentro de 'sams club'), que se revisan aparte con el mismo patrón anclado
+    
+    Returns:
+        (patrón compilado, dict término -> (es keyword, (prioridad, código) o None,
+         [(desplazamiento, frase de sistema)], desplazamientos a revisar))
+    """
+    frases_por_termino = {}
+    for frase in FRASES_SISTEMA:
+        frases_por_termino.setdefault(frase.lower(), []).append(frase)
+    
+    terminos = sorted(set(KEYWORDS_TIENDA) | set(MAPEO_DETERMINANTES) | set(frases_por_termino))
+    prioridad = {patron: i for i, (patron, _) in enumerate(MAPEO_ORDENADO)}
+    keywords = set(KEYWORDS_TIENDA)
+    
+    aportes = {}
+    for termino in terminos:
+        contenidos = [(t, k) for k in range(len(termino)) for t in terminos if termino.startswith(t, k)]
+        determinantes = [(prioridad[t], MAPEO_DETERMINANTES[t]) for t, _ in contenidos if t in prioridad]
+        aportes[termino] = (
+            any(t in keywords for t, _ in contenidos),
+            min(determinantes) if determinantes else None,
+            [(k, frase) for t, k in contenidos for frase in frases_por_termino.get(t, [])],
+            sorted({k for k in range(1, len(termino)) for t in terminos
+                    if len(t) > len(termino) - k and t.startswith(termino[k:])})
+        )
+    
+    return re.compile(_patron_trie(terminos)), aportes
+
+PATRON_TERMINOS, APORTES_TERMINOS = _compilar_tokenizador()
+
+def analizar_linea(linea):
+    """
+    Tipo de tienda, números y si la línea menciona una tienda
+    
+    Equivale a normalizar_determinante, extraer_numeros y es_linea_tienda juntas, pero pasa
+    la línea a minúsculas una sola vez y la recorre con dos patrones compilados (términos y
+    números) en lugar de ~45 búsquedas de subcadenas y dos búsquedas de números
+    
+    Returns:
+        (código de tipo o None, lista de números de 3-5 dígitos, True si es línea de tienda)
+    """
+    linea_lower = linea.lower()
+    
+    # Solo 'İ' cambia de largo al pasar a minúsculas; ahí las posiciones ya no coinciden
+    if len(linea_lower) != len(linea):
+        return normalizar_determinante(linea), extraer_numeros(linea), es_linea_tienda(linea)
+    
+    # \d y \w no cambian al pasar a minúsculas, así que los números son los mismos
+    numeros = PATRON_NUMEROS.findall(linea_lower)
+    
+    tiene_keyword = False
+    es_sistema = False
+    mejor = None
+    
+    pendientes = [(match.group(), match.start()) for match in PATRON_TERMINOS.finditer(linea_lower)]
+    while pendientes:
+        termino, inicio = pendientes.pop()
+        es_keyword, determinante, frases, desplazamientos = APORTES_TERMINOS[termino]
+        tiene_keyword = tiene_keyword or es_keyword
+        if determinante is not None and (mejor is None or determinante < mejor):
+            mejor = determinante
+        # Las frases de sistema se comparan con la línea original (respetando mayúsculas)
+        if frases and not es_sistema:
+            es_sistema = any(linea.startswith(frase, inicio + k) for k, frase in frases)
+        # Términos que empiezan dentro de este y terminan después
+        for k in desplazamientos:
+            match = PATRON_TERMINOS.match(linea_lower, inicio + k)
+            if match and match.end() > inicio + len(termino):
+                pendientes.append((match.group(), inicio + k))
+    
+    tipo = mejor[1] if mejor is not None else None
+    return tipo, numeros, tiene_keyword and bool(numeros) and not es_sistema
+
+def filtrar_lineas_tienda(lineas):
+    """
+    Etapa del lector de chat: deja solo las líneas de tienda con su tipo y sus números
+    
+    Yields:
+        (línea, código de tipo o None, lista de números)
+    """
+    for linea in lineas:
+        tipo_txt, numeros, es_tienda = analizar_linea(linea)
+        if es_tienda:
+            yield linea, tipo_txt, numeros
+
 def buscar_por_id(archivo_txt, archivo_excel, columna_id='TIENDA ID_CUBO',
-                  archivo_salida='coincidencias.xlsx'):
+                  archivo_salida='coincidencias.xlsx', procesos=None):
     """
     Busca coincidencias en un chat de WhatsApp
+    
+    El chat se lee en streaming por rangos de bytes (ver lector_chat): los procesos filtran
+    las líneas de tienda y aquí se cruzan con las tiendas en el orden del archivo, sin
+    cargar el chat completo en memoria. procesos=None usa uno por CPU
     """
     
     print("=" * 80)
     print("BUSCADOR DE TIENDAS EN CHAT DE WHATSAPP (VERSIÓN MEJORADA)")
     print("=" * 80)
     
-    # Leer TXT
+    # El chat se lee al final, mientras se cruza; aquí solo se revisa que exista
     try:
-        with open(archivo_txt, 'r', encoding='utf-8') as f:
-            lineas_todas = [linea.strip() for linea in f if linea.strip()]
-        print(f"\n✓ Archivo TXT leído: {len(lineas_todas)} líneas totales")
+        lector = LectorChat(archivo_txt, procesos=procesos)
+        print(f"\n✓ Archivo TXT encontrado: {lector.tamano / 1024 / 1024:.1f} MB "
+              f"({lector.procesos} proceso{'s' if lector.procesos != 1 else ''} de lectura)")
     except Exception as e:
         print(f"\n✗ Error al leer TXT: {e}")
         return
     
-    # Filtrar solo líneas de tiendas
-    lineas_txt = [linea for linea in lineas_todas if es_linea_tienda(linea)]
-    print(f"✓ Líneas filtradas que mencionan tiendas: {len(lineas_txt)}")
-    
-    print(f"\n📝 Ejemplos de líneas a analizar:")
-    for i, linea in enumerate(lineas_txt[:5], 1):
-        print(f"  {i}. {linea[:80]}...")
-    
     # Leer Excel
     try:
         df = pd.read_excel(archivo_excel)
@@ -132,6 +255,14 @@ def buscar_por_id(archivo_txt, archivo_excel, columna_id='TIENDA ID_CUBO',
     # Crear también set de IDs solos
     ids_disponibles = set(df['ID_Numerico'].dropna())
     
+    # Índices hash (se arman una sola vez): claves existentes y claves de cada ID,
+    # para no recorrer la tabla de tiendas por cada número del chat
+    claves_disponibles = set(df['Clave_Busqueda'].dropna())
+    claves_por_id = {}
+    for num, clave in zip(df['ID_Numerico'], df['Clave_Busqueda']):
+        if pd.notna(num) and pd.notna(clave):
+            claves_por_id.setdefault(num, []).append(clave)
+    
     print(f"\n📊 Estadísticas del Excel:")
     print(f"   Total de tiendas: {len(df)}")
     print(f"   IDs únicos: {df['ID_Numerico'].nunique()}")
@@ -146,7 +277,7 @@ def buscar_por_id(archivo_txt, archivo_excel, columna_id='TIENDA ID_CUBO',
     for ejemplo in df['Clave_Busqueda'].dropna().head(5):
         print(f"     - {ejemplo}")
     
-    # Analizar TXT
+    # Analizar TXT: filtrado y cruce en una sola pasada por el chat
     print(f"\n🔍 Analizando chat de WhatsApp...")
     matches_encontrados = {}
     stats = {
@@ -156,42 +287,64 @@ def buscar_por_id(archivo_txt, archivo_excel, columna_id='TIENDA ID_CUBO',
         'match_solo_id': 0,
         'sin_match': 0
     }
+    num_lineas_tienda = 0
+    ejemplos = []
+    num_sin_id = 0
+    ejemplos_sin_id = []
     
-    for linea in lineas_txt:
-        tipo_txt = normalizar_determinante(linea)
-        numeros = extraer_numeros(linea)
-        
-        encontro_match = False
-        
-        # Estrategia 1: Buscar con tipo + ID
-        if tipo_txt and numeros:
-            stats['con_tipo'] += 1
-            for num in numeros:
-                clave = f"{tipo_txt}_{num}"
-                if clave in df['Clave_Busqueda'].values:
-                    if clave not in matches_encontrados:
-                        matches_encontrados[clave] = linea
-                        stats['match_tipo_id'] += 1
-                        encontro_match = True
-        
-        # Estrategia 2: Buscar solo por ID (todas las tiendas con ese número)
-        if not encontro_match and numeros:
-            if not tipo_txt:
-                stats['sin_tipo'] += 1
+    try:
+        for linea, tipo_txt, numeros in lector.procesar(filtrar_lineas_tienda):
+            num_lineas_tienda += 1
+            if len(ejemplos) < 5:
+                ejemplos.append(linea)
+            if num_lineas_tienda % 100_000 == 0:
+                print(f"  Procesadas: {num_lineas_tienda:,} líneas de tienda ({lector.porcentaje:.0f}% del chat)")
+            
+            encontro_match = False
             
-            for num in numeros:
-                if num in ids_disponibles:
-                    # Encontrar todas las tiendas con ese ID
-                    matches = df[df['ID_Numerico'] == num]
-                    for _, row in matches.iterrows():
-                        clave = row['Clave_Busqueda']
-                        if pd.notna(clave) and clave not in matches_encontrados:
+            # Estrategia 1: Buscar con tipo + ID
+            if tipo_txt and numeros:
+                stats['con_tipo'] += 1
+                for num in numeros:
+                    clave = f"{tipo_txt}_{num}"
+                    if clave in claves_disponibles:
+                        if clave not in matches_encontrados:
                             matches_encontrados[clave] = linea
-                            stats['match_solo_id'] += 1
+                            stats['match_tipo_id'] += 1
                             encontro_match = True
-        
-        if not encontro_match:
-            stats['sin_match'] += 1
+            
+            # Estrategia 2: Buscar solo por ID (todas las tiendas con ese número)
+            if not encontro_match and numeros:
+                if not tipo_txt:
+                    stats['sin_tipo'] += 1
+                
+                for num in numeros:
+                    if num in ids_disponibles:
+                        # Todas las tiendas con ese ID
+                        for clave in claves_por_id.get(num, []):
+                            if clave not in matches_encontrados:
+                                matches_encontrados[clave] = linea
+                                stats['match_solo_id'] += 1
+                                encontro_match = True
+            
+            if not encontro_match:
+                stats['sin_match'] += 1
+            
+            # Ningún número de la línea es ID de una tienda
+            if not any(num in ids_disponibles for num in numeros):
+                num_sin_id += 1
+                if len(ejemplos_sin_id) < 15:
+                    ejemplos_sin_id.append((linea, tipo_txt, numeros))
+    except Exception as e:
+        print(f"\n✗ Error al leer TXT: {e}")
+        return
+    
+    print(f"\n✓ Archivo TXT leído: {lector.lineas} líneas totales")
+    print(f"✓ Líneas filtradas que mencionan tiendas: {num_lineas_tienda}")
+    
+    print(f"\n📝 Ejemplos de líneas analizadas:")
+    for i, linea in enumerate(ejemplos, 1):
+        print(f"  {i}. {linea[:80]}...")
     
     print(f"\n📊 Estadísticas del análisis:")
     print(f"   Líneas con tipo detectado (BA/SC/SM): {stats['con_tipo']}")
@@ -209,7 +362,7 @@ def buscar_por_id(archivo_txt, archivo_excel, columna_id='TIENDA ID_CUBO',
     print(f"RESULTADOS")
     print(f"{'=' * 80}")
     print(f"✓ Total de tiendas encontradas: {len(df_resultado)}")
-    print(f"✓ Porcentaje de líneas con match: {len(matches_encontrados)/max(len(lineas_txt), 1)*100:.2f}%")
+    print(f"✓ Porcentaje de líneas con match: {len(matches_encontrados)/max(num_lineas_tienda, 1)*100:.2f}%")
     
     if len(df_resultado) > 0:
         df_resultado.to_excel(archivo_salida, index=False, engine='openpyxl')
@@ -239,33 +392,140 @@ def buscar_por_id(archivo_txt, archivo_excel, columna_id='TIENDA ID_CUBO',
     else:
         print("\n⚠️  No se encontraron coincidencias")
     
-    # Mostrar líneas sin match
-    lineas_sin_match = []
-    for linea in lineas_txt:
-        tipo = normalizar_determinante(linea)
-        numeros = extraer_numeros(linea)
-        
-        tiene_match = False
-        if numeros:
-            for num in numeros:
-                if num in ids_disponibles:
-                    tiene_match = True
-                    break
-        
-        if not tiene_match:
-            lineas_sin_match.append((linea, tipo, numeros))
-    
-    if lineas_sin_match:
+    # Mostrar líneas sin match (contadas durante la pasada; solo se guardan los ejemplos)
+    if num_sin_id:
         print(f"\n{'=' * 80}")
-        print(f"LÍNEAS SIN COINCIDENCIA ({len(lineas_sin_match)}):")
+        print(f"LÍNEAS SIN COINCIDENCIA ({num_sin_id}):")
         print(f"{'=' * 80}")
-        for linea, tipo, nums in lineas_sin_match[:15]:
+        for linea, tipo, nums in ejemplos_sin_id:
             print(f"  - {linea[:70]}...")
             print(f"    Tipo: {tipo if tipo else '❌'} | IDs: {nums}")
     
     print(f"\n{'=' * 80}\n")
 
-if __name__ == "__main__":
+def generar_chat_sintetico(ruta, num_lineas=500_000, semilla=0):
+    """
+    Escribe un export de chat de WhatsApp sintético para pruebas de rendimiento
+    (tiendas con y sin tipo, números, mensajes de sistema, acentos y mayúsculas)
+    
+    Args:
+        ruta: Archivo TXT a escribir
+        num_lineas: Número de líneas
+        semilla: Semilla del generador
+    """
+    rng = random.Random(semilla)
+    nombres = ['Juan', 'Ana', 'Luis', 'María', 'José', 'Sofía', 'Pedro', 'Lucía']
+    plantillas = [
+        '{n}: Bodega Aurrera {id} lista ✅',
+        '{n}: Walmart #{id} surtido completo',
+        "{n}: Sam's {id} y {id2} sin faltantes",
+        '{n}: SAMS CLUB {id} pendiente',
+        '{n}: tienda {id} sin producto en anaquel',
+        '{n}: sucursal {id} SC revisada',
+        '{n}: #BA {id}',
+        '{n}: Mi Bodega {id} exhibición',
+        '{n}: superama {id}, mañana regreso',
+        '{n}: soriana {id2}',
+        '{n}: ba {id} y wal mart {id2}',
+        '{n}: sm {id}sc',
+        '{n}: buenos días equipo 👋',
+        '{n}: <Multimedia omitido>',
+        '{n} añadió a Pedro tienda {id}',
+        '{n} cambió el asunto a "Ruta {id}"',
+        'Los mensajes y las llamadas están cifrados de extremo a extremo. {id}',
+        '{n}: İstanbul bodega {id}',
+        '{n}: 123456 no es id, {id} sí',
+    ]
+    with open(ruta, 'w', encoding='utf-8') as f:
+        for _ in range(num_lineas):
+            fecha = f"{rng.randint(1, 28)}/{rng.randint(1, 12)}/24 {rng.randint(0, 23)}:{rng.randint(10, 59)}"
+            linea = rng.choice(plantillas).format(
+                n=rng.choice(nombres), id=rng.randint(100, 99999), id2=rng.randint(10, 999999)
+            )
+            f.write(f"{fecha} - {linea}\n")
+
+def benchmark_tokenizador(num_lineas=500_000, archivo_txt='chat_sintetico.txt'):
+    """
+    Compara las tres funciones por separado contra analizar_linea en un chat sintético
+    
+    Args:
+        num_lineas: Líneas del chat sintético
+        archivo_txt: Archivo donde se genera el chat
+    """
+    print("=" * 80)
+    print(f"BENCHMARK DEL TOKENIZADOR: {num_lineas:,} líneas")
+    print("=" * 80)
+    
+    generar_chat_sintetico(archivo_txt, num_lineas)
+    with open(archivo_txt, 'r', encoding='utf-8') as f:
+        lineas = [linea.strip() for linea in f if linea.strip()]
+    
+    inicio = time.perf_counter()
+    separado = [(normalizar_determinante(l), extraer_numeros(l), es_linea_tienda(l)) for l in lineas]
+    segundos_separado = time.perf_counter() - inicio
+    
+    inicio = time.perf_counter()
+    una_pasada = [analizar_linea(l) for l in lineas]
+    segundos_una_pasada = time.perf_counter() - inicio
+    
+    print(f"\n{'Método':32} {'Segundos':>9} {'Líneas/s':>12}")
+    print(f"{'3 funciones por separado':32} {segundos_separado:>9.2f} {len(lineas) / segundos_separado:>12,.0f}")
+    print(f"{'analizar_linea':32} {segundos_una_pasada:>9.2f} {len(lineas) / segundos_una_pasada:>12,.0f}")
+    print(f"\n🚀 Aceleración: {segundos_separado / segundos_una_pasada:.1f}x")
+    
+    diferentes = sum(1 for a, b in zip(separado, una_pasada) if a != b)
+    if diferentes == 0:
+        print("✓ Resultados idénticos en todas las líneas")
+    else:
+        print(f"✗ {diferentes} líneas con resultados distintos")
+
+def benchmark_streaming(num_lineas=2_000_000, procesos=None, archivo_txt='chat_sintetico.txt'):
+    """
+    Compara leer el chat completo a una lista y filtrarlo contra LectorChat en streaming
+    (tiempo y memoria máxima del proceso principal medida con tracemalloc)
+    
+    Args:
+        num_lineas: Líneas del chat sintético
+        procesos: Procesos del lector. Si es None uno por CPU
+        archivo_txt: Archivo donde se genera el chat
+    """
+    print("=" * 80)
+    print(f"BENCHMARK DE LECTURA EN STREAMING: {num_lineas:,} líneas")
+    print("=" * 80)
+    
+    generar_chat_sintetico(archivo_txt, num_lineas)
+    
+    def _lista():
+        with open(archivo_txt, 'r', encoding='utf-8') as f:
+            lineas_todas = [linea.strip() for linea in f if linea.strip()]
+        return len(lineas_todas), sum(1 for _ in filtrar_lineas_tienda(lineas_todas))
+    
+    def _streaming():
+        lector = LectorChat(archivo_txt, procesos=procesos)
+        filtradas = sum(1 for _ in lector.procesar(filtrar_lineas_tienda))
+        return lector.lineas, filtradas
+    
+    # El tiempo se mide sin tracemalloc (lo hace varias veces más lento) y la memoria aparte
+    print(f"\n{'Método':32} {'Segundos':>9} {'Memoria MB':>11} {'Líneas':>10} {'Tienda':>10}")
+    for nombre, funcion in [('Lista completa', _lista), ('LectorChat (streaming)', _streaming)]:
+        inicio = time.perf_counter()
+        lineas, filtradas = funcion()
+        segundos = time.perf_counter() - inicio
+        
+        tracemalloc.start()
+        funcion()
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{nombre:32} {segundos:>9.2f} {pico / 1024 / 1024:>11.1f} {lineas:>10,} {filtradas:>10,}")
+
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] == "benchmark_streaming":
+    benchmark_streaming(int(sys.argv[2]) if len(sys.argv) > 2 else 2_000_000,
+                        int(sys.argv[3]) if len(sys.argv) > 3 else None)
+
+elif __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] == "benchmark":
+    benchmark_tokenizador(int(sys.argv[2]) if len(sys.argv) > 2 else 500_000)
+
+elif __name__ == "__main__":
     archivo_txt = "01_Chat_WA.txt"
     archivo_excel = "tienda.xlsx"
     columna_id = "TIENDA ID_CUBO"
@@ -1,6 +1,9 @@
 import pandas as pd
 import openpyxl
 import re
+from functools import partial
+
+from lector_chat import LectorChat
 
 def normalizar_texto(texto):
     """Normaliza texto para comparación: minúsculas, sin acentos, sin espacios extra"""
@@ -13,25 +16,49 @@ def normalizar_texto(texto):
         texto = texto.replace(old, new)
     return texto
 
+def coincidencias_exactas(valores_excel, lineas):
+    """
+    Etapa del lector de chat para la búsqueda exacta
+    
+    Yields:
+        (valor del TXT, True si está tal cual en el Excel)
+    """
+    for valor in lineas:
+        yield valor, valor in valores_excel
+
+def coincidencias_parciales(textos_excel, lineas):
+    """
+    Etapa del lector de chat para la búsqueda parcial
+    
+    Args:
+        textos_excel: Valores normalizados de la columna del Excel (en orden de filas)
+        lineas: Valores del TXT
+    
+    Yields:
+        (valor del TXT, posiciones de las filas que contienen el valor normalizado)
+    """
+    for valor in lineas:
+        valor_norm = normalizar_texto(valor)
+        yield valor, [i for i, texto in enumerate(textos_excel) if valor_norm in texto]
+
 def buscar_coincidencias(archivo_txt, archivo_excel, columna_busqueda, 
                         archivo_salida='coincidencias.xlsx', 
-                        tipo_busqueda='parcial'):
+                        tipo_busqueda='parcial', procesos=None):
     """
     Busca coincidencias entre un archivo TXT y una columna de Excel.
+    
+    El TXT se lee en streaming por rangos de bytes (ver lector_chat) y cada rango se
+    compara en un proceso aparte; procesos=None usa uno por CPU.
     """
     
     print("=" * 70)
     print("BUSCADOR DE COINCIDENCIAS TXT-EXCEL")
     print("=" * 70)
     
-    # Leer el archivo TXT
+    # El TXT se lee mientras se compara; aquí solo se revisa que exista
     try:
-        with open(archivo_txt, 'r', encoding='utf-8') as f:
-            valores_txt = [linea.strip() for linea in f if linea.strip()]
-        print(f"\n✓ Archivo TXT leído: {len(valores_txt)} valores encontrados")
-        print(f"  Primeros valores:")
-        for v in valores_txt[:3]:
-            print(f"    - {v[:80]}")
+        lector = LectorChat(archivo_txt, procesos=procesos)
+        print(f"\n✓ Archivo TXT encontrado: {lector.tamano / 1024 / 1024:.1f} MB")
     except Exception as e:
         print(f"\n✗ Error al leer el archivo TXT: {e}")
         return
@@ -58,50 +85,65 @@ def buscar_coincidencias(archivo_txt, archivo_excel, columna_busqueda,
     print(f"Tipo de búsqueda: {tipo_busqueda.upper()}")
     print(f"{'=' * 70}")
     
-    df_resultado = pd.DataFrame()
+    # Durante la pasada solo se guardan conteos, las filas encontradas y algunos ejemplos
+    primeros_valores = []
     coincidencias_detalle = []
     valores_encontrados_set = set()
+    filas_encontradas = {}  # posición -> None, en orden de primera aparición
+    num_no_encontrados = 0
+    ejemplos_no_encontrados = []
     
     if tipo_busqueda == 'exacta':
         df[columna_busqueda] = df[columna_busqueda].astype(str)
-        valores_txt_str = [str(v) for v in valores_txt]
-        df_resultado = df[df[columna_busqueda].isin(valores_txt_str)]
-        valores_encontrados_set = set(df_resultado[columna_busqueda].unique())
-        
+        etapa = partial(coincidencias_exactas, set(df[columna_busqueda]))
     else:  # Búsqueda parcial
-        df['_temp_norm'] = df[columna_busqueda].apply(normalizar_texto)
-        
-        print("\nBuscando coincidencias...")
-        for i, valor_txt in enumerate(valores_txt):
-            if (i + 1) % 50 == 0:
-                print(f"  Procesados: {i + 1}/{len(valores_txt)}")
-            
-            valor_norm = normalizar_texto(valor_txt)
+        textos_excel = [normalizar_texto(v) for v in df[columna_busqueda]]
+        etapa = partial(coincidencias_parciales, textos_excel)
+    
+    print("\nBuscando coincidencias...")
+    try:
+        for i, (valor_txt, encontrado) in enumerate(lector.procesar(etapa)):
+            if len(primeros_valores) < 3:
+                primeros_valores.append(valor_txt)
+            if (i + 1) % 1000 == 0:
+                print(f"  Procesados: {i + 1:,} ({lector.porcentaje:.0f}% del archivo)")
             
-            # Buscar coincidencias
-            matches = df[df['_temp_norm'].str.contains(valor_norm, na=False, regex=False)]
+            if not encontrado:
+                num_no_encontrados += 1
+                if len(ejemplos_no_encontrados) < 5:
+                    ejemplos_no_encontrados.append(valor_txt)
+                continue
             
-            if len(matches) > 0:
-                df_resultado = pd.concat([df_resultado, matches], ignore_index=True)
-                valores_encontrados_set.add(valor_txt)
-                
-                for _, row in matches.iterrows():
-                    coincidencias_detalle.append({
-                        'Valor_TXT': valor_txt,
-                        'Valor_Excel': row[columna_busqueda]
-                    })
-        
-        if '_temp_norm' in df_resultado.columns:
-            df_resultado = df_resultado.drop(columns=['_temp_norm'])
-        
-        df_resultado = df_resultado.drop_duplicates()
+            valores_encontrados_set.add(valor_txt)
+            if tipo_busqueda != 'exacta':
+                for posicion in encontrado:
+                    filas_encontradas.setdefault(posicion)
+                    if len(coincidencias_detalle) < 5:
+                        coincidencias_detalle.append({
+                            'Valor_TXT': valor_txt,
+                            'Valor_Excel': df[columna_busqueda].iloc[posicion]
+                        })
+    except Exception as e:
+        print(f"\n✗ Error al leer el archivo TXT: {e}")
+        return
+    
+    total_txt = lector.lineas
+    print(f"\n✓ Archivo TXT leído: {total_txt} valores encontrados")
+    print(f"  Primeros valores:")
+    for v in primeros_valores:
+        print(f"    - {v[:80]}")
+    
+    if tipo_busqueda == 'exacta':
+        df_resultado = df[df[columna_busqueda].isin(valores_encontrados_set)]
+    else:
+        df_resultado = df.iloc[list(filas_encontradas)].reset_index(drop=True).drop_duplicates()
     
     print(f"\n{'=' * 70}")
     print(f"RESULTADOS")
     print(f"{'=' * 70}")
     print(f"✓ Filas con coincidencias: {len(df_resultado)}")
-    print(f"✓ Valores del TXT encontrados: {len(valores_encontrados_set)}/{len(valores_txt)}")
-    print(f"✓ Porcentaje de éxito: {len(valores_encontrados_set)/len(valores_txt)*100:.2f}%")
+    print(f"✓ Valores del TXT encontrados: {len(valores_encontrados_set)}/{total_txt}")
+    print(f"✓ Porcentaje de éxito: {len(valores_encontrados_set)/total_txt*100:.2f}%")
     
     if len(df_resultado) > 0:
         df_resultado.to_excel(archivo_salida, index=False, engine='openpyxl')
@@ -127,16 +169,14 @@ def buscar_coincidencias(archivo_txt, archivo_excel, columna_busqueda,
         print("  2. Prueba con tipo_busqueda='exacta' si son valores cortos")
         print("  3. Revisa si hay caracteres especiales o formato diferente")
     
-    valores_no_encontrados = [v for v in valores_txt if v not in valores_encontrados_set]
-    
-    if valores_no_encontrados:
+    if num_no_encontrados:
         print(f"\n{'=' * 70}")
-        print(f"SIN COINCIDENCIA ({len(valores_no_encontrados)}):")
+        print(f"SIN COINCIDENCIA ({num_no_encontrados}):")
         print(f"{'=' * 70}")
-        for v in valores_no_encontrados[:5]:
+        for v in ejemplos_no_encontrados:
             print(f"  - {v[:70]}")
-        if len(valores_no_encontrados) > 5:
-            print(f"  ... y {len(valores_no_encontrados) - 5} más")
+        if num_no_encontrados > 5:
+            print(f"  ... y {num_no_encontrados - 5} más")
     
     print(f"\n{'=' * 70}\n")
 
@@ -1,18 +1,14 @@
 
 import pandas as pd
 import os
+from rutero import buscar_rutero, cargar_rutero
 
 ruta = "C:\\Users\\lapmxdf558\\Documents\\JUAN\\BONOS PY\\"
 
 # Buscar archivos que contengan 'Rutero'
-archivos = [f for f in os.listdir(ruta) if 'Rutero' in f]
-
-if archivos:
-    archivo_rutero = os.path.join(ruta, archivos[0])
-    dfrut = pd.read_excel(archivo_rutero, sheet_name='RUTERO',skiprows=4)
-    print("Archivo cargado:", archivo_rutero)
-else:
-    print("No se encontró ningún archivo con 'Rutero' en el nombre.")
+archivo_rutero = buscar_rutero(ruta)
+if archivo_rutero:
+    dfrut = cargar_rutero(archivo_rutero)
 
 archivos = [f for f in os.listdir(ruta) if 'Personal' in f]
 
@@ -3,6 +3,7 @@ import glob
 import os 
 import numpy as np
 import warnings
+from rutero import buscar_rutero, cargar_rutero
 warnings.simplefilter("ignore", UserWarning)
 
 
@@ -11,14 +12,9 @@ ARCHIVOS = glob.glob(os.path.join(RUTA, "TS*.xlsx"))
 dfTODOS = []  # lista para guardar cada bloque
 
 #CARGANDO RUTERO
-archivos = [f for f in os.listdir(RUTA) if 'Rutero' in f]
-if archivos:
-    archivo_RUT = os.path.join(RUTA, archivos[0])
-    dfRUT = pd.read_excel(archivo_RUT, sheet_name='RUTERO',skiprows=4)
-    palabra=archivo_RUT.replace(RUTA,"")
-    print("Archivo cargado:", palabra)
-else:
-    print("No se encontró ningún archivo con 'Rutero' en el nombre.")
+archivo_RUT = buscar_rutero(RUTA)
+if archivo_RUT:
+    dfRUT = cargar_rutero(archivo_RUT, columnas=["Usuario APP Promotor","Usuario Virtual","Nombre Supervisor"])
 
 dfRUTERO1=dfRUT[["Usuario APP Promotor","Usuario Virtual"]].drop_duplicates(subset="Usuario APP Promotor")
 dfRUTERO2=dfRUT[["Usuario APP Promotor","Nombre Supervisor"]].drop_duplicates(subset="Usuario APP Promotor")
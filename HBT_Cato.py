@@ -4,13 +4,171 @@ import os
 import numpy as np
 from datetime import datetime
 import warnings
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+from cache_excel import CacheLecturas, guardar_dataframe, cargar_dataframe
+from escritor_excel import EscritorExcelStreaming, ErrorSidecar
+from rutero import HOJA_RUTERO, FILAS_TITULO
 warnings.simplefilter("ignore", UserWarning)
 
 
+def _ejecutar_en_proceso(metodo, *args):
+    """
+    Ejecuta un método de ProcesadorDatos en un proceso hijo aislando sus errores
+    
+    Returns:
+        Tupla (resultado, error, estadísticas del caché del proceso hijo)
+    """
+    cache = metodo.__self__.cache
+    cache.reiniciar_estadisticas()
+    try:
+        resultado, error = metodo(*args), None
+    except Exception as e:
+        resultado, error = None, str(e)
+    return resultado, error, (cache.aciertos, cache.fallos, cache.desalojos)
+
+
+class ManifiestoMeses:
+    """
+    Registro persistente de los meses ya apilados por fuente, con su DataFrame procesado
+    
+    Cada mes se registra por el nombre de su archivo (sin extensión): dos archivos del
+    mismo mes de años distintos, o una copia "(2)", no se pisan entre sí
+    """
+    
+    def __init__(self, directorio):
+        """
+        Inicializa el manifiesto
+        
+        Args:
+            directorio: Carpeta donde se guardan el manifiesto y los meses procesados
+        """
+        self.directorio = Path(directorio)
+        self.ruta = self.directorio / "manifiesto.json"
+        self.entradas = self._leer()
+        self.reutilizados = {}
+        self.procesados = {}
+    
+    def _leer(self):
+        """Lee el manifiesto del disco; si no existe o está dañado empieza vacío"""
+        if not self.ruta.exists():
+            return {}
+        try:
+            with open(self.ruta, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️  Manifiesto dañado, se reconstruirá: {e}")
+            return {}
+    
+    @staticmethod
+    def firma(ruta_archivo, dependencias=None):
+        """
+        Calcula la firma de un archivo de mes
+        
+        Args:
+            ruta_archivo: Ruta del archivo del mes
+            dependencias: Valores adicionales que invalidan el mes si cambian
+            
+        Returns:
+            Diccionario serializable con nombre, tamaño, fecha de modificación y dependencias
+        """
+        stat = os.stat(ruta_archivo)
+        return {
+            'archivo': os.path.basename(ruta_archivo),
+            'tamano': stat.st_size,
+            'mtime': stat.st_mtime_ns,
+            'dependencias': dependencias
+        }
+    
+    @staticmethod
+    def clave(ruta_archivo):
+        """Clave de un archivo de mes en el manifiesto: su nombre sin extensión"""
+        return Path(ruta_archivo).stem
+    
+    def obtener(self, fuente, archivo, firma):
+        """
+        Devuelve el DataFrame procesado de un mes si su archivo no cambió
+        
+        Returns:
+            DataFrame guardado o None si el mes es nuevo o cambió
+        """
+        clave = self.clave(archivo)
+        entrada = self.entradas.get(fuente, {}).get(clave)
+        if entrada is None or entrada['firma'] != firma:
+            return None
+        
+        try:
+            df = cargar_dataframe(self.directorio / entrada['datos'])
+        except Exception as e:
+            print(f"⚠️  No se pudo recuperar {fuente} {clave} del manifiesto: {e}")
+            return None
+        
+        self.reutilizados[fuente] = self.reutilizados.get(fuente, 0) + 1
+        return df
+    
+    def registrar(self, fuente, archivo, firma, df):
+        """Guarda el DataFrame procesado de un mes y lo registra en el manifiesto"""
+        self.procesados[fuente] = self.procesados.get(fuente, 0) + 1
+        clave = self.clave(archivo)
+        try:
+            self.directorio.mkdir(parents=True, exist_ok=True)
+            ruta_datos = guardar_dataframe(df, self.directorio / f"{fuente}_{clave}")
+        except Exception as e:
+            print(f"⚠️  No se pudo registrar {fuente} {clave} en el manifiesto: {e}")
+            return
+        
+        self.entradas.setdefault(fuente, {})[clave] = {
+            'firma': firma,
+            'datos': ruta_datos.name,
+            'filas': len(df)
+        }
+    
+    def depurar(self, fuente, archivos_vigentes):
+        """Elimina del manifiesto los meses cuyo archivo ya no está en la carpeta"""
+        vigentes = {self.clave(archivo) for archivo in archivos_vigentes}
+        meses = self.entradas.get(fuente, {})
+        for clave in [c for c in meses if c not in vigentes]:
+            entrada = meses.pop(clave)
+            (self.directorio / entrada['datos']).unlink(missing_ok=True)
+    
+    def limpiar(self):
+        """Olvida todos los meses registrados (fuerza una reconstrucción completa)"""
+        for meses in self.entradas.values():
+            for entrada in meses.values():
+                (self.directorio / entrada['datos']).unlink(missing_ok=True)
+        self.entradas = {}
+    
+    def guardar(self):
+        """Escribe el manifiesto en disco"""
+        try:
+            self.directorio.mkdir(parents=True, exist_ok=True)
+            temporal = self.ruta.with_suffix('.tmp')
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump(self.entradas, f, ensure_ascii=False, indent=2)
+            os.replace(temporal, self.ruta)
+        except Exception as e:
+            print(f"⚠️  No se pudo guardar el manifiesto: {e}")
+    
+    def reportar(self):
+        """Muestra cuántos meses se reutilizaron y cuántos se procesaron por fuente"""
+        print(f"\n📒 Manifiesto de meses ({self.directorio}):")
+        for fuente in sorted(set(self.reutilizados) | set(self.procesados)):
+            print(f"   • {fuente}: {self.reutilizados.get(fuente, 0)} reutilizados, "
+                  f"{self.procesados.get(fuente, 0)} procesados")
+
+
 class ProcesadorDatos:
     """Clase para procesar y consolidar datos de ruteros, personal, efectividad y ventas"""
     
+    # Fuente: (patrón de archivos mensuales, método que procesa un mes)
+    FUENTES = {
+        'fi': ("FI*.xlsx", '_procesar_fi'),
+        'efectividad': ("Efectividad*.xlsx", '_procesar_efectividad'),
+        'rutero': ("Rutero*.xlsx", '_procesar_rutero'),
+        'personal': ("*Personal*.xlsx", '_procesar_personal')
+    }
+    
     def __init__(self, ruta_base=None):
         """
         Inicializa el procesador con la ruta base
@@ -34,6 +192,13 @@ class ProcesadorDatos:
         
         self.hoy = pd.Timestamp.today().normalize()
         self.df_personal_original = None
+        self.firma_personal_original = None
+        
+        # Caché de hojas ya parseadas (evita re-leer con openpyxl los meses sin cambios)
+        self.cache = CacheLecturas(self.ruta_base / ".cache_excel")
+        
+        # Meses ya apilados en corridas anteriores
+        self.manifiesto = ManifiestoMeses(self.ruta_base / ".manifiesto_meses")
         
     def extraer_mes_archivo(self, ruta_archivo):
         """
@@ -80,13 +245,20 @@ class ProcesadorDatos:
             print(f"⚠️  No se encontró archivo con '{patron}' en {directorio}")
             return None
     
+    def _archivos_fuente(self, fuente):
+        """Lista los archivos mensuales de una fuente"""
+        patron = self.FUENTES[fuente][0]
+        return glob.glob(str(self.rutas[fuente] / patron))
+    
     def cargar_personal_original(self):
         """Carga el archivo de personal más reciente para usar en merges"""
         try:
             archivo_personal = self.buscar_archivo('Personal', self.ruta_base)
             if archivo_personal:
-                df = pd.read_excel(archivo_personal, sheet_name='PERSONAL')
-                self.df_personal_original = df[["Usuario APP", "RUTA"]].copy()
+                columnas = ["Usuario APP", "RUTA"]
+                df = self.cache.leer_excel(archivo_personal, sheet_name='PERSONAL', columnas=columnas)
+                self.df_personal_original = df[columnas].copy()
+                self.firma_personal_original = ManifiestoMeses.firma(archivo_personal)
                 print(f"✓ Personal original cargado: {len(self.df_personal_original)} registros")
                 return True
             return False
@@ -94,50 +266,111 @@ class ProcesadorDatos:
             print(f"❌ Error cargando personal original: {e}")
             return False
     
+    def _dependencias(self, fuente):
+        """Valores externos al archivo que invalidan los meses guardados de una fuente"""
+        if fuente == 'personal':
+            # Los AÑOS dependen de la fecha de hoy y se redondean a centésimas de año
+            # (unos 3.65 días, que no coinciden para todas las personas): el personal
+            # guardado solo se reutiliza durante el mismo día
+            return str(self.hoy.date())
+        if fuente in ('efectividad', 'fi'):
+            # El cruce depende del personal original vigente
+            return self.firma_personal_original
+        return None
+    
+    def _planificar_meses(self, fuente, archivos):
+        """
+        Revisa en el manifiesto qué meses de una fuente pueden reutilizarse
+        
+        Args:
+            fuente: Nombre de la fuente ('rutero', 'personal', ...)
+            archivos: Rutas de los archivos mensuales
+            
+        Returns:
+            Lista de [archivo, mes, firma, DataFrame o None si hay que procesarlo]
+        """
+        plan = []
+        archivos_vigentes = []
+        dependencias = self._dependencias(fuente)
+        
+        for archivo in archivos:
+            mes = self.extraer_mes_archivo(archivo)
+            
+            if mes is None:
+                continue
+            
+            archivos_vigentes.append(archivo)
+            firma = ManifiestoMeses.firma(archivo, dependencias)
+            plan.append([archivo, mes, firma, self.manifiesto.obtener(fuente, archivo, firma)])
+        
+        self.manifiesto.depurar(fuente, archivos_vigentes)
+        return plan
+    
+    def _apilar_meses(self, fuente, archivos):
+        """
+        Procesa los archivos de una fuente reutilizando los meses ya registrados en el manifiesto
+        
+        Args:
+            fuente: Nombre de la fuente ('rutero', 'personal', ...)
+            archivos: Rutas de los archivos mensuales
+            
+        Returns:
+            Lista de DataFrames procesados, uno por mes
+        """
+        procesar = getattr(self, self.FUENTES[fuente][1])
+        lista_dfs = []
+        
+        for archivo, mes, firma, df in self._planificar_meses(fuente, archivos):
+            # Solo se parsean los meses nuevos o modificados
+            if df is None:
+                try:
+                    df = procesar(archivo, mes)
+                except Exception as e:
+                    print(f"⚠️  Error procesando {os.path.basename(archivo)}: {e}")
+                    continue
+                self.manifiesto.registrar(fuente, archivo, firma, df)
+            
+            lista_dfs.append(df)
+        
+        return lista_dfs
+    
+    def _procesar_rutero(self, archivo, mes):
+        """Lee y acondiciona el rutero de un mes"""
+        # Seleccionar columnas
+        columnas_necesarias = [
+            'ID_TIENDA', 'TIENDA ID_CUBO', 'Nombre Promotor', 
+            'Usuario Virtual', 'Usuario APP Promotor', 'Nombre Supervisor',
+            'Usuario Virtual Supervisor', 'Usuario App Supervisor',
+            'Usuario App Coordinador', 'Zona - Region', 'Nombre de Tienda',
+            'Latitud', 'Longitud', 'Area Nielsen', 'Canal de Distribución',
+            'Cadena', 'Formato', 'Numero de Visitas (Clasificacion)'
+        ]
+        
+        df = self.cache.leer_excel(
+            archivo, sheet_name=HOJA_RUTERO, skiprows=FILAS_TITULO, columnas=columnas_necesarias
+        )
+        df = df[columnas_necesarias].copy()
+        df.rename(columns={'Numero de Visitas (Clasificacion)': "FR"}, inplace=True)
+        
+        # Cálculos
+        df["HORAS TRABAJADAS"] = df["FR"] * 4 * 8
+        df["MINUTOS TRABAJADOS"] = df["HORAS TRABAJADAS"] * 60
+        df["MES"] = mes
+        
+        return df
+    
     def apilar_ruteros(self):
         """Apila todos los archivos de rutero por mes"""
         print("\n📁 Procesando RUTEROS...")
         
         try:
-            archivos = glob.glob(str(self.rutas['rutero'] / "Rutero*.xlsx"))
+            archivos = self._archivos_fuente('rutero')
             
             if not archivos:
                 print("⚠️  No se encontraron archivos de rutero")
                 return None
             
-            lista_dfs = []
-            
-            for archivo in archivos:
-                try:
-                    df = pd.read_excel(archivo, sheet_name='RUTERO', skiprows=4)
-                    mes = self.extraer_mes_archivo(archivo)
-                    
-                    if mes is None:
-                        continue
-                    
-                    # Seleccionar columnas
-                    columnas_necesarias = [
-                        'ID_TIENDA', 'TIENDA ID_CUBO', 'Nombre Promotor', 
-                        'Usuario Virtual', 'Usuario APP Promotor', 'Nombre Supervisor',
-                        'Usuario Virtual Supervisor', 'Usuario App Supervisor',
-                        'Usuario App Coordinador', 'Zona - Region', 'Nombre de Tienda',
-                        'Latitud', 'Longitud', 'Area Nielsen', 'Canal de Distribución',
-                        'Cadena', 'Formato', 'Numero de Visitas (Clasificacion)'
-                    ]
-                    
-                    df = df[columnas_necesarias].copy()
-                    df.rename(columns={'Numero de Visitas (Clasificacion)': "FR"}, inplace=True)
-                    
-                    # Cálculos
-                    df["HORAS TRABAJADAS"] = df["FR"] * 4 * 8
-                    df["MINUTOS TRABAJADOS"] = df["HORAS TRABAJADAS"] * 60
-                    df["MES"] = mes
-                    
-                    lista_dfs.append(df)
-                    
-                except Exception as e:
-                    print(f"⚠️  Error procesando {os.path.basename(archivo)}: {e}")
-                    continue
+            lista_dfs = self._apilar_meses('rutero', archivos)
             
             if lista_dfs:
                 df_final = pd.concat(lista_dfs, ignore_index=True)
@@ -151,50 +384,41 @@ class ProcesadorDatos:
             print(f"❌ Error en apilar_ruteros: {e}")
             return None
     
+    def _procesar_personal(self, archivo, mes):
+        """Lee y acondiciona el archivo de personal de un mes"""
+        # Seleccionar columnas
+        columnas_necesarias = [
+            'Tipo de Usuario', 'Usuario Agencia', 'Nombre Completo',
+            'Usuario Virtual', 'Usuario APP', 'Contraseña', 'RUTA',
+            'Latitud', 'Longitud', 'Fecha de ingreso',
+            'Supervisor Asignado OK', 'Coordinador Asignado'
+        ]
+        
+        df = self.cache.leer_excel(archivo, sheet_name='PERSONAL', columnas=columnas_necesarias)
+        df = df[columnas_necesarias].copy()
+        df.rename(columns={"Fecha de ingreso": "FECHA NAC"}, inplace=True)
+        
+        # Procesar fechas
+        df["FECHA NAC"] = pd.to_datetime(df["FECHA NAC"], format="%d-%m-%Y", errors="coerce")
+        df["AÑOS"] = ((self.hoy - df["FECHA NAC"]).dt.days / 365).round(2)
+        df["FECHA NAC"] = df["FECHA NAC"].dt.strftime("%d/%m/%Y")
+        df["AÑOS"] = df["AÑOS"].fillna(0)
+        df["MES"] = mes
+        
+        return df
+    
     def apilar_personal(self):
         """Apila todos los archivos de personal por mes"""
         print("\n👥 Procesando PERSONAL...")
         
         try:
-            archivos = glob.glob(str(self.rutas['personal'] / "*Personal*.xlsx"))
+            archivos = self._archivos_fuente('personal')
             
             if not archivos:
                 print("⚠️  No se encontraron archivos de personal")
                 return None
             
-            lista_dfs = []
-            
-            for archivo in archivos:
-                try:
-                    df = pd.read_excel(archivo, sheet_name='PERSONAL')
-                    mes = self.extraer_mes_archivo(archivo)
-                    
-                    if mes is None:
-                        continue
-                    
-                    # Seleccionar columnas
-                    columnas_necesarias = [
-                        'Tipo de Usuario', 'Usuario Agencia', 'Nombre Completo',
-                        'Usuario Virtual', 'Usuario APP', 'Contraseña', 'RUTA',
-                        'Latitud', 'Longitud', 'Fecha de ingreso',
-                        'Supervisor Asignado OK', 'Coordinador Asignado'
-                    ]
-                    
-                    df = df[columnas_necesarias].copy()
-                    df.rename(columns={"Fecha de ingreso": "FECHA NAC"}, inplace=True)
-                    
-                    # Procesar fechas
-                    df["FECHA NAC"] = pd.to_datetime(df["FECHA NAC"], format="%d-%m-%Y", errors="coerce")
-                    df["AÑOS"] = ((self.hoy - df["FECHA NAC"]).dt.days / 365).round(2)
-                    df["FECHA NAC"] = df["FECHA NAC"].dt.strftime("%d/%m/%Y")
-                    df["AÑOS"] = df["AÑOS"].fillna(0)
-                    df["MES"] = mes
-                    
-                    lista_dfs.append(df)
-                    
-                except Exception as e:
-                    print(f"⚠️  Error procesando {os.path.basename(archivo)}: {e}")
-                    continue
+            lista_dfs = self._apilar_meses('personal', archivos)
             
             if lista_dfs:
                 df_final = pd.concat(lista_dfs, ignore_index=True)
@@ -208,6 +432,55 @@ class ProcesadorDatos:
             print(f"❌ Error en apilar_personal: {e}")
             return None
     
+    def _procesar_efectividad(self, archivo, mes):
+        """Lee la efectividad de un mes y la cruza con el personal original"""
+        columnas_finales = [
+            'Fecha', 'Primer Nivel Geográfico', 'Zona', 'Usuario Coordinador',
+            'Coordinador', 'Usuario Supervisor', 'ID_SUP', 'Supervisor',
+            'Usuario Promotor', 'RUTA', 'Personal Promotor', 'Tienda',
+            'Cadena', 'Formato', 'Canal de Distribución', 'Tipo de Tienda',
+            'Check IN', 'Check OUT', 'Tiempo en PDV', 'Foto'
+        ]
+        
+        # ID_SUP y RUTA vienen del cruce con personal, no del archivo
+        columnas_archivo = [col for col in columnas_finales if col not in ('ID_SUP', 'RUTA')]
+        df = self.cache.leer_excel(archivo, sheet_name="Efectividad", columnas=columnas_archivo)
+        
+        # Merge con personal (promotor)
+        df = pd.merge(
+            df, 
+            self.df_personal_original.rename(columns={"RUTA": "RUTA_PROMOTOR"}),
+            left_on="Usuario Promotor", 
+            right_on="Usuario APP", 
+            how="left"
+        )
+        df.drop("Usuario APP", axis=1, inplace=True)
+        
+        # Merge con personal (supervisor)
+        df = pd.merge(
+            df,
+            self.df_personal_original.rename(columns={"RUTA": "ID_SUP", "Usuario APP": "Usuario APP_SUP"}),
+            left_on="Usuario Supervisor",
+            right_on="Usuario APP_SUP",
+            how="left"
+        )
+        df.drop("Usuario APP_SUP", axis=1, inplace=True)
+        
+        # Renombrar y seleccionar columnas
+        df.rename(columns={"RUTA_PROMOTOR": "RUTA"}, inplace=True)
+        
+        # Verificar que las columnas existan
+        columnas_existentes = [col for col in columnas_finales if col in df.columns]
+        df = df[columnas_existentes].copy()
+        
+        # Procesar datos
+        df["Tiempo en PDV"] = df["Tiempo en PDV"].fillna("")
+        df["Columna1"] = np.where(df['Tiempo en PDV'] == "", 0, 1)
+        df.rename(columns={"Foto": "Columna2"}, inplace=True)
+        df["MES"] = mes
+        
+        return df
+    
     def apilar_efectividad(self):
         """Apila todos los archivos de efectividad por mes"""
         print("\n📊 Procesando EFECTIVIDAD...")
@@ -217,68 +490,13 @@ class ProcesadorDatos:
             return None
         
         try:
-            archivos = glob.glob(str(self.rutas['efectividad'] / "Efectividad*.xlsx"))
+            archivos = self._archivos_fuente('efectividad')
             
             if not archivos:
                 print("⚠️  No se encontraron archivos de efectividad")
                 return None
             
-            lista_dfs = []
-            
-            for archivo in archivos:
-                try:
-                    df = pd.read_excel(archivo, sheet_name="Efectividad")
-                    mes = self.extraer_mes_archivo(archivo)
-                    
-                    if mes is None:
-                        continue
-                    
-                    # Merge con personal (promotor)
-                    df = pd.merge(
-                        df, 
-                        self.df_personal_original.rename(columns={"RUTA": "RUTA_PROMOTOR"}),
-                        left_on="Usuario Promotor", 
-                        right_on="Usuario APP", 
-                        how="left"
-                    )
-                    df.drop("Usuario APP", axis=1, inplace=True)
-                    
-                    # Merge con personal (supervisor)
-                    df = pd.merge(
-                        df,
-                        self.df_personal_original.rename(columns={"RUTA": "ID_SUP", "Usuario APP": "Usuario APP_SUP"}),
-                        left_on="Usuario Supervisor",
-                        right_on="Usuario APP_SUP",
-                        how="left"
-                    )
-                    df.drop("Usuario APP_SUP", axis=1, inplace=True)
-                    
-                    # Renombrar y seleccionar columnas
-                    df.rename(columns={"RUTA_PROMOTOR": "RUTA"}, inplace=True)
-                    
-                    columnas_finales = [
-                        'Fecha', 'Primer Nivel Geográfico', 'Zona', 'Usuario Coordinador',
-                        'Coordinador', 'Usuario Supervisor', 'ID_SUP', 'Supervisor',
-                        'Usuario Promotor', 'RUTA', 'Personal Promotor', 'Tienda',
-                        'Cadena', 'Formato', 'Canal de Distribución', 'Tipo de Tienda',
-                        'Check IN', 'Check OUT', 'Tiempo en PDV', 'Foto'
-                    ]
-                    
-                    # Verificar que las columnas existan
-                    columnas_existentes = [col for col in columnas_finales if col in df.columns]
-                    df = df[columnas_existentes].copy()
-                    
-                    # Procesar datos
-                    df["Tiempo en PDV"] = df["Tiempo en PDV"].fillna("")
-                    df["Columna1"] = np.where(df['Tiempo en PDV'] == "", 0, 1)
-                    df.rename(columns={"Foto": "Columna2"}, inplace=True)
-                    df["MES"] = mes
-                    
-                    lista_dfs.append(df)
-                    
-                except Exception as e:
-                    print(f"⚠️  Error procesando {os.path.basename(archivo)}: {e}")
-                    continue
+            lista_dfs = self._apilar_meses('efectividad', archivos)
             
             if lista_dfs:
                 df_final = pd.concat(lista_dfs, ignore_index=True)
@@ -292,6 +510,24 @@ class ProcesadorDatos:
             print(f"❌ Error en apilar_efectividad: {e}")
             return None
     
+    def _procesar_fi(self, archivo, mes):
+        """Lee los Focos de Implementación de un mes y los cruza con el personal original"""
+        df = self.cache.leer_excel(archivo, sheet_name="EJECUCION_TAREAS")
+        
+        # Merge con personal
+        df = pd.merge(
+            df,
+            self.df_personal_original,
+            left_on="Usuario Promotor",
+            right_on="Usuario APP",
+            how="left"
+        )
+        
+        df.drop("Usuario APP", axis=1, inplace=True)
+        df["MES"] = mes
+        
+        return df
+    
     def apilar_fi(self):
         """Apila todos los archivos de Focos de Implementación por mes"""
         print("\n🎯 Procesando FOCOS DE IMPLEMENTACIÓN...")
@@ -301,39 +537,13 @@ class ProcesadorDatos:
             return None
         
         try:
-            archivos = glob.glob(str(self.rutas['fi'] / "FI*.xlsx"))
+            archivos = self._archivos_fuente('fi')
             
             if not archivos:
                 print("⚠️  No se encontraron archivos FI")
                 return None
             
-            lista_dfs = []
-            
-            for archivo in archivos:
-                try:
-                    df = pd.read_excel(archivo, sheet_name="EJECUCION_TAREAS")
-                    mes = self.extraer_mes_archivo(archivo)
-                    
-                    if mes is None:
-                        continue
-                    
-                    # Merge con personal
-                    df = pd.merge(
-                        df,
-                        self.df_personal_original,
-                        left_on="Usuario Promotor",
-                        right_on="Usuario APP",
-                        how="left"
-                    )
-                    
-                    df.drop("Usuario APP", axis=1, inplace=True)
-                    df["MES"] = mes
-                    
-                    lista_dfs.append(df)
-                    
-                except Exception as e:
-                    print(f"⚠️  Error procesando {os.path.basename(archivo)}: {e}")
-                    continue
+            lista_dfs = self._apilar_meses('fi', archivos)
             
             if lista_dfs:
                 df_final = pd.concat(lista_dfs, ignore_index=True)
@@ -347,6 +557,81 @@ class ProcesadorDatos:
             print(f"❌ Error en apilar_fi: {e}")
             return None
     
+    def apilar_en_paralelo(self, max_workers=None):
+        """
+        Procesa todas las fuentes en un pool de procesos, un archivo mensual por tarea
+        
+        Args:
+            max_workers: Número de procesos. Si es None, usa todos los núcleos
+            
+        Returns:
+            Diccionario fuente -> DataFrame apilado (o None), incluyendo 'ventas'
+        """
+        print("\n⚡ Procesando fuentes en paralelo...")
+        
+        etiquetas = {
+            'fi': "FI apilados",
+            'efectividad': "Efectividad apilada",
+            'rutero': "Ruteros apilados",
+            'personal': "Personal apilado"
+        }
+        
+        planes = {}
+        resultados = {}
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futuros = {}
+            
+            for fuente, (_, metodo) in self.FUENTES.items():
+                archivos = self._archivos_fuente(fuente)
+                if not archivos:
+                    print(f"⚠️  No se encontraron archivos de {fuente}")
+                    continue
+                
+                planes[fuente] = self._planificar_meses(fuente, archivos)
+                for i, (archivo, mes, _, df) in enumerate(planes[fuente]):
+                    if df is None:
+                        futuro = executor.submit(_ejecutar_en_proceso, getattr(self, metodo), archivo, mes)
+                        futuros[futuro] = (fuente, i)
+            
+            futuro_ventas = executor.submit(_ejecutar_en_proceso, self.procesar_ventas)
+            futuros[futuro_ventas] = ('ventas', None)
+            
+            for futuro in as_completed(futuros):
+                fuente, i = futuros[futuro]
+                try:
+                    resultado, error, estadisticas = futuro.result()
+                except Exception as e:
+                    resultado, error, estadisticas = None, str(e), (0, 0, 0)
+                
+                self.cache.acumular(*estadisticas)
+                
+                if fuente == 'ventas':
+                    if error:
+                        print(f"❌ Error en procesar_ventas: {error}")
+                    resultados['ventas'] = resultado
+                    continue
+                
+                archivo, mes, firma, _ = planes[fuente][i]
+                if error:
+                    print(f"⚠️  Error procesando {os.path.basename(archivo)}: {error}")
+                    continue
+                
+                planes[fuente][i][3] = resultado
+                self.manifiesto.registrar(fuente, archivo, firma, resultado)
+        
+        # Apilar en el orden original de los archivos
+        for fuente, plan in planes.items():
+            lista_dfs = [df for _, _, _, df in plan if df is not None]
+            
+            if lista_dfs:
+                resultados[fuente] = pd.concat(lista_dfs, ignore_index=True)
+                print(f"✓ {etiquetas[fuente]}: {len(resultados[fuente])} registros de {len(lista_dfs)} archivos")
+            else:
+                print(f"❌ No se pudieron procesar archivos de {fuente}")
+        
+        return resultados
+    
     def procesar_ventas(self):
         """Procesa y acondiciona los datos de ventas"""
         print("\n💰 Procesando VENTAS...")
@@ -358,7 +643,7 @@ class ProcesadorDatos:
                 print(f"❌ No se encontró {archivo_ventas}")
                 return None
             
-            df_origen = pd.read_excel(archivo_ventas)
+            df_origen = self.cache.leer_excel(archivo_ventas)
             
             # Filtrar columnas Act y Last
             columnas_act = [col for col in df_origen.columns 
@@ -408,14 +693,15 @@ class ProcesadorDatos:
             archivo_rutero = self.buscar_archivo('Rutero', self.ruta_base)
             
             if archivo_rutero:
-                df_rut = pd.read_excel(archivo_rutero, sheet_name='RUTERO', skiprows=4)
-                
                 columnas_rutero = [
                     "ID_TIENDA", "Usuario Virtual", "Usuario APP Promotor",
                     "Area Nielsen", "Estado", "Canal de Distribución",
                     "Cadena", "Formato", "Nombre de Tienda"
                 ]
                 
+                df_rut = self.cache.leer_excel(
+                    archivo_rutero, sheet_name=HOJA_RUTERO, skiprows=FILAS_TITULO, columnas=columnas_rutero
+                )
                 df_rut = df_rut[columnas_rutero].copy()
                 
                 df_ventas_rutero = pd.merge(
@@ -445,28 +731,45 @@ class ProcesadorDatos:
             print(f"❌ Error en procesar_ventas: {e}")
             return None
     
-    def generar_archivo_consolidado(self, nombre_salida="ACUMULADO MESES.xlsx"):
+    def generar_archivo_consolidado(self, nombre_salida="ACUMULADO MESES.xlsx", incremental=True,
+                                    paralelo=False, max_workers=None, sidecar=None):
         """
         Ejecuta todo el proceso y genera el archivo consolidado
         
         Args:
             nombre_salida: Nombre del archivo de salida
+            incremental: Si es True solo se procesan los meses nuevos o modificados;
+                         si es False se reconstruyen todos los meses
+            paralelo: Si es True procesa fuentes y archivos en un pool de procesos
+            max_workers: Número de procesos del modo paralelo (None = todos los núcleos)
+            sidecar: 'parquet' o 'csv' para dejar cada hoja también en ese formato (Power BI)
         """
         print("=" * 60)
         print("🚀 INICIANDO PROCESAMIENTO DE DATOS")
         print("=" * 60)
         
+        if not incremental:
+            self.manifiesto.limpiar()
+        
         # Cargar personal original primero
         if not self.cargar_personal_original():
             print("❌ No se pudo cargar personal original. Abortando.")
             return False
         
         # Procesar cada tipo de archivo
-        df_fi = self.apilar_fi()
-        df_efectividad = self.apilar_efectividad()
-        df_rutero = self.apilar_ruteros()
-        df_personal = self.apilar_personal()
-        df_ventas = self.procesar_ventas()
+        if paralelo:
+            resultados = self.apilar_en_paralelo(max_workers)
+            df_fi = resultados.get('fi')
+            df_efectividad = resultados.get('efectividad')
+            df_rutero = resultados.get('rutero')
+            df_personal = resultados.get('personal')
+            df_ventas = resultados.get('ventas')
+        else:
+            df_fi = self.apilar_fi()
+            df_efectividad = self.apilar_efectividad()
+            df_rutero = self.apilar_ruteros()
+            df_personal = self.apilar_personal()
+            df_ventas = self.procesar_ventas()
         
         # Verificar que al menos tengamos algunos datos
         dfs_disponibles = {
@@ -479,6 +782,10 @@ class ProcesadorDatos:
         
         dfs_validos = {k: v for k, v in dfs_disponibles.items() if v is not None}
         
+        self.manifiesto.guardar()
+        self.manifiesto.reportar()
+        self.cache.reportar()
+        
         if not dfs_validos:
             print("\n❌ No se generaron datos válidos. Abortando.")
             return False
@@ -489,10 +796,19 @@ class ProcesadorDatos:
         try:
             ruta_salida = self.ruta_base / nombre_salida
             
-            with pd.ExcelWriter(ruta_salida, engine='openpyxl') as writer:
+            # Escritura en streaming: las filas van directo a disco
+            with EscritorExcelStreaming(ruta_salida, sidecar=sidecar) as escritor:
                 for nombre_hoja, df in dfs_validos.items():
-                    df.to_excel(writer, sheet_name=nombre_hoja, index=False)
-                    print(f"  ✓ Hoja '{nombre_hoja}' creada con {len(df)} registros")
+                    try:
+                        filas = escritor.escribir_hoja(nombre_hoja, df)
+                    except ErrorSidecar as e:
+                        # La hoja de Excel sí quedó completa; solo falta su sidecar
+                        print(f"  ⚠️  {e} (se borró el archivo a medias)")
+                        filas = len(df)
+                    print(f"  ✓ Hoja '{nombre_hoja}' creada con {filas} registros")
+            
+            for archivo in escritor.archivos_sidecar:
+                print(f"  ✓ Sidecar para Power BI: {archivo.name}")
             
             print("\n" + "=" * 60)
             print(f"✅ ARCHIVO CREADO EXITOSAMENTE: {nombre_salida}")
@@ -517,6 +833,12 @@ if __name__ == "__main__":
     # Opción 2: Usar directorio actual (más portable)
     RUTA_BASE = None  # Cambia a None para usar el directorio actual
     
+    # Procesar fuentes y archivos en paralelo (un proceso por archivo); True para activarlo
+    PARALELO = False
+    
+    # Copia de cada hoja para Power BI: 'parquet', 'csv' o None
+    SIDECAR = None
+    
     # Crear procesador y ejecutar
     procesador = ProcesadorDatos(RUTA_BASE)
-    procesador.generar_archivo_consolidado()
\ No newline at end of file
+    procesador.generar_archivo_consolidado(paralelo=PARALELO, sidecar=SIDECAR)
\ No newline at end of file
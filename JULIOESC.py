@@ -2,48 +2,28 @@ import pandas as pd
 import numpy as np
 import os as os
 import random 
+from rutero import buscar_rutero, RuteroIndexado
 
 totales={}
 
 RUTA=r"C:\\Users\\lapmxdf558\\Documents\\JUAN\\BONOS PY\\JULIOESC\\"
 
-#CARGAR RUTERO
-archivos = [f for f in os.listdir(RUTA) if 'Rutero' in f]
-if archivos:
-    archivo_rutero = os.path.join(RUTA, archivos[0])
-    dfrut = pd.read_excel(archivo_rutero, sheet_name='RUTERO',skiprows=4)
-    palabra=archivo_rutero.replace(RUTA,"")
-    print("Archivo cargado:", palabra)
-else:
-    print("No se encontró ningún archivo con 'Rutero' en el nombre.")
+#CARGAR RUTERO (EL PROGRAMA SE DESPIVOTEA UNA SOLA VEZ PARA LAS 5 SEMANAS)
+CFIJAS=["Usuario Virtual","Nombre de Tienda"]
 
-dfrut["CLIENTE"]="BIC"
-
-CFIJAS=["Usuario Virtual","Usuario APP Promotor","Zona - Region","Codigo RO","Nombre de Tienda"]
+archivo_rutero = buscar_rutero(RUTA)
+if archivo_rutero:
+    rutero = RuteroIndexado.desde_archivo(archivo_rutero, columnas=CFIJAS)
 
 for i in range(1,6):
-    
-    i=str(i)
-
-    COLVARIABLESS=dfrut.loc[:,f"S{i}-LUNES":f"S{i}-DOMINGO"]
-
-    COLTOT=CFIJAS+list(COLVARIABLESS.columns)
-
-    dfRUTOT=dfrut[COLTOT]
-
-    dfRUTOT=pd.melt(dfRUTOT,CFIJAS,value_name=f"S{i}-VISITAS",var_name="DIA")
-    
-    dfRUTOT["DIA"]=dfRUTOT["DIA"].str.split("-").str[1]
-
-    dfRUTOT[f"S{i}-VISITAS"] = pd.to_numeric(dfRUTOT[f"S{i}-VISITAS"], errors='coerce').fillna(0)
 
-    dfRUTOT=dfRUTOT[dfRUTOT[f"S{i}-VISITAS"]>0]
+    #VISITAS (>0) DE LA SEMANA, EN EL MISMO ORDEN QUE EL MELT POR DIA
+    dfRUTOT=rutero.programa_semana(i, CFIJAS)
 
-    dfRUTOT=dfRUTOT[["Usuario Virtual","Nombre de Tienda",f"S{i}-VISITAS","DIA"]]
     dfRUTOT=dfRUTOT.rename(columns={
         "Usuario Virtual":"Promotor",
         "Nombre de Tienda":"Tienda",
-        f"S{i}-VISITAS":"un",
+        "VISITAS":"un",
         "DIA":"Dia"
     })
 
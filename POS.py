@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 import os as oss
+from rutero import buscar_rutero, cargar_rutero
 
 RUTA=r"C:\\Users\\lapmxdf558\\Documents\\JUAN\\BONOS PY\\POS\\"
 archivo="ventas_plantilla.xlsx"
@@ -54,18 +55,14 @@ else:
     print(f"UN {1-IX:,.2%} POR DEBAJO DEL AÑO PASADO")
 
 
-#CARGAR RUTERO
-archivos = [f for f in oss.listdir(RUTA) if 'Rutero' in f]
-if archivos:
-    archivo_rutero = oss.path.join(RUTA, archivos[0])
-    dfrut = pd.read_excel(archivo_rutero, sheet_name='RUTERO',skiprows=4)
-    palabra=archivo_rutero.replace(RUTA,"")
-    print("Archivo cargado:", palabra)
-else:
-    print("No se encontró ningún archivo con 'Rutero' en el nombre.")
+#CARGAR RUTERO (SOLO LAS COLUMNAS QUE SE CRUZAN)
+COLRUTERO=["ID_TIENDA","Usuario Virtual","Usuario APP Promotor","Area Nielsen","Estado","Canal de Distribución","Cadena","Formato"]
+archivo_rutero = buscar_rutero(RUTA)
+if archivo_rutero:
+    dfrut = cargar_rutero(archivo_rutero, columnas=COLRUTERO)
 
 #CRUZAR RUTERO POR TIENDA 
-dfrut=dfrut[["ID_TIENDA","Usuario Virtual","Usuario APP Promotor","Area Nielsen","Estado","Canal de Distribución","Cadena","Formato"]]
+dfrut=dfrut[COLRUTERO]
 dfVENTASxRUTERO=pd.merge(dfCONSOLIDADO,dfrut,on="ID_TIENDA",how="inner")
 
 TIENDAS_s_COINCIDENCIA=(len(dfCONSOLIDADO)-len(dfVENTASxRUTERO))/12
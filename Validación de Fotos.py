@@ -6,15 +6,184 @@ Lee un archivo Excel, busca la columna de fotos selfie y valida si hay personas
 import cv2
 import pandas as pd
 import requests
-from io import BytesIO
 import numpy as np
 from datetime import datetime
+import hashlib
+import json
 import os
+import sqlite3
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-class ValidadorFotosSelfie:
-    def __init__(self):
-        """Inicializa múltiples detectores para mayor precisión"""
+# ===================== CONFIGURACIÓN DE DESCARGAS =====================
+DESCARGA_PARALELA = True     # Descargar en paralelo mientras se detecta
+DESCARGAS_SIMULTANEAS = 16   # Descargas en vuelo en total
+DESCARGAS_POR_HOST = 6       # Máximo de descargas simultáneas a un mismo servidor
+REINTENTOS = 3               # Reintentos por descarga (errores de conexión, 429 y 5xx)
+ESPERA_REINTENTO = 0.5       # Backoff exponencial entre reintentos: 0.5 s, 1 s, 2 s...
+TIMEOUT_DESCARGA = 10        # Segundos
+
+# ===================== CONFIGURACIÓN DE DETECCIÓN =====================
+DETECCION_PARALELA = True    # Detectar en varios procesos (uno por núcleo)
+PROCESOS_DETECCION = None    # None = número de CPUs
+LOTE_DETECCION = 4           # Fotos por envío a cada proceso
+MODO_DETECCION = 'completo'  # 'completo' (4 pasadas a resolución original) o 'rapido'
+
+# ===================== CONFIGURACIÓN DEL CACHÉ =====================
+CACHE_RESULTADOS = True                       # Reutilizar resultados de corridas anteriores
+ARCHIVO_CACHE = '.cache_validacion_fotos.sqlite'  # Se crea junto al Excel
+CACHE_MAX_ENTRADAS = 500_000                  # Fotos guardadas antes de desalojar las menos usadas
+CACHE_MAX_DIAS = 120                          # Se desalojan las fotos sin usar en este tiempo
+
+# ===================== CONFIGURACIÓN DE CHECKPOINTS =====================
+REANUDAR = True              # Retomar una corrida interrumpida sin repetir las filas ya validadas
+CHECKPOINT_CADA = 25         # Filas entre escrituras del checkpoint
+
+
+def decodificar_imagen(contenido):
+    """Convierte los bytes descargados en imagen OpenCV (None si no se puede)"""
+    if not contenido:
+        return None
+    return cv2.imdecode(np.frombuffer(contenido, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+class DescargadorFotos:
+    """Descargas concurrentes sobre una sesión HTTP que reutiliza conexiones"""
+    
+    def __init__(self, max_descargas=DESCARGAS_SIMULTANEAS, max_por_host=DESCARGAS_POR_HOST,
+                 reintentos=REINTENTOS, espera_reintento=ESPERA_REINTENTO, timeout=TIMEOUT_DESCARGA):
+        """
+        Args:
+            max_descargas: Descargas simultáneas en total (hilos del pool)
+            max_por_host: Descargas simultáneas como máximo a un mismo servidor
+            reintentos: Reintentos ante errores de conexión, 429 y 5xx
+            espera_reintento: Factor del backoff exponencial entre reintentos (segundos)
+            timeout: Timeout de cada petición (segundos)
+        """
+        self.max_descargas = max_descargas
+        self.max_por_host = max_por_host
+        self.timeout = timeout
+        
+        # Una sola sesión: las conexiones TCP/TLS se reutilizan entre descargas
+        self.sesion = requests.Session()
+        reintento = Retry(
+            total=reintentos,
+            backoff_factor=espera_reintento,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET']),
+            raise_on_status=False
+        )
+        adaptador = HTTPAdapter(pool_connections=max_descargas, pool_maxsize=max_descargas, max_retries=reintento)
+        self.sesion.mount('http://', adaptador)
+        self.sesion.mount('https://', adaptador)
+        
+        self._semaforos = {}
+        self._candado = threading.Lock()
+        
+        self.descargadas = 0
+        self.fallidas = 0
+        self.bytes_descargados = 0
+    
+    def _semaforo_host(self, url):
+        """Semáforo que limita las descargas simultáneas a un servidor"""
+        host = urlparse(url).netloc
+        with self._candado:
+            if host not in self._semaforos:
+                self._semaforos[host] = threading.BoundedSemaphore(self.max_por_host)
+            return self._semaforos[host]
+    
+    def descargar(self, url):
+        """
+        Descarga una URL con reintentos
+        
+        Returns:
+            Contenido en bytes o None si falló
+        """
+        try:
+            with self._semaforo_host(url):
+                respuesta = self.sesion.get(url, timeout=self.timeout)
+                respuesta.raise_for_status()
+                contenido = respuesta.content
+        except Exception:
+            with self._candado:
+                self.fallidas += 1
+            return None
+        
+        with self._candado:
+            self.descargadas += 1
+            self.bytes_descargados += len(contenido)
+        return contenido
+    
+    def descargar_muchas(self, tareas):
+        """
+        Descarga en paralelo con un número acotado de descargas en vuelo
+        
+        Args:
+            tareas: Iterable de (clave, url)
+        
+        Yields:
+            (clave, bytes o None) en el orden en que van terminando
+        """
+        tareas = iter(tareas)
+        limite = self.max_descargas * 2  # Un poco de cola para que los hilos no esperen
+        en_vuelo = {}
+        
+        with ThreadPoolExecutor(max_workers=self.max_descargas) as executor:
+            def lanzar():
+                for clave, url in tareas:
+                    en_vuelo[executor.submit(self.descargar, url)] = clave
+                    if len(en_vuelo) >= limite:
+                        break
+            
+            lanzar()
+            while en_vuelo:
+                terminadas, _ = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                for futuro in terminadas:
+                    yield en_vuelo.pop(futuro), futuro.result()
+                lanzar()
+    
+    def cerrar(self):
+        """Cierra las conexiones de la sesión"""
+        self.sesion.close()
+
+
+class DetectorRostros:
+    """Cascadas Haar de rostro frontal, frontal alternativo y perfil"""
+    
+    ESCALA = 1.05                 # Más sensible (antes 1.1)
+    TAMANO_MINIMO = (20, 20)      # Acepta rostros más pequeños
+    VECINOS = {
+        'frontal': 3,             # Menos estricto (antes 5)
+        'alt': 2,                 # Muy sensible
+        'perfil': 3
+    }
+    
+    # Modo rápido: imagen de trabajo acotada, pasos de escala más grandes y la pasada
+    # frontal primero; si encuentra un rostro seguro no se corren las demás
+    MODOS = {
+        'completo': 'Múltiple (mejorado)',
+        'rapido': 'Rápido (frontal primero)'
+    }
+    LADO_MAXIMO_RAPIDO = 640      # Lado mayor de la imagen de trabajo (px)
+    FRACCION_ROSTRO_RAPIDO = 16   # Rostro mínimo: lado menor de la imagen de trabajo / 16
+    ESCALA_RAPIDA = 1.1
+    VECINOS_CONFIANZA = 8         # Vecinos de la pasada frontal para dar el rostro por seguro
+    
+    def __init__(self, modo=MODO_DETECCION):
+        """
+        Inicializa múltiples detectores para mayor precisión
+        
+        Args:
+            modo: 'completo' o 'rapido'
+        """
+        if modo not in self.MODOS:
+            raise ValueError(f"Modo inválido '{modo}'. Use uno de: {', '.join(self.MODOS)}")
+        self.modo = modo
+        
         # Detector principal (rostros frontales)
         cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
         self.detector_frontal = cv2.CascadeClassifier(cascade_path)
@@ -27,23 +196,44 @@ class ValidadorFotosSelfie:
         profile_cascade = cv2.data.haarcascades + 'haarcascade_profileface.xml'
         self.detector_perfil = cv2.CascadeClassifier(profile_cascade)
     
-    def descargar_imagen_desde_url(self, url):
-        """Descarga una imagen desde una URL"""
-        try:
-            # Agregar timeout para evitar esperas largas
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            
-            # Convertir a imagen OpenCV
-            imagen_bytes = BytesIO(response.content)
-            imagen_array = np.asarray(bytearray(imagen_bytes.read()), dtype=np.uint8)
-            imagen = cv2.imdecode(imagen_array, cv2.IMREAD_COLOR)
-            
-            return imagen
-        except Exception as e:
-            return None
+    @property
+    def metodo(self):
+        """Nombre del método para la columna Metodo_Deteccion"""
+        return self.MODOS[self.modo]
     
-    def detectar_personas_en_imagen(self, imagen):
+    def parametros(self):
+        """Parámetros de la detección (un resultado guardado solo sirve con los mismos)"""
+        parametros = {
+            'metodo': self.metodo,
+            'escala': self.ESCALA,
+            'tamano_minimo': list(self.TAMANO_MINIMO),
+            'vecinos': self.VECINOS,
+            'opencv': cv2.__version__
+        }
+        if self.modo == 'rapido':
+            parametros.update({
+                'escala': self.ESCALA_RAPIDA,
+                'lado_maximo': self.LADO_MAXIMO_RAPIDO,
+                'fraccion_rostro': self.FRACCION_ROSTRO_RAPIDO,
+                'vecinos_confianza': self.VECINOS_CONFIANZA
+            })
+        return parametros
+    
+    def _reducir(self, gris):
+        """
+        Reduce la imagen para que su lado mayor no pase de LADO_MAXIMO_RAPIDO
+        
+        Returns:
+            (imagen de trabajo, factor para regresar las coordenadas a la original)
+        """
+        lado = max(gris.shape[:2])
+        if lado <= self.LADO_MAXIMO_RAPIDO:
+            return gris, 1.0
+        factor = lado / self.LADO_MAXIMO_RAPIDO
+        tamano = (round(gris.shape[1] / factor), round(gris.shape[0] / factor))
+        return cv2.resize(gris, tamano, interpolation=cv2.INTER_AREA), factor
+    
+    def detectar(self, imagen):
         """Detecta personas en una imagen usando múltiples métodos"""
         if imagen is None:
             return {"personas": 0, "detectado": False, "error": "Imagen no válida"}
@@ -52,28 +242,42 @@ class ValidadorFotosSelfie:
             # Convertir a escala de grises
             gris = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
             
+            rapido = self.modo == 'rapido'
+            escala = self.ESCALA_RAPIDA if rapido else self.ESCALA
+            factor = 1.0
+            tamano_minimo = self.TAMANO_MINIMO
+            if rapido:
+                # En una selfie el rostro ocupa buena parte de la foto: no se buscan rostros diminutos
+                gris, factor = self._reducir(gris)
+                lado_rostro = max(self.TAMANO_MINIMO[0], min(gris.shape[:2]) // self.FRACCION_ROSTRO_RAPIDO)
+                tamano_minimo = (lado_rostro, lado_rostro)
+            
             # Mejorar contraste para mejor detección
             gris = cv2.equalizeHist(gris)
             
             rostros_encontrados = set()
             
             # Método 1: Detector frontal estándar (más estricto)
-            rostros1 = self.detector_frontal.detectMultiScale(
+            rostros1, vecinos1 = self.detector_frontal.detectMultiScale2(
                 gris,
-                scaleFactor=1.05,  # Más sensible (antes 1.1)
-                minNeighbors=3,     # Menos estricto (antes 5)
-                minSize=(20, 20),   # Acepta rostros más pequeños
+                scaleFactor=escala,
+                minNeighbors=self.VECINOS['frontal'],
+                minSize=tamano_minimo,
                 flags=cv2.CASCADE_SCALE_IMAGE
             )
             for (x, y, w, h) in rostros1:
                 rostros_encontrados.add((x, y, w, h))
             
+            # Modo rápido: un rostro frontal con muchos vecinos basta, se omiten las demás pasadas
+            if rapido and len(vecinos1) > 0 and max(vecinos1) >= self.VECINOS_CONFIANZA:
+                return self._resultado(rostros_encontrados, factor)
+            
             # Método 2: Detector alternativo (más sensible)
             rostros2 = self.detector_alt.detectMultiScale(
                 gris,
-                scaleFactor=1.05,
-                minNeighbors=2,     # Muy sensible
-                minSize=(20, 20),
+                scaleFactor=escala,
+                minNeighbors=self.VECINOS['alt'],
+                minSize=tamano_minimo,
                 flags=cv2.CASCADE_SCALE_IMAGE
             )
             for (x, y, w, h) in rostros2:
@@ -84,9 +288,9 @@ class ValidadorFotosSelfie:
             # Método 3: Detector de perfil (izquierda)
             rostros3 = self.detector_perfil.detectMultiScale(
                 gris,
-                scaleFactor=1.05,
-                minNeighbors=3,
-                minSize=(20, 20)
+                scaleFactor=escala,
+                minNeighbors=self.VECINOS['perfil'],
+                minSize=tamano_minimo
             )
             for (x, y, w, h) in rostros3:
                 if not self._es_duplicado((x, y, w, h), rostros_encontrados):
@@ -96,9 +300,9 @@ class ValidadorFotosSelfie:
             gris_flip = cv2.flip(gris, 1)
             rostros4 = self.detector_perfil.detectMultiScale(
                 gris_flip,
-                scaleFactor=1.05,
-                minNeighbors=3,
-                minSize=(20, 20)
+                scaleFactor=escala,
+                minNeighbors=self.VECINOS['perfil'],
+                minSize=tamano_minimo
             )
             ancho_img = gris.shape[1]
             for (x, y, w, h) in rostros4:
@@ -107,48 +311,559 @@ class ValidadorFotosSelfie:
                 if not self._es_duplicado((x_real, y, w, h), rostros_encontrados):
                     rostros_encontrados.add((x_real, y, w, h))
             
-            num_personas = len(rostros_encontrados)
-            
-            return {
-                "personas": num_personas,
-                "detectado": num_personas > 0,
-                "error": None,
-                "rostros": list(rostros_encontrados)
-            }
+            return self._resultado(rostros_encontrados, factor)
         except Exception as e:
             return {"personas": 0, "detectado": False, "error": str(e)}
     
+    @staticmethod
+    def _resultado(rostros_encontrados, factor):
+        """Resultado de la detección con los rostros en coordenadas de la imagen original"""
+        num_personas = len(rostros_encontrados)
+        
+        return {
+            "personas": num_personas,
+            "detectado": num_personas > 0,
+            "error": None,
+            "rostros": [tuple(int(round(v * factor)) for v in rostro) for rostro in rostros_encontrados]
+        }
+    
     def _es_duplicado(self, nuevo_rostro, rostros_existentes, umbral=0.3):
-        """Verifica si un rostro ya fue detectado (evita duplicados)"""
-        x1, y1, w1, h1 = nuevo_rostro
-        
-        for (x2, y2, w2, h2) in rostros_existentes:
-            # Calcular superposición
-            x_izq = max(x1, x2)
-            y_arr = max(y1, y2)
-            x_der = min(x1 + w1, x2 + w2)
-            y_aba = min(y1 + h1, y2 + h2)
-            
-            if x_der > x_izq and y_aba > y_arr:
-                area_interseccion = (x_der - x_izq) * (y_aba - y_arr)
-                area1 = w1 * h1
-                area2 = w2 * h2
-                area_union = area1 + area2 - area_interseccion
-                
-                iou = area_interseccion / area_union if area_union > 0 else 0
-                
-                if iou > umbral:
-                    return True
+        """Verifica si un rostro ya fue detectado (evita duplicados), contra todos a la vez"""
+        if not rostros_existentes:
+            return False
+        
+        x1, y1, w1, h1 = (int(v) for v in nuevo_rostro)
+        existentes = np.array(list(rostros_existentes), dtype=np.int64)
+        x2, y2, w2, h2 = existentes.T
+        
+        # Calcular superposición
+        ancho = np.minimum(x1 + w1, x2 + w2) - np.maximum(x1, x2)
+        alto = np.minimum(y1 + h1, y2 + h2) - np.maximum(y1, y2)
+        se_cruzan = (ancho > 0) & (alto > 0)
+        
+        area_interseccion = np.where(se_cruzan, ancho * alto, 0)
+        area_union = w1 * h1 + w2 * h2 - area_interseccion
+        iou = np.divide(area_interseccion, area_union, out=np.zeros(len(existentes)), where=area_union > 0)
+        
+        return bool(np.any(se_cruzan & (iou > umbral)))
+
+
+# ===================== DETECCIÓN EN VARIOS PROCESOS =====================
+
+# Detector del proceso de trabajo: los clasificadores se cargan una sola vez por proceso
+_detector_proceso = None
+
+
+def _inicializar_detector(modo):
+    """Initializer del pool: carga las cascadas una vez por proceso"""
+    global _detector_proceso
+    cv2.setNumThreads(1)  # Un hilo de OpenCV por proceso; el paralelismo lo dan los procesos
+    _detector_proceso = DetectorRostros(modo)
+
+
+def _detectar_lote(lote):
+    """
+    Decodifica y detecta un lote de fotos en el proceso de trabajo
+    
+    Args:
+        lote: Lista de (clave, bytes de la imagen)
+    
+    Returns:
+        Lista de (clave, resultado de detectar o None si la imagen no se pudo decodificar)
+    """
+    resultados = []
+    for clave, contenido in lote:
+        imagen = decodificar_imagen(contenido)
+        resultados.append((clave, None if imagen is None else _detector_proceso.detectar(imagen)))
+    return resultados
+
+
+def detectar_en_paralelo(tareas, procesos=PROCESOS_DETECCION, tamano_lote=LOTE_DETECCION, modo=MODO_DETECCION):
+    """
+    Detecta rostros en varios procesos conforme van llegando las fotos
+    
+    Las fotos viajan a los procesos como bytes comprimidos (JPEG) y se decodifican allá:
+    pesan mucho menos que la imagen decodificada y la decodificación también se reparte
+    
+    Args:
+        tareas: Iterable de (clave, bytes o None si no se pudo descargar)
+        procesos: Procesos de detección. Si es None uno por CPU
+        tamano_lote: Fotos por envío a cada proceso
+        modo: Modo de detección ('completo' o 'rapido')
+    
+    Yields:
+        (clave, resultado de detectar o None) en el orden en que van terminando
+    """
+    procesos = procesos or os.cpu_count() or 1
+    limite = procesos * 2  # Lotes en vuelo: los procesos nunca esperan al siguiente
+    en_vuelo = set()
+    lote = []
+    
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_detector,
+                             initargs=(modo,)) as executor:
+        for clave, contenido in tareas:
+            if contenido is None:
+                yield clave, None
+                continue
+            
+            lote.append((clave, contenido))
+            if len(lote) >= tamano_lote:
+                en_vuelo.add(executor.submit(_detectar_lote, lote))
+                lote = []
+            
+            # Entregar lo que ya terminó y esperar si hay demasiados lotes en vuelo
+            terminados, en_vuelo = wait(en_vuelo, timeout=0)
+            while len(en_vuelo) >= limite:
+                mas, en_vuelo = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                terminados |= mas
+            for futuro in terminados:
+                yield from futuro.result()
         
-        return False
+        if lote:
+            en_vuelo.add(executor.submit(_detectar_lote, lote))
+        while en_vuelo:
+            terminados, en_vuelo = wait(en_vuelo, return_when=FIRST_COMPLETED)
+            for futuro in terminados:
+                yield from futuro.result()
+
+
+# ===================== CACHÉ DE RESULTADOS =====================
+
+class CacheDeteccion:
+    """
+    Caché persistente (SQLite) de resultados de detección
     
-    def procesar_excel(self, ruta_excel, nombre_columna="Foto Selfie (Obligatoria)"):
+    Cada resultado se guarda por hash del contenido de la foto y parámetros de detección;
+    además se recuerda qué hash tiene cada URL. Así una URL ya vista no se vuelve a
+    descargar, y una foto repetida con otra URL se descarga pero no se vuelve a detectar
+    """
+    
+    def __init__(self, ruta, parametros, max_entradas=CACHE_MAX_ENTRADAS, max_dias=CACHE_MAX_DIAS):
+        """
+        Abre (o crea) el caché
+        
+        Args:
+            ruta: Archivo SQLite
+            parametros: Parámetros de detección; los resultados de otros parámetros no se usan
+            max_entradas: Fotos guardadas como máximo (se desalojan las menos usadas)
+            max_dias: Días sin usarse tras los que una foto se desaloja
+        """
+        self.ruta = ruta
+        self.parametros = json.dumps(parametros, sort_keys=True)
+        self.max_entradas = max_entradas
+        self.max_dias = max_dias
+        
+        self.conexion = sqlite3.connect(ruta)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        with self.conexion:
+            self.conexion.execute("""
+                CREATE TABLE IF NOT EXISTS resultados (
+                    hash TEXT NOT NULL,
+                    parametros TEXT NOT NULL,
+                    personas INTEGER NOT NULL,
+                    rostros TEXT NOT NULL,
+                    creado REAL NOT NULL,
+                    usado REAL NOT NULL,
+                    PRIMARY KEY (hash, parametros)
+                )""")
+            self.conexion.execute("""
+                CREATE TABLE IF NOT EXISTS urls (
+                    url TEXT PRIMARY KEY,
+                    hash TEXT NOT NULL
+                )""")
+            self.conexion.execute("CREATE INDEX IF NOT EXISTS idx_urls_hash ON urls (hash)")
+            self.conexion.execute("CREATE INDEX IF NOT EXISTS idx_resultados_usado ON resultados (usado)")
+        
+        self.aciertos_url = 0
+        self.aciertos_hash = 0
+        self.fallos = 0
+        self.desalojos = 0
+    
+    @staticmethod
+    def hash_contenido(contenido):
+        """Hash del contenido de la foto"""
+        return hashlib.sha256(contenido).hexdigest()
+    
+    def _leer(self, hash_foto):
+        """Resultado guardado para un hash con los parámetros actuales (None si no hay)"""
+        fila = self.conexion.execute(
+            "SELECT personas, rostros FROM resultados WHERE hash = ? AND parametros = ?",
+            (hash_foto, self.parametros)
+        ).fetchone()
+        if fila is None:
+            return None
+        
+        with self.conexion:
+            self.conexion.execute(
+                "UPDATE resultados SET usado = ? WHERE hash = ? AND parametros = ?",
+                (time.time(), hash_foto, self.parametros)
+            )
+        personas, rostros = fila
+        return {
+            "personas": personas,
+            "detectado": personas > 0,
+            "error": None,
+            "rostros": [tuple(rostro) for rostro in json.loads(rostros)]
+        }
+    
+    def buscar_url(self, url):
+        """
+        Resultado de una URL ya vista (sin descargarla)
+        
+        Returns:
+            Resultado como el de detectar o None si no está
+        """
+        fila = self.conexion.execute("SELECT hash FROM urls WHERE url = ?", (url,)).fetchone()
+        resultado = self._leer(fila[0]) if fila else None
+        if resultado is not None:
+            self.aciertos_url += 1
+        return resultado
+    
+    def buscar_contenido(self, url, hash_foto):
+        """
+        Resultado de una foto ya detectada con otra URL; recuerda el hash de la URL
+        
+        Returns:
+            Resultado como el de detectar o None si no está
+        """
+        resultado = self._leer(hash_foto)
+        if resultado is None:
+            self.fallos += 1
+            return None
+        
+        self.aciertos_hash += 1
+        with self.conexion:
+            self.conexion.execute("INSERT OR REPLACE INTO urls (url, hash) VALUES (?, ?)", (url, hash_foto))
+        return resultado
+    
+    def guardar(self, url, hash_foto, resultado):
+        """Guarda el resultado de una foto (los errores de detección no se guardan)"""
+        if resultado is None or resultado.get('error'):
+            return
+        
+        ahora = time.time()
+        rostros = json.dumps([list(rostro) for rostro in resultado.get('rostros', [])])
+        with self.conexion:
+            self.conexion.execute(
+                "INSERT OR REPLACE INTO resultados (hash, parametros, personas, rostros, creado, usado) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (hash_foto, self.parametros, resultado['personas'], rostros, ahora, ahora)
+            )
+            self.conexion.execute("INSERT OR REPLACE INTO urls (url, hash) VALUES (?, ?)", (url, hash_foto))
+    
+    def desalojar(self):
+        """Elimina las fotos sin usar en max_dias y las menos usadas por encima de max_entradas"""
+        limite = time.time() - self.max_dias * 86400
+        with self.conexion:
+            borradas = self.conexion.execute("DELETE FROM resultados WHERE usado < ?", (limite,)).rowcount
+            borradas += self.conexion.execute("""
+                DELETE FROM resultados WHERE rowid IN (
+                    SELECT rowid FROM resultados ORDER BY usado DESC LIMIT -1 OFFSET ?
+                )""", (self.max_entradas,)).rowcount
+            if borradas:
+                # URLs cuya foto ya no tiene resultado con ningún parámetro
+                self.conexion.execute(
+                    "DELETE FROM urls WHERE hash NOT IN (SELECT hash FROM resultados)"
+                )
+        self.desalojos += borradas
+    
+    def entradas(self):
+        """Fotos guardadas con los parámetros actuales"""
+        return self.conexion.execute(
+            "SELECT COUNT(*) FROM resultados WHERE parametros = ?", (self.parametros,)
+        ).fetchone()[0]
+    
+    def cerrar(self):
+        """Cierra la conexión"""
+        self.conexion.close()
+    
+    def reportar(self):
+        """Muestra aciertos, fallos y desalojos de la corrida"""
+        total = self.aciertos_url + self.aciertos_hash + self.fallos
+        tasa = ((self.aciertos_url + self.aciertos_hash) / total * 100) if total > 0 else 0
+        print(f"\n🗄️  Caché de resultados ({os.path.basename(self.ruta)}):")
+        print(f"   • Aciertos por URL (sin descargar): {self.aciertos_url}")
+        print(f"   • Aciertos por contenido (sin detectar): {self.aciertos_hash}")
+        print(f"   • Fotos nuevas: {self.fallos}")
+        print(f"   • Desalojos: {self.desalojos}")
+        print(f"   • Fotos guardadas: {self.entradas():,}")
+        print(f"   • Tasa de aciertos: {tasa:.1f}%")
+
+
+# ===================== CHECKPOINT DE LA CORRIDA =====================
+
+class CheckpointValidacion:
+    """
+    Resultados por fila guardados mientras avanza la validación (SQLite junto al Excel)
+    
+    Si la corrida se interrumpe, la siguiente retoma desde aquí sin repetir las filas
+    ya validadas; el Excel final se arma con lo guardado
+    """
+    
+    COLUMNAS = ['Personas_Detectadas', 'Tiene_Personas', 'Estado_Validacion', 'Fecha_Validacion', 'Metodo_Deteccion']
+    
+    # Los errores (descarga o detección) no cuentan como terminados: se reintentan al reanudar
+    TERMINADAS = ('validadas_ok', 'sin_personas')
+    
+    def __init__(self, ruta_excel, firma, cada=CHECKPOINT_CADA):
+        """
+        Abre (o crea) el checkpoint del Excel
+        
+        Args:
+            ruta_excel: Ruta al archivo Excel que se valida
+            firma: Identifica la corrida (archivo, columna y parámetros); si cambia se empieza de cero
+            cada: Filas entre escrituras
+        """
+        carpeta, nombre = os.path.split(ruta_excel)
+        self.ruta = os.path.join(carpeta or '.', f".{os.path.splitext(nombre)[0]}.checkpoint.sqlite")
+        self.cada = cada
+        self.pendientes = []
+        
+        self.conexion = sqlite3.connect(self.ruta)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        with self.conexion:
+            self.conexion.execute("CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT)")
+            self.conexion.execute("""
+                CREATE TABLE IF NOT EXISTS filas (
+                    idx INTEGER PRIMARY KEY,
+                    categoria TEXT NOT NULL,
+                    personas INTEGER,
+                    tiene TEXT,
+                    estado TEXT,
+                    fecha TEXT,
+                    metodo TEXT
+                )""")
+            
+            fila = self.conexion.execute("SELECT valor FROM meta WHERE clave = 'firma'").fetchone()
+            if fila is None or fila[0] != firma:
+                # Otro archivo, otra columna u otros parámetros: lo guardado no sirve
+                self.conexion.execute("DELETE FROM filas")
+                self.conexion.execute("INSERT OR REPLACE INTO meta (clave, valor) VALUES ('firma', ?)", (firma,))
+    
+    @staticmethod
+    def firma(ruta_excel, nombre_columna, parametros):
+        """Firma de la corrida: tamaño y fecha del Excel, columna de fotos y parámetros de detección"""
+        stat = os.stat(ruta_excel)
+        return json.dumps({
+            'tamano': stat.st_size,
+            'mtime': stat.st_mtime_ns,
+            'columna': nombre_columna,
+            'parametros': parametros
+        }, sort_keys=True)
+    
+    def terminadas(self):
+        """
+        Filas ya validadas en una corrida anterior
+        
+        Returns:
+            DataFrame indexado por fila con 'categoria' y las columnas de resultados
+        """
+        marcadores = ', '.join('?' * len(self.TERMINADAS))
+        terminadas = pd.read_sql(
+            f"SELECT * FROM filas WHERE categoria IN ({marcadores})", self.conexion,
+            params=self.TERMINADAS, index_col='idx'
+        )
+        terminadas.columns = ['categoria'] + self.COLUMNAS
+        return terminadas
+    
+    def reiniciar(self):
+        """Olvida las filas guardadas para empezar de cero"""
+        with self.conexion:
+            self.conexion.execute("DELETE FROM filas")
+    
+    def guardar(self, df, idx, categoria):
+        """
+        Agrega el resultado de una fila; se escribe cada `cada` filas
+        
+        Args:
+            df: DataFrame de resultados (ya con la fila escrita)
+            idx: Índice de la fila
+            categoria: Contador del resumen al que corresponde ('validadas_ok', 'sin_personas', 'errores')
+        """
+        valores = [df.at[idx, col] for col in self.COLUMNAS]
+        self.pendientes.append((int(idx), categoria, int(valores[0]), *[str(v) for v in valores[1:]]))
+        if len(self.pendientes) >= self.cada:
+            self.confirmar()
+    
+    def confirmar(self):
+        """Escribe las filas pendientes"""
+        if not self.pendientes:
+            return
+        with self.conexion:
+            self.conexion.executemany(
+                "INSERT OR REPLACE INTO filas (idx, categoria, personas, tiene, estado, fecha, metodo) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self.pendientes
+            )
+        self.pendientes = []
+    
+    def aplicar(self, df):
+        """
+        Escribe en el DataFrame todos los resultados guardados
+        
+        Args:
+            df: DataFrame con las columnas de resultados
+        """
+        self.confirmar()
+        guardadas = pd.read_sql("SELECT * FROM filas", self.conexion, index_col='idx')
+        guardadas.columns = ['categoria'] + self.COLUMNAS
+        for col in self.COLUMNAS:
+            df.loc[guardadas.index, col] = guardadas[col].to_numpy()
+    
+    def cerrar(self):
+        """Escribe lo pendiente y cierra la conexión"""
+        self.confirmar()
+        self.conexion.close()
+    
+    def descartar(self):
+        """Cierra y elimina el checkpoint (la corrida terminó y su Excel ya se guardó)"""
+        self.conexion.close()
+        for sufijo in ('', '-wal', '-shm'):
+            if os.path.exists(self.ruta + sufijo):
+                os.remove(self.ruta + sufijo)
+
+
+class ValidadorFotosSelfie:
+    def __init__(self, descargador=None, modo=MODO_DETECCION):
+        """
+        Inicializa el descargador y los detectores
+        
+        Args:
+            descargador: DescargadorFotos a usar. Si es None se crea uno con la configuración por defecto
+            modo: Modo de detección ('completo' o 'rapido')
+        """
+        self.descargador = descargador or DescargadorFotos()
+        self.detector = DetectorRostros(modo)
+        self.cache = None
+        self.checkpoint = None
+    
+    def descargar_imagen_desde_url(self, url):
+        """Descarga una imagen desde una URL (sesión compartida, con timeout y reintentos)"""
+        try:
+            return decodificar_imagen(self.descargador.descargar(url))
+        except Exception as e:
+            return None
+    
+    def detectar_personas_en_imagen(self, imagen):
+        """Detecta personas en una imagen usando múltiples métodos"""
+        return self.detector.detectar(imagen)
+    
+    def _filtrar_contenido_conocido(self, descargas, filas_por_url, hashes, en_deteccion, df, resultados_resumen):
+        """
+        Registra las fotos cuyo contenido ya está en el caché (misma foto con otra URL)
+        y deja pasar a la detección solo las nuevas
+        
+        Una foto repetida en esta misma corrida no se vuelve a detectar: su URL espera
+        en en_deteccion al resultado de la primera
+        
+        Args:
+            descargas: Iterable de (url, bytes o None)
+            filas_por_url: Filas del Excel de cada URL
+            hashes: Diccionario url -> hash que se va llenando para guardar los resultados
+            en_deteccion: Diccionario hash -> URLs que esperan la detección de ese contenido
+            df: DataFrame de resultados
+            resultados_resumen: Contadores del resumen
+        
+        Yields:
+            (url, bytes o None) de las fotos que hay que detectar
+        """
+        for url, contenido in descargas:
+            if contenido is not None:
+                hash_foto = hashes[url] = CacheDeteccion.hash_contenido(contenido)
+                if hash_foto in en_deteccion:
+                    en_deteccion[hash_foto].append(url)
+                    continue
+                resultado = self.cache.buscar_contenido(url, hash_foto)
+                if resultado is not None:
+                    for idx in filas_por_url[url]:
+                        self._registrar_resultado(df, idx, resultado, resultados_resumen, desde_cache=True)
+                    continue
+                en_deteccion[hash_foto] = []
+            yield url, contenido
+    
+    def _detectar_aqui(self, descargas):
+        """
+        Detección en el proceso actual
+        
+        Args:
+            descargas: Iterable de (clave, bytes o None)
+        
+        Yields:
+            (clave, resultado de detectar o None si no hay imagen)
+        """
+        for clave, contenido in descargas:
+            imagen = decodificar_imagen(contenido)
+            yield clave, None if imagen is None else self.detectar_personas_en_imagen(imagen)
+    
+    def _registrar_resultado(self, df, idx, resultado, resultados_resumen, desde_cache=False):
+        """
+        Escribe en el DataFrame el resultado de una fila y actualiza el resumen
+        
+        Args:
+            df: DataFrame de resultados
+            idx: Índice de la fila
+            resultado: Resultado de detectar_personas_en_imagen, o None si no se pudo descargar
+            resultados_resumen: Contadores del resumen
+            desde_cache: Si el resultado salió del caché de corridas anteriores
+        """
+        origen = " ♻️  (caché)" if desde_cache else ""
+        print(f"Fila {idx + 2}: ", end="")  # +2 porque Excel empieza en 1 y tiene encabezado
+        
+        if resultado is None:
+            print("❌ Error al descargar")
+            df.at[idx, 'Estado_Validacion'] = 'Error de descarga'
+            df.at[idx, 'Tiene_Personas'] = 'Error'
+            resultados_resumen['errores'] += 1
+            self._guardar_checkpoint(df, idx, 'errores')
+            return
+        
+        if resultado['error']:
+            print(f"❌ Error: {resultado['error']}")
+            df.at[idx, 'Estado_Validacion'] = f"Error: {resultado['error']}"
+            df.at[idx, 'Tiene_Personas'] = 'Error'
+            resultados_resumen['errores'] += 1
+            self._guardar_checkpoint(df, idx, 'errores')
+            return
+        
+        num_personas = resultado['personas']
+        df.at[idx, 'Personas_Detectadas'] = num_personas
+        df.at[idx, 'Fecha_Validacion'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        df.at[idx, 'Metodo_Deteccion'] = self.detector.metodo
+        
+        if num_personas > 0:
+            print(f"✅ {num_personas} persona(s) detectada(s){origen}")
+            df.at[idx, 'Tiene_Personas'] = 'Sí'
+            df.at[idx, 'Estado_Validacion'] = 'Válida'
+            categoria = 'validadas_ok'
+        else:
+            print(f"⚠️  NO se detectaron personas{origen}")
+            df.at[idx, 'Tiene_Personas'] = 'No'
+            df.at[idx, 'Estado_Validacion'] = 'Sin personas'
+            categoria = 'sin_personas'
+        
+        resultados_resumen[categoria] += 1
+        self._guardar_checkpoint(df, idx, categoria)
+    
+    def _guardar_checkpoint(self, df, idx, categoria):
+        """Guarda el resultado de la fila en el checkpoint de la corrida, si hay"""
+        if self.checkpoint is not None:
+            self.checkpoint.guardar(df, idx, categoria)
+    
+    def procesar_excel(self, ruta_excel, nombre_columna="Foto Selfie (Obligatoria)", paralelo=DESCARGA_PARALELA,
+                       procesos=PROCESOS_DETECCION if DETECCION_PARALELA else 1, usar_cache=CACHE_RESULTADOS,
+                       reanudar=REANUDAR):
         """
         Procesa el archivo Excel y valida todas las fotos
         
         Args:
             ruta_excel: Ruta al archivo Excel
             nombre_columna: Nombre de la columna que contiene las URLs de fotos
+            paralelo: Si es True las fotos se descargan en paralelo mientras se detecta
+            procesos: Procesos de detección (None = uno por CPU, 1 = en este proceso)
+            usar_cache: Si es True se reutilizan los resultados guardados junto al Excel
+            reanudar: Si es True se retoma una corrida interrumpida del mismo Excel; si es False
+                      se empieza de cero
         """
         print(f"\n{'='*80}")
         print(f"VALIDADOR DE FOTOS SELFIE - ANÁLISIS DE EXCEL")
@@ -189,58 +904,86 @@ class ValidadorFotosSelfie:
                 'errores': 0
             }
             
-            # Procesar cada fila
-            for idx, row in df.iterrows():
-                fila_num = idx + 2  # +2 porque Excel empieza en 1 y tiene encabezado
-                url = row[nombre_columna]
-                
-                print(f"Fila {fila_num}: ", end="")
-                
-                # Verificar si hay URL
+            # Checkpoint de la corrida: las filas ya validadas en una corrida interrumpida no se repiten
+            firma = CheckpointValidacion.firma(ruta_excel, nombre_columna, self.detector.parametros())
+            self.checkpoint = CheckpointValidacion(ruta_excel, firma)
+            if not reanudar:
+                self.checkpoint.reiniciar()
+            terminadas = self.checkpoint.terminadas()
+            if len(terminadas) > 0:
+                print(f"♻️  Reanudando: {len(terminadas):,} filas ya validadas en la corrida anterior\n")
+                for categoria, cantidad in terminadas['categoria'].value_counts().items():
+                    resultados_resumen[categoria] += int(cantidad)
+            
+            # Las filas sin URL se resuelven de inmediato; las demás pasan a descarga
+            pendientes = []
+            for idx, url in df[nombre_columna].items():
                 if pd.isna(url) or str(url).strip() == '':
-                    print("⚠️  Sin foto (celda vacía)")
+                    print(f"Fila {idx + 2}: ⚠️  Sin foto (celda vacía)")
                     df.at[idx, 'Estado_Validacion'] = 'Sin foto'
                     df.at[idx, 'Tiene_Personas'] = 'N/A'
                     resultados_resumen['sin_url'] += 1
                     continue
                 
                 resultados_resumen['con_url'] += 1
-                
-                # Descargar imagen
-                print(f"⬇️  Descargando... ", end="")
-                imagen = self.descargar_imagen_desde_url(str(url))
-                
-                if imagen is None:
-                    print("❌ Error al descargar")
-                    df.at[idx, 'Estado_Validacion'] = 'Error de descarga'
-                    df.at[idx, 'Tiene_Personas'] = 'Error'
-                    resultados_resumen['errores'] += 1
+                if idx not in terminadas.index:
+                    pendientes.append((idx, str(url)))
+            
+            resultados_resumen['procesadas'] = len(pendientes)
+            inicio = time.perf_counter()
+            
+            if usar_cache:
+                carpeta_cache = os.path.dirname(ruta_excel) or '.'
+                self.cache = CacheDeteccion(os.path.join(carpeta_cache, ARCHIVO_CACHE), self.detector.parametros())
+            
+            # Cada URL se procesa una sola vez aunque se repita en varias filas;
+            # las URLs ya vistas en corridas anteriores ni siquiera se descargan
+            filas_por_url = {}
+            for idx, url in pendientes:
+                filas_por_url.setdefault(url, []).append(idx)
+            
+            por_descargar = []
+            for url, filas in filas_por_url.items():
+                resultado = self.cache.buscar_url(url) if self.cache is not None else None
+                if resultado is None:
+                    por_descargar.append((url, url))
                     continue
-                
-                # Detectar personas
-                resultado = self.detectar_personas_en_imagen(imagen)
-                
-                if resultado['error']:
-                    print(f"❌ Error: {resultado['error']}")
-                    df.at[idx, 'Estado_Validacion'] = f"Error: {resultado['error']}"
-                    df.at[idx, 'Tiene_Personas'] = 'Error'
-                    resultados_resumen['errores'] += 1
-                else:
-                    num_personas = resultado['personas']
-                    df.at[idx, 'Personas_Detectadas'] = num_personas
-                    df.at[idx, 'Fecha_Validacion'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    df.at[idx, 'Metodo_Deteccion'] = 'Múltiple (mejorado)'
-                    
-                    if num_personas > 0:
-                        print(f"✅ {num_personas} persona(s) detectada(s)")
-                        df.at[idx, 'Tiene_Personas'] = 'Sí'
-                        df.at[idx, 'Estado_Validacion'] = 'Válida'
-                        resultados_resumen['validadas_ok'] += 1
-                    else:
-                        print(f"⚠️  NO se detectaron personas")
-                        df.at[idx, 'Tiene_Personas'] = 'No'
-                        df.at[idx, 'Estado_Validacion'] = 'Sin personas'
-                        resultados_resumen['sin_personas'] += 1
+                for idx in filas:
+                    self._registrar_resultado(df, idx, resultado, resultados_resumen, desde_cache=True)
+            
+            # Pipeline: mientras se detecta en una foto, las siguientes se siguen descargando
+            if paralelo:
+                print(f"⚡ Descarga paralela: {self.descargador.max_descargas} simultáneas, "
+                      f"{self.descargador.max_por_host} por servidor\n")
+                descargas = self.descargador.descargar_muchas(por_descargar)
+            else:
+                descargas = ((url, self.descargador.descargar(url)) for url, _ in por_descargar)
+            
+            hashes = {}
+            en_deteccion = {}
+            if self.cache is not None:
+                descargas = self._filtrar_contenido_conocido(descargas, filas_por_url, hashes, en_deteccion,
+                                                             df, resultados_resumen)
+            
+            # Detección en varios procesos (las cascadas se cargan una vez por proceso)
+            if procesos != 1 and por_descargar:
+                print(f"⚡ Detección en {procesos or os.cpu_count()} procesos\n")
+                detecciones = detectar_en_paralelo(descargas, procesos, modo=self.detector.modo)
+            else:
+                detecciones = self._detectar_aqui(descargas)
+            
+            for url, resultado in detecciones:
+                # El resultado también vale para las URLs con la misma foto que esperaban
+                for misma_foto in [url] + en_deteccion.pop(hashes.get(url), []):
+                    if self.cache is not None and misma_foto in hashes:
+                        self.cache.guardar(misma_foto, hashes[misma_foto], resultado)
+                    for idx in filas_por_url[misma_foto]:
+                        self._registrar_resultado(df, idx, resultado, resultados_resumen)
+            
+            if self.cache is not None:
+                self.cache.desalojar()
+            
+            resultados_resumen['segundos'] = time.perf_counter() - inicio
             
             # Guardar resultados
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -248,8 +991,14 @@ class ValidadorFotosSelfie:
             carpeta = os.path.dirname(ruta_excel)
             ruta_resultado = os.path.join(carpeta, f"{nombre_base}_validado_{timestamp}.xlsx")
             
+            # El Excel final sale del checkpoint (incluye las filas de corridas anteriores)
+            self.checkpoint.aplicar(df)
             df.to_excel(ruta_resultado, index=False)
             
+            # La corrida terminó: el checkpoint ya no hace falta
+            self.checkpoint.descartar()
+            self.checkpoint = None
+            
             # Mostrar resumen
             self.mostrar_resumen(resultados_resumen, ruta_resultado)
             
@@ -258,6 +1007,15 @@ class ValidadorFotosSelfie:
         except Exception as e:
             print(f"\n❌ Error al procesar el archivo Excel: {str(e)}")
             return None
+        
+        finally:
+            if self.cache is not None:
+                self.cache.cerrar()
+                self.cache = None
+            # Si la corrida se interrumpió, lo validado hasta aquí queda guardado para reanudar
+            if self.checkpoint is not None:
+                self.checkpoint.cerrar()
+                self.checkpoint = None
     
     def mostrar_resumen(self, resultados, ruta_resultado):
         """Muestra un resumen de los resultados"""
@@ -279,6 +1037,17 @@ class ValidadorFotosSelfie:
             porcentaje_validas = (resultados['validadas_ok'] / resultados['con_url']) * 100
             print(f"\n📈 Porcentaje de fotos válidas: {porcentaje_validas:.1f}%")
         
+        segundos = resultados.get('segundos', 0)
+        procesadas = resultados.get('procesadas', resultados['con_url'])
+        if procesadas > 0 and segundos > 0:
+            print(f"\n⚡ Velocidad: {procesadas / segundos:.1f} fotos/s ({segundos:.1f} s)")
+            print(f"   • Descargadas: {self.descargador.descargadas} "
+                  f"({self.descargador.bytes_descargados / 1024 / 1024:.1f} MB), "
+                  f"fallidas: {self.descargador.fallidas}")
+        
+        if self.cache is not None:
+            self.cache.reportar()
+        
         print(f"\n💾 Archivo de resultados guardado en:")
         print(f"   {ruta_resultado}")
         
@@ -333,4 +1102,4 @@ def main():
     validador.procesar_excel(ruta_completa)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
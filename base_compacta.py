@@ -0,0 +1,233 @@
+"""
+Representación compacta de la base de precios normalizada
+En lugar de repetir la metadata de la encuesta (Proyecto, Encuesta, Estado,
+Municipio, URLs de fotos, archivo_fuente) en cada producto, se guarda una vez
+por instancia y la tabla larga de productos la referencia con una clave entera.
+La tabla ancha solo se arma al exportar, por bloques si hace falta
+"""
+
+from typing import Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Columnas de metadata con pocos valores distintos que se guardan como categoría
+COLUMNAS_CATEGORICAS = ['Estado', 'archivo_fuente']
+
+CLAVE = 'instancia'
+
+FLOAT32_MAX = np.finfo(np.float32).max
+
+
+def _a_float32(serie: pd.Series) -> pd.Series:
+    """float32 salvo que algún valor no quepa (se conserva float64 para no convertirlo en inf)"""
+    valores = serie.to_numpy(dtype='float64')
+    if np.any(np.abs(valores[np.isfinite(valores)]) > FLOAT32_MAX):
+        return serie.astype('float64')
+    return serie.astype('float32')
+
+
+def _a_float64(serie: pd.Series) -> pd.Series:
+    """
+    Regresa una medida float32 a float64 pasando por su representación más corta,
+    para que 12.99 se exporte como 12.99 y no como 12.989999771118164
+    """
+    if serie.dtype != np.float32:
+        return serie
+    texto = serie.to_numpy().astype(str)
+    return pd.Series(texto.astype('float64'), index=serie.index)
+
+
+def _descategorizar(serie: pd.Series) -> pd.Series:
+    """Devuelve una columna categórica con el tipo de sus valores"""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.astype(serie.cat.categories.dtype)
+    return serie
+
+
+def _unir_categorias(series: List[pd.Series]) -> pd.Categorical:
+    """Concatena columnas categóricas con categorías distintas sin pasar por texto"""
+    categorias = series[0].cat.categories.append([s.cat.categories for s in series[1:]]).unique()
+    codigos = []
+    for s in series:
+        # El código -1 (nulo) toma el último elemento del mapa, que también es -1
+        mapa = np.append(categorias.get_indexer(s.cat.categories), -1)
+        codigos.append(mapa[s.cat.codes.to_numpy()])
+    return pd.Categorical.from_codes(np.concatenate(codigos), categorias)
+
+
+class BaseNormalizada:
+    """Metadata una vez por instancia + tabla larga de productos con clave entera"""
+
+    def __init__(self, instancias: pd.DataFrame, productos: pd.DataFrame):
+        """
+        Args:
+            instancias: Una fila por instancia de encuesta; la posición de la fila es la clave
+            productos: Tabla larga con la columna 'instancia' (posición en instancias),
+                       'producto' y las medidas
+        """
+        self.instancias = instancias
+        self.productos = productos
+
+    @classmethod
+    def desde_encuesta(cls, metadata: pd.DataFrame, productos: pd.DataFrame) -> "BaseNormalizada":
+        """
+        Compacta el resultado de una encuesta
+
+        Args:
+            metadata: Metadata de la encuesta, una fila por instancia (posición = clave)
+            productos: Tabla larga con 'instancia', 'producto' y medidas numéricas
+
+        Returns:
+            BaseNormalizada solo con las instancias que tienen algún producto
+        """
+        claves = productos[CLAVE].to_numpy()
+
+        # Se descartan las instancias sin productos y se renumeran las claves
+        usadas = np.unique(claves)
+        instancias = metadata.iloc[usadas].reset_index(drop=True)
+        for col in COLUMNAS_CATEGORICAS:
+            if col in instancias.columns:
+                instancias[col] = instancias[col].astype('category')
+
+        productos = productos.reset_index(drop=True)
+        productos[CLAVE] = np.searchsorted(usadas, claves).astype(np.int32)
+        productos['producto'] = productos['producto'].astype('category')
+        for col in productos.columns:
+            if productos[col].dtype == np.float64:
+                productos[col] = _a_float32(productos[col])
+            elif productos[col].dtype == object:
+                # Textos sueltos (ej. valores no numéricos): se repiten mucho
+                productos[col] = productos[col].astype('category')
+
+        return cls(instancias, productos)
+
+    @classmethod
+    def combinar(cls, partes: List["BaseNormalizada"]) -> "BaseNormalizada":
+        """
+        Une las bases de varias encuestas desplazando las claves de cada una
+
+        Args:
+            partes: Bases a unir, en orden
+
+        Returns:
+            Base con todas las instancias y productos
+        """
+        desplazamientos = np.cumsum([0] + [len(p.instancias) for p in partes[:-1]])
+
+        instancias = pd.concat([p.instancias for p in partes], ignore_index=True)
+        for col in COLUMNAS_CATEGORICAS:
+            # Categorías distintas entre archivos hacen que concat regrese object
+            if col in instancias.columns and not isinstance(instancias[col].dtype, pd.CategoricalDtype):
+                instancias[col] = instancias[col].astype('category')
+
+        productos = pd.concat([p.productos for p in partes], ignore_index=True)
+        productos[CLAVE] = np.concatenate([
+            p.productos[CLAVE].to_numpy() + desplazamiento
+            for p, desplazamiento in zip(partes, desplazamientos)
+        ]).astype(np.int32)
+        for col in partes[0].productos.columns:
+            if isinstance(partes[0].productos[col].dtype, pd.CategoricalDtype):
+                productos[col] = _unir_categorias([p.productos[col] for p in partes])
+
+        return cls(instancias, productos)
+
+    def __len__(self) -> int:
+        return len(self.productos)
+
+    @property
+    def columnas(self) -> List[str]:
+        """Columnas de la tabla ancha: metadata y luego producto y medidas"""
+        return list(self.instancias.columns) + [c for c in self.productos.columns if c != CLAVE]
+
+    def memoria_mb(self) -> float:
+        """Memoria ocupada por las dos tablas en MB"""
+        total = self.instancias.memory_usage(deep=True).sum() + self.productos.memory_usage(deep=True).sum()
+        return total / 1024 / 1024
+
+    def materializar(self, inicio: int = 0, fin: Optional[int] = None,
+                     columnas: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Arma la tabla ancha (una fila por producto con su metadata) para un rango de filas
+
+        Args:
+            inicio: Primera fila de la tabla larga
+            fin: Fila final (exclusiva). Si es None hasta el final
+            columnas: Columnas a incluir. Si es None todas
+
+        Returns:
+            DataFrame con tipos normales (sin categorías y medidas en float64)
+        """
+        productos = self.productos.iloc[inicio:fin]
+        if columnas is None:
+            columnas = self.columnas
+
+        cols_instancia = [c for c in columnas if c in self.instancias.columns]
+        ancho = self.instancias[cols_instancia].iloc[productos[CLAVE].to_numpy()].reset_index(drop=True)
+
+        for col in columnas:
+            if col in self.productos.columns and col != CLAVE:
+                ancho[col] = _a_float64(productos[col]).to_numpy()
+
+        ancho = ancho[[c for c in columnas if c in ancho.columns]]
+        for col in ancho.columns:
+            ancho[col] = _descategorizar(ancho[col])
+        return ancho
+
+    def bloques(self, filas_por_bloque: int, columnas: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        """
+        Materializa la tabla ancha por bloques de filas
+
+        Args:
+            filas_por_bloque: Filas de la tabla larga por bloque
+            columnas: Columnas a incluir. Si es None todas
+        """
+        for inicio in range(0, len(self.productos), filas_por_bloque):
+            yield self.materializar(inicio, inicio + filas_por_bloque, columnas)
+
+
+class EstadisticasExportacion:
+    """Conteos de la sección ESTADÍSTICAS acumulados bloque por bloque durante la exportación"""
+
+    MEDIDAS = {
+        'inventario': 'Registros con inventario',
+        'precio_regular': 'Registros con precio regular',
+        'precio_promocion': 'Registros con precio promoción'
+    }
+
+    def __init__(self):
+        self.filas = 0
+        self.con_valor = {medida: 0 for medida in self.MEDIDAS}
+        self.suma_precio_regular = 0.0
+        self.precios_regulares = 0
+
+    def actualizar(self, bloque: pd.DataFrame):
+        """
+        Suma los conteos de un bloque ya limpio (vacíos como NaN o '')
+
+        Args:
+            bloque: Bloque de la tabla ancha tal como se escribe
+        """
+        self.filas += len(bloque)
+
+        # Valores reales: no nulos, no vacíos y no ceros
+        for medida in self.MEDIDAS:
+            if medida in bloque.columns:
+                valores = bloque[medida]
+                self.con_valor[medida] += int((valores.notna() & (valores != '') & (valores != 0)).sum())
+
+        if 'precio_regular' in bloque.columns:
+            precios = pd.to_numeric(bloque['precio_regular'], errors='coerce')
+            self.suma_precio_regular += float(precios.sum())
+            self.precios_regulares += int(precios.count())
+
+    def reportar(self):
+        """Muestra los conteos acumulados"""
+        print(f"\n📈 ESTADÍSTICAS:")
+        for medida, etiqueta in self.MEDIDAS.items():
+            print(f"   • {etiqueta}: {self.con_valor[medida]:,}")
+
+        # Promedio solo si hubo precios numéricos
+        if self.precios_regulares > 0:
+            promedio = self.suma_precio_regular / self.precios_regulares
+            print(f"   • Precio regular promedio: ${promedio:.2f}")
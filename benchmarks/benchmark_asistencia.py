@@ -0,0 +1,52 @@
+"""
+Benchmark de la consolidación de asistencia: groupby vectorizado contra pivot_table
+Uso: python benchmarks/benchmark_asistencia.py [filas]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+sys.path.insert(0, str(RAIZ / 'tests'))
+
+from AsistenciaPOO import ConfiguracionAsistencia, ProcesadorEfectividad  # noqa: E402
+from test_asistencia_consolidacion import consolidar_asistencia_pivot, crear_efectividad_sintetica  # noqa: E402
+
+
+def benchmark_consolidacion(filas: int = 300_000):
+    """
+    Compara la consolidación vectorizada contra la de pivot_table y verifica que den lo mismo
+    
+    Args:
+        filas: Número de filas del Efectividad sintético
+    """
+    print("=" * 70)
+    print(f"⏱️  BENCHMARK DE CONSOLIDACIÓN: Efectividad sintético de {filas:,} filas")
+    print("=" * 70)
+    
+    procesador = ProcesadorEfectividad(ConfiguracionAsistencia())
+    df = procesador.procesar_efectividad(crear_efectividad_sintetica(filas))
+    
+    inicio = time.perf_counter()
+    df_anterior = consolidar_asistencia_pivot(procesador, df)
+    segundos_anterior = time.perf_counter() - inicio
+    
+    inicio = time.perf_counter()
+    df_nuevo = procesador.consolidar_asistencia(df)
+    segundos_nuevo = time.perf_counter() - inicio
+    
+    print(f"\n{'Método':20} {'Segundos':>10}")
+    print(f"{'pivot_table':20} {segundos_anterior:>10.3f}")
+    print(f"{'groupby vectorizado':20} {segundos_nuevo:>10.3f}")
+    print(f"\n🚀 Aceleración: {segundos_anterior / segundos_nuevo:.1f}x")
+    
+    pd.testing.assert_frame_equal(df_anterior, df_nuevo)
+    print(f"✅ Resultados idénticos ({len(df_nuevo):,} promotores)")
+
+
+if __name__ == "__main__":
+    benchmark_consolidacion(int(sys.argv[1]) if len(sys.argv) > 1 else 300_000)
@@ -0,0 +1,267 @@
+"""
+Benchmarks de "Validación de Fotos.py" contra un servidor de fotos local
+Uso:
+    python benchmarks/benchmark_validacion_fotos.py descargas [fotos]
+    python benchmarks/benchmark_validacion_fotos.py deteccion [fotos]
+    python benchmarks/benchmark_validacion_fotos.py modos [carpeta de muestras]
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import requests
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+sys.path.insert(0, str(RAIZ / 'tests'))
+
+from servidor_fotos import ServidorFotosPrueba, cargar_validacion_fotos, imagenes_de_muestra  # noqa: E402
+
+# Se carga antes de importar sus nombres (también en los procesos de detección)
+cargar_validacion_fotos()
+from validacion_fotos import (  # noqa: E402
+    PROCESOS_DETECCION, TIMEOUT_DESCARGA, DescargadorFotos, DetectorRostros, ValidadorFotosSelfie,
+    decodificar_imagen, detectar_en_paralelo
+)
+
+
+def benchmark_descargas(num_fotos=200, latencia=0.03, latencia_conexion=0.05):
+    """
+    Compara la descarga serial original (requests.get sin sesión) contra la descarga
+    paralela con sesión compartida, solo descargando y con detección, contra un servidor local
+    
+    Args:
+        num_fotos: Número de fotos a descargar
+        latencia: Segundos de espera por petición en el servidor de prueba
+        latencia_conexion: Segundos de espera por conexión nueva en el servidor de prueba
+    """
+    print("=" * 80)
+    print(f"⏱️  BENCHMARK DE DESCARGAS: {num_fotos} fotos, latencia {latencia * 1000:.0f} ms, "
+          f"conexión nueva {latencia_conexion * 1000:.0f} ms")
+    print("=" * 80)
+    
+    validador = ValidadorFotosSelfie()
+    filas = []
+    
+    with ServidorFotosPrueba(imagenes_de_muestra(), latencia, latencia_conexion, error_cada=25) as servidor:
+        urls = servidor.urls(num_fotos)
+        
+        def serial(detectar):
+            resultados = {}
+            for url in urls:
+                try:
+                    respuesta = requests.get(url, timeout=TIMEOUT_DESCARGA)
+                    respuesta.raise_for_status()
+                    contenido = respuesta.content
+                except Exception:
+                    contenido = None
+                resultados[url] = contenido
+                if detectar and contenido is not None:
+                    resultados[url] = validador.detectar_personas_en_imagen(decodificar_imagen(contenido))['personas']
+            return resultados
+        
+        def paralelo(detectar):
+            descargador = DescargadorFotos()
+            resultados = {}
+            for url, contenido in descargador.descargar_muchas((url, url) for url in urls):
+                resultados[url] = contenido
+                if detectar and contenido is not None:
+                    resultados[url] = validador.detectar_personas_en_imagen(decodificar_imagen(contenido))['personas']
+            descargador.cerrar()
+            return resultados
+        
+        for etiqueta, funcion, detectar in [
+            ('Serial, solo descarga', serial, False),
+            ('Paralelo, solo descarga', paralelo, False),
+            ('Serial + detección', serial, True),
+            ('Paralelo + detección', paralelo, True),
+        ]:
+            conexiones_antes = servidor.conexiones
+            inicio = time.perf_counter()
+            resultados = funcion(detectar)
+            segundos = time.perf_counter() - inicio
+            errores = sum(1 for r in resultados.values() if r is None)
+            filas.append((etiqueta, segundos, errores, servidor.conexiones - conexiones_antes, resultados))
+    
+    print(f"\n{'Método':26} {'Segundos':>9} {'Fotos/s':>9} {'Errores':>8} {'Conexiones':>11}")
+    for etiqueta, segundos, errores, conexiones, _ in filas:
+        print(f"{etiqueta:26} {segundos:>9.2f} {num_fotos / segundos:>9.1f} {errores:>8} {conexiones:>11}")
+    
+    print(f"\n🚀 Aceleración solo descarga: {filas[0][1] / filas[1][1]:.1f}x")
+    print(f"🚀 Aceleración con detección: {filas[2][1] / filas[3][1]:.1f}x")
+    
+    # Las fotos que ambos descargaron deben dar la misma detección
+    serial_det, paralelo_det = filas[2][4], filas[3][4]
+    iguales = all(paralelo_det[url] == valor for url, valor in serial_det.items() if valor is not None)
+    print("✅ Detecciones idénticas" if iguales else "❌ Las detecciones no coinciden")
+
+
+
+def benchmark_deteccion(num_fotos=48, procesos=PROCESOS_DETECCION):
+    """
+    Compara la detección en el proceso principal contra el pool de detección,
+    con fotos ya descargadas (sin red)
+    
+    Args:
+        num_fotos: Número de fotos a detectar
+        procesos: Procesos del pool (None = uno por CPU)
+    """
+    procesos = procesos or os.cpu_count() or 1
+    print("=" * 80)
+    print(f"⏱️  BENCHMARK DE DETECCIÓN: {num_fotos} fotos, {procesos} procesos")
+    print("=" * 80)
+    
+    imagenes = imagenes_de_muestra()
+    tareas = [(i, imagenes[i % len(imagenes)]) for i in range(num_fotos)]
+    validador = ValidadorFotosSelfie()
+    
+    inicio = time.perf_counter()
+    serial = dict(validador._detectar_aqui(tareas))
+    segundos_serial = time.perf_counter() - inicio
+    
+    inicio = time.perf_counter()
+    paralelo = dict(detectar_en_paralelo(tareas, procesos))
+    segundos_paralelo = time.perf_counter() - inicio
+    
+    print(f"\n{'Método':26} {'Segundos':>9} {'Fotos/s':>9}")
+    print(f"{'Proceso principal':26} {segundos_serial:>9.2f} {num_fotos / segundos_serial:>9.2f}")
+    print(f"{f'Pool de {procesos} procesos':26} {segundos_paralelo:>9.2f} {num_fotos / segundos_paralelo:>9.2f}")
+    print(f"\n🚀 Aceleración: {segundos_serial / segundos_paralelo:.1f}x")
+    
+    iguales = all(
+        paralelo[i]['personas'] == r['personas'] and sorted(paralelo[i]['rostros']) == sorted(r['rostros'])
+        for i, r in serial.items()
+    )
+    print("✅ Detecciones idénticas" if iguales else "❌ Las detecciones no coinciden")
+
+
+
+def _muestras_etiquetadas(carpeta=None, lado=1600):
+    """
+    Fotos etiquetadas (con o sin personas) para medir la precisión de la detección
+    
+    Args:
+        carpeta: Carpeta con subcarpetas 'con_personas' y 'sin_personas'. Si es None se usan
+                 las imágenes de ejemplo de scikit-image (astronauta, camarógrafo y variantes
+                 como positivas; objetos, animales y texturas como negativas)
+        lado: Lado mayor al que se escalan las imágenes de ejemplo (fotos de celular)
+    
+    Returns:
+        Lista de (nombre, imagen BGR, tiene personas)
+    """
+    muestras = []
+    
+    if carpeta is not None:
+        for subcarpeta, etiqueta in [('con_personas', True), ('sin_personas', False)]:
+            ruta = os.path.join(carpeta, subcarpeta)
+            for archivo in sorted(os.listdir(ruta)) if os.path.isdir(ruta) else []:
+                imagen = cv2.imread(os.path.join(ruta, archivo), cv2.IMREAD_COLOR)
+                if imagen is not None:
+                    muestras.append((f"{subcarpeta}/{archivo}", imagen, etiqueta))
+        return muestras
+    
+    try:
+        from skimage import data
+        from skimage.util import img_as_ubyte
+    except ImportError:
+        print("❌ Se requiere scikit-image para las muestras de ejemplo (o indica una carpeta de muestras)")
+        return muestras
+    
+    def a_bgr(imagen):
+        imagen = img_as_ubyte(imagen)
+        if imagen.ndim == 2:
+            return cv2.cvtColor(imagen, cv2.COLOR_GRAY2BGR)
+        return cv2.cvtColor(imagen[..., :3], cv2.COLOR_RGB2BGR)
+    
+    def escalar(imagen):
+        factor = lado / max(imagen.shape[:2])
+        return cv2.resize(imagen, None, fx=factor, fy=factor, interpolation=cv2.INTER_CUBIC)
+    
+    astronauta = a_bgr(data.astronaut())
+    oscura = cv2.convertScaleAbs(astronauta, alpha=0.6, beta=-20)
+    # Selfie "de lejos": la persona ocupa un tercio del ancho sobre un fondo de pared
+    lejos = cv2.resize(a_bgr(data.brick()), (1536, 1152))
+    lejos[320:832, 512:1024] = astronauta
+    
+    positivas = {
+        'astronauta': astronauta,
+        'astronauta_espejo': cv2.flip(astronauta, 1),
+        'astronauta_oscura': oscura,
+        'astronauta_lejos': lejos,
+        'camarografo': a_bgr(data.camera()),
+    }
+    negativas = ['coffee', 'chelsea', 'rocket', 'coins', 'horse', 'moon',
+                 'brick', 'grass', 'hubble_deep_field', 'retina', 'clock', 'page']
+    
+    for nombre, imagen in positivas.items():
+        muestras.append((nombre, escalar(imagen), True))
+    for nombre in negativas:
+        muestras.append((nombre, escalar(a_bgr(getattr(data, nombre)())), False))
+    return muestras
+
+
+def benchmark_modos(carpeta=None, lado=1600):
+    """
+    Compara precisión contra tiempo de los modos de detección en fotos etiquetadas
+    
+    Args:
+        carpeta: Carpeta de muestras (ver _muestras_etiquetadas). Si es None, ejemplos de scikit-image
+        lado: Lado mayor de las imágenes de ejemplo
+    """
+    muestras = _muestras_etiquetadas(carpeta, lado)
+    if not muestras:
+        return
+    
+    positivas = sum(1 for _, _, etiqueta in muestras if etiqueta)
+    print("=" * 80)
+    print(f"⏱️  BENCHMARK DE MODOS DE DETECCIÓN: {len(muestras)} fotos "
+          f"({positivas} con personas, {len(muestras) - positivas} sin personas)")
+    print("=" * 80)
+    
+    filas = []
+    for modo in DetectorRostros.MODOS:
+        detector = DetectorRostros(modo)
+        aciertos = falsos_positivos = falsos_negativos = 0
+        fallos = []
+        
+        inicio = time.perf_counter()
+        for nombre, imagen, etiqueta in muestras:
+            detectado = detector.detectar(imagen)['detectado']
+            if detectado == etiqueta:
+                aciertos += 1
+            elif detectado:
+                falsos_positivos += 1
+                fallos.append(f"{nombre} (falso positivo)")
+            else:
+                falsos_negativos += 1
+                fallos.append(f"{nombre} (falso negativo)")
+        segundos = time.perf_counter() - inicio
+        
+        filas.append((modo, segundos, aciertos, falsos_positivos, falsos_negativos, fallos))
+    
+    print(f"\n{'Modo':10} {'Seg/foto':>9} {'Exactitud':>10} {'Falsos +':>9} {'Falsos -':>9}")
+    for modo, segundos, aciertos, falsos_positivos, falsos_negativos, _ in filas:
+        print(f"{modo:10} {segundos / len(muestras):>9.2f} {aciertos / len(muestras) * 100:>9.1f}% "
+              f"{falsos_positivos:>9} {falsos_negativos:>9}")
+    
+    print(f"\n🚀 Aceleración del modo rápido: {filas[0][1] / filas[1][1]:.1f}x")
+    for modo, *_, fallos in filas:
+        if fallos:
+            print(f"\n⚠️  Errores en modo {modo}:")
+            for fallo in fallos:
+                print(f"   • {fallo}")
+
+
+if __name__ == "__main__":
+    prueba = sys.argv[1] if len(sys.argv) > 1 else "descargas"
+    if prueba == "descargas":
+        benchmark_descargas(int(sys.argv[2]) if len(sys.argv) > 2 else 200)
+    elif prueba == "deteccion":
+        benchmark_deteccion(int(sys.argv[2]) if len(sys.argv) > 2 else 48)
+    elif prueba == "modos":
+        benchmark_modos(sys.argv[2] if len(sys.argv) > 2 else None)
+    else:
+        print(__doc__)
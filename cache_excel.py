@@ -0,0 +1,226 @@
+"""
+Caché en disco de hojas de Excel ya parseadas
+Guarda cada hoja leída como Parquet (o pickle si no hay pyarrow) para no
+volver a parsear con openpyxl los archivos que no cambiaron entre corridas
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from lector_excel import leer_excel, motor_disponible
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_DISPONIBLE = True
+except ImportError:
+    PARQUET_DISPONIBLE = False
+
+
+def guardar_dataframe(df: pd.DataFrame, ruta_base) -> Path:
+    """
+    Guarda un DataFrame de forma atómica como Parquet o, si no es posible, como pickle
+
+    Args:
+        df: DataFrame a guardar
+        ruta_base: Ruta del archivo sin extensión
+
+    Returns:
+        Ruta del archivo escrito
+    """
+    ruta_base = Path(ruta_base)
+
+    # Parquet no admite columnas con tipos mezclados ni encabezados no texto;
+    # en ese caso se recurre a pickle
+    if PARQUET_DISPONIBLE:
+        destino = ruta_base.with_name(f"{ruta_base.name}.parquet")
+        temporal = destino.with_name(f"{destino.name}.{os.getpid()}.tmp")
+        try:
+            df.to_parquet(temporal, index=False)
+            os.replace(temporal, destino)
+            ruta_base.with_name(f"{ruta_base.name}.pkl").unlink(missing_ok=True)
+            return destino
+        except Exception:
+            temporal.unlink(missing_ok=True)
+
+    destino = ruta_base.with_name(f"{ruta_base.name}.pkl")
+    temporal = destino.with_name(f"{destino.name}.{os.getpid()}.tmp")
+    try:
+        df.to_pickle(temporal)
+        os.replace(temporal, destino)
+    except Exception:
+        temporal.unlink(missing_ok=True)
+        raise
+    ruta_base.with_name(f"{ruta_base.name}.parquet").unlink(missing_ok=True)
+    return destino
+
+
+def cargar_dataframe(ruta) -> pd.DataFrame:
+    """Carga un DataFrame guardado con guardar_dataframe"""
+    ruta = Path(ruta)
+    if ruta.suffix == '.parquet':
+        return pd.read_parquet(ruta)
+    return pd.read_pickle(ruta)
+
+
+class CacheLecturas:
+    """Caché de lecturas de Excel indexado por ruta, tamaño, fecha de modificación y parámetros de lectura"""
+
+    EXTENSIONES = ('.parquet', '.pkl')
+
+    def __init__(self, directorio, max_entradas: int = 200, max_mb: float = 2048):
+        """
+        Inicializa el caché
+
+        Args:
+            directorio: Carpeta donde se guardan las hojas parseadas
+            max_entradas: Número máximo de hojas guardadas antes de desalojar
+            max_mb: Tamaño máximo del caché en MB antes de desalojar
+        """
+        self.directorio = Path(directorio)
+        self.max_entradas = max_entradas
+        self.max_bytes = max_mb * 1024 * 1024
+
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def clave(self, ruta, **parametros) -> str:
+        """
+        Calcula la clave de una lectura
+
+        Args:
+            ruta: Ruta del archivo Excel
+            **parametros: Parámetros de lectura (sheet_name, skiprows, columnas, ...)
+
+        Returns:
+            Hash hexadecimal que identifica el contenido leído
+        """
+        stat = os.stat(ruta)
+        firma = {
+            'ruta': str(Path(ruta).resolve()),
+            'tamano': stat.st_size,
+            'mtime': stat.st_mtime_ns,
+            'motor': motor_disponible(),
+            'parametros': parametros
+        }
+        texto = json.dumps(firma, sort_keys=True, default=str)
+        return hashlib.sha1(texto.encode('utf-8')).hexdigest()
+
+    def leer_excel(self, ruta, **parametros) -> pd.DataFrame:
+        """
+        Lee una hoja de Excel desde el caché o, si no está, con lector_excel.leer_excel
+
+        Args:
+            ruta: Ruta del archivo Excel
+            **parametros: Parámetros que se pasan a leer_excel (sheet_name, skiprows, columnas, ...)
+
+        Returns:
+            DataFrame con la hoja leída
+        """
+        clave = self.clave(ruta, **parametros)
+
+        df = self._cargar(clave)
+        if df is not None:
+            self.aciertos += 1
+            return df
+
+        self.fallos += 1
+        df = leer_excel(ruta, **parametros)
+        self._guardar(clave, df)
+        self.desalojar()
+        return df
+
+    def _buscar(self, clave: str) -> Optional[Path]:
+        """Devuelve la ruta de la entrada guardada para una clave, si existe"""
+        for extension in self.EXTENSIONES:
+            ruta = self.directorio / f"{clave}{extension}"
+            if ruta.exists():
+                return ruta
+        return None
+
+    def _cargar(self, clave: str) -> Optional[pd.DataFrame]:
+        """Carga una entrada del caché; las entradas corruptas se descartan"""
+        ruta = self._buscar(clave)
+        if ruta is None:
+            return None
+
+        try:
+            df = cargar_dataframe(ruta)
+            # Marcar como usada recientemente para el desalojo LRU
+            os.utime(ruta)
+            return df
+        except Exception as e:
+            print(f"⚠️  Entrada de caché inválida {ruta.name}: {e}")
+            ruta.unlink(missing_ok=True)
+            return None
+
+    def _guardar(self, clave: str, df: pd.DataFrame):
+        """Guarda una hoja en el caché"""
+        try:
+            self.directorio.mkdir(parents=True, exist_ok=True)
+        except Exception as e:
+            print(f"⚠️  No se pudo crear el caché en {self.directorio}: {e}")
+            return
+
+        try:
+            guardar_dataframe(df, self.directorio / clave)
+        except Exception as e:
+            print(f"⚠️  No se pudo guardar en caché: {e}")
+
+    def desalojar(self):
+        """Elimina las entradas menos usadas si se exceden los límites de entradas o tamaño"""
+        if not self.directorio.exists():
+            return
+
+        entradas = []
+        for ruta in self.directorio.iterdir():
+            if ruta.suffix in self.EXTENSIONES:
+                try:
+                    stat = ruta.stat()
+                except FileNotFoundError:
+                    continue
+                entradas.append((stat.st_mtime, stat.st_size, ruta))
+
+        # Más reciente primero; se conserva mientras quepa en los límites
+        entradas.sort(key=lambda x: x[0], reverse=True)
+        total_bytes = 0
+        for i, (_, tamano, ruta) in enumerate(entradas):
+            total_bytes += tamano
+            if i >= self.max_entradas or total_bytes > self.max_bytes:
+                ruta.unlink(missing_ok=True)
+                self.desalojos += 1
+
+    def limpiar(self):
+        """Elimina todas las entradas del caché"""
+        if not self.directorio.exists():
+            return
+        for ruta in self.directorio.iterdir():
+            if ruta.suffix in self.EXTENSIONES:
+                ruta.unlink(missing_ok=True)
+
+    def reiniciar_estadisticas(self):
+        """Pone en cero los contadores de la corrida"""
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def acumular(self, aciertos: int, fallos: int, desalojos: int = 0):
+        """Suma a la corrida las estadísticas de una copia del caché usada en otro proceso"""
+        self.aciertos += aciertos
+        self.fallos += fallos
+        self.desalojos += desalojos
+
+    def reportar(self):
+        """Muestra aciertos, fallos y desalojos de la corrida"""
+        total = self.aciertos + self.fallos
+        tasa = (self.aciertos / total * 100) if total > 0 else 0
+        print(f"\n🗄️  Caché de lecturas ({self.directorio}):")
+        print(f"   • Aciertos: {self.aciertos}")
+        print(f"   • Fallos: {self.fallos}")
+        print(f"   • Desalojos: {self.desalojos}")
+        print(f"   • Tasa de aciertos: {tasa:.1f}%")
@@ -0,0 +1,231 @@
+"""
+Clasificador de columnas de encuestas de precios
+Separa metadata, inventario, precio regular, precio promoción y fotos, con las
+expresiones regulares compiladas una sola vez y un caché en disco por firma de
+encabezados: las encuestas del mismo Proyecto/Encuesta repiten exactamente las
+mismas columnas y no necesitan clasificarse otra vez
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+# Palabras que identifican columnas de metadata (NO productos)
+PALABRAS_METADATA = [
+    'instancia', 'proyecto', 'encuesta', 'tienda', 'encuestador',
+    'comunidad', 'estado', 'municipio', 'zona', 'región',
+    'fecha subida', 'geolocalización', 'sku',
+    'descripción', 'cantidad', 'total', 'presentación'
+]
+
+# Fecha Respuesta duplicadas (se excluyen de la metadata)
+PATRON_FECHA_DUPLICADA = re.compile(r'fecha respuesta\.\d+')
+
+# Prefijos a remover del nombre del producto
+# Importante: ordenados de más específico a menos específico
+PATRONES_PREFIJO = [re.compile(patron, flags=re.IGNORECASE) for patron in [
+    # Precios con variaciones
+    r'^precio\s+promoción\s+o\s+descuento\s+precio\s+regular\s+',
+    r'^precio\s+regular\s+\([^)]+\)\s+de\s+',
+    r'^precio\s+regular\s+\([^)]+\)\s+',
+    r'^precio\s+promoción\s+o\s+descuento\s*',
+    r'^precio\s+promocion\s+o\s+descuento\s*',
+    r'^precio\s+promoción\s*',
+    r'^precio\s+promocion\s*',
+    r'^precio\s+regular\s+',
+    r'^precio\s+',
+    # Inventarios
+    r'^inventario\s+',
+    # Fotos
+    r'^foto\s+de\s+la\s+categoría\s*',
+]]
+
+PATRON_ESPACIOS = re.compile(r'\s+')
+
+
+def extraer_nombre_producto(columna) -> str:
+    """
+    Extrae el nombre del producto limpiando prefijos de forma agresiva
+    """
+    texto = str(columna).strip()
+
+    # Aplicar cada patrón en orden
+    for patron in PATRONES_PREFIJO:
+        texto = patron.sub('', texto)
+
+    # Limpieza final: remover espacios múltiples y strips
+    return PATRON_ESPACIOS.sub(' ', texto).strip()
+
+
+def clasificar_columnas(columnas: List) -> Dict:
+    """
+    Clasifica los encabezados de una encuesta
+
+    Args:
+        columnas: Encabezados de la encuesta (sin duplicados)
+
+    Returns:
+        Diccionario con 'metadata' (lista), 'inventario', 'precio_regular',
+        'precio_promocion' (producto -> columna) y 'foto' (lista)
+    """
+    cols_metadata = []
+    for col in columnas:
+        col_lower = str(col).lower()
+        es_metadata = any(x in col_lower for x in PALABRAS_METADATA)
+        # Excluir Fecha Respuesta duplicadas pero NO las fotos
+        if es_metadata and not PATRON_FECHA_DUPLICADA.match(col_lower):
+            cols_metadata.append(col)
+
+    metadata = set(cols_metadata)
+    cols_inventario = {}
+    cols_precio_reg = {}
+    cols_precio_promo = {}
+    cols_foto = []
+
+    for col in columnas:
+        if col in metadata:
+            continue
+
+        col_lower = str(col).lower()
+
+        # INVENTARIO (solo columnas explícitas de "Inventario")
+        if 'inventario' in col_lower:
+            cols_inventario[extraer_nombre_producto(col)] = col
+
+        # FOTO DE CATEGORÍA
+        elif 'foto' in col_lower and 'categoría' in col_lower:
+            cols_foto.append(col)
+
+        # PRECIO REGULAR
+        elif 'precio regular' in col_lower or \
+             ('sin descuento' in col_lower and 'precio' in col_lower) or \
+             ('sin promoción' in col_lower and 'precio' in col_lower):
+            cols_precio_reg.setdefault(extraer_nombre_producto(col), col)
+
+        # PRECIO PROMOCIÓN
+        elif 'promoción' in col_lower or 'promocion' in col_lower:
+            if 'precio' in col_lower or 'descuento' in col_lower:
+                cols_precio_promo.setdefault(extraer_nombre_producto(col), col)
+
+    return {
+        'metadata': cols_metadata,
+        'inventario': cols_inventario,
+        'precio_regular': cols_precio_reg,
+        'precio_promocion': cols_precio_promo,
+        'foto': cols_foto
+    }
+
+
+class CacheClasificacion:
+    """Caché en disco de planes de columnas, indexado por la firma de los encabezados"""
+
+    # Subir la versión al cambiar las reglas de clasificar_columnas invalida los planes guardados
+    VERSION = 1
+
+    def __init__(self, ruta):
+        """
+        Inicializa el caché
+
+        Args:
+            ruta: Archivo JSON donde se guardan los planes
+        """
+        self.ruta = Path(ruta)
+        self.planes = self._leer()
+
+    @staticmethod
+    def firma(columnas: List) -> str:
+        """Hash de la lista ordenada de encabezados"""
+        texto = json.dumps([str(col) for col in columnas], ensure_ascii=False)
+        return hashlib.sha1(texto.encode('utf-8')).hexdigest()
+
+    def _leer(self) -> Dict:
+        """Lee los planes guardados; un archivo corrupto o de otra versión se ignora"""
+        try:
+            with open(self.ruta, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+            if datos.get('version') == self.VERSION:
+                return datos.get('planes', {})
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def obtener_plan(self, columnas: List) -> Tuple[Dict, bool]:
+        """
+        Devuelve el plan de columnas desde el caché o lo calcula y lo guarda
+
+        Args:
+            columnas: Encabezados de la encuesta (sin duplicados)
+
+        Returns:
+            (plan como el de clasificar_columnas con las etiquetas reales de las columnas,
+             True si salió del caché)
+        """
+        columnas = list(columnas)
+        clave = self.firma(columnas)
+
+        plan_indices = self.planes.get(clave)
+        if plan_indices is not None:
+            return self._desde_indices(plan_indices, columnas), True
+
+        # Otro proceso pudo haberlo guardado durante esta corrida
+        self.planes = {**self._leer(), **self.planes}
+        plan_indices = self.planes.get(clave)
+        if plan_indices is not None:
+            return self._desde_indices(plan_indices, columnas), True
+
+        plan = clasificar_columnas(columnas)
+        self.planes[clave] = self._a_indices(plan, columnas)
+        self.guardar()
+        return plan, False
+
+    @staticmethod
+    def _a_indices(plan: Dict, columnas: List) -> Dict:
+        """Guarda posiciones en lugar de etiquetas (las etiquetas pueden no ser texto)"""
+        posicion = {col: i for i, col in enumerate(columnas)}
+        return {
+            clave: (
+                {producto: posicion[col] for producto, col in valor.items()}
+                if isinstance(valor, dict) else [posicion[col] for col in valor]
+            )
+            for clave, valor in plan.items()
+        }
+
+    @staticmethod
+    def _desde_indices(plan_indices: Dict, columnas: List) -> Dict:
+        """Reconstruye el plan con las etiquetas de las columnas"""
+        return {
+            clave: (
+                {producto: columnas[i] for producto, i in valor.items()}
+                if isinstance(valor, dict) else [columnas[i] for i in valor]
+            )
+            for clave, valor in plan_indices.items()
+        }
+
+    def guardar(self):
+        """
+        Escribe los planes de forma atómica, combinando con lo que otros procesos
+        hayan guardado mientras tanto
+        """
+        planes = self._leer()
+        planes.update(self.planes)
+        self.planes = planes
+
+        temporal = self.ruta.with_name(f"{self.ruta.name}.{os.getpid()}.tmp")
+        try:
+            self.ruta.parent.mkdir(parents=True, exist_ok=True)
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.VERSION, 'planes': planes}, f, ensure_ascii=False)
+            os.replace(temporal, self.ruta)
+        except OSError as e:
+            temporal.unlink(missing_ok=True)
+            print(f"⚠️  No se pudo guardar el caché de columnas: {e}")
+
+
+@lru_cache(maxsize=None)
+def cache_clasificacion(ruta) -> CacheClasificacion:
+    """Caché de columnas del proceso actual para un archivo (se abre una sola vez por proceso)"""
+    return CacheClasificacion(ruta)
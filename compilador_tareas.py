@@ -1,9 +1,16 @@
+import numpy as np
 import pandas as pd
 from pathlib import Path
+from lector_excel import leer_excel
+from escritor_excel import ErrorSidecar, guardar_hojas
+from perfil_columnas import PerfilColumnas
 
 # ===================== CONFIGURACIÓN =====================
 CARPETA = r"C:\Users\lapmxdf558\Documents\Archivos Alejandro\Genomma Mayoreo\Rutero Mayoreo\Rutero Enero\Tareas"
 ARCHIVO_SALIDA = "Encuestas_Apiladas.xlsx"
+SIDECAR = 'parquet'  # Copia para Power BI: 'parquet', 'csv' o None
+ESCRIBIR_PERFIL = False  # Agregar la hoja con el perfil de columnas
+HOJA_PERFIL = 'Perfil'
 
 # ===================== FUNCIONES =====================
 
@@ -12,7 +19,7 @@ def leer_archivo_excel(ruta):
     Lee un archivo Excel y retorna el DataFrame
     """
     try:
-        df = pd.read_excel(ruta)
+        df = leer_excel(ruta)
         # Eliminar columnas duplicadas
         df = df.loc[:, ~df.columns.duplicated()]
         return df
@@ -29,47 +36,54 @@ def diagnosticar_archivo(df, nombre):
     if len(df.columns) > 8:
         print(f"              ... y {len(df.columns) - 8} más")
 
-def encontrar_columnas_comunes(lista_dfs):
+def calcular_esquema(lista_dfs):
     """
-    Encuentra las columnas que están en TODOS los DataFrames
-    Incluye automáticamente columnas de fotos aunque no estén en todos
+    Calcula una sola vez el esquema del apilado: columnas que están en TODOS los
+    DataFrames + todas las columnas de fotos aunque no estén en todos
+    
+    Returns:
+        (columnas comunes sin fotos, columnas de fotos, columnas finales ordenadas)
     """
     if not lista_dfs:
-        return set()
+        return set(), set(), []
     
-    # Empezar con las columnas del primer DataFrame
-    columnas_comunes = set(lista_dfs[0].columns)
+    # Cada archivo ya viene sin columnas duplicadas: una columna es común
+    # si aparece tantas veces como archivos hay
+    conteo = pd.Index(np.concatenate([df.columns.to_numpy(dtype=object) for df in lista_dfs])).value_counts()
+    todas = conteo.index
     
-    # Intersectar con las columnas de cada DataFrame
-    for df in lista_dfs[1:]:
-        columnas_comunes = columnas_comunes & set(df.columns)
+    texto = todas.astype(str).str.lower()
+    es_foto = np.asarray(texto.str.contains('foto', regex=False) & texto.str.contains('categoría', regex=False))
+    en_todos = conteo.to_numpy() == len(lista_dfs)
     
-    # NUEVO: Agregar TODAS las columnas de fotos aunque no estén en todos
-    columnas_fotos = set()
-    for df in lista_dfs:
-        for col in df.columns:
-            if 'foto' in col.lower() and 'categoría' in col.lower():
-                columnas_fotos.add(col)
-    
-    # Combinar columnas comunes + todas las fotos
-    columnas_finales = columnas_comunes | columnas_fotos
+    columnas_comunes = set(todas[en_todos & ~es_foto])
+    columnas_fotos = set(todas[es_foto])
     
-    return columnas_finales
+    return columnas_comunes, columnas_fotos, sorted(columnas_comunes | columnas_fotos)
+
+def encontrar_columnas_comunes(lista_dfs):
+    """
+    Encuentra las columnas que están en TODOS los DataFrames
+    Incluye automáticamente columnas de fotos aunque no estén en todos
+    """
+    columnas_comunes, columnas_fotos, _ = calcular_esquema(lista_dfs)
+    return columnas_comunes | columnas_fotos
 
 def apilar_con_columnas_comunes(lista_dfs, nombres_archivos):
     """
     Apila los DataFrames usando columnas comunes + todas las fotos
+    
+    El esquema se calcula una vez, cada DataFrame se reindexa una sola vez (sin
+    copiar sus columnas) y todo se concatena en una sola llamada, así el pico de
+    memoria es el del resultado y no tres copias por archivo
     """
     print("\n" + "="*70)
     print("🔍 ANÁLISIS DE COLUMNAS")
     print("="*70)
     
-    # Encontrar columnas comunes (incluye fotos)
-    columnas_finales = encontrar_columnas_comunes(lista_dfs)
-    
-    # Separar columnas comunes reales de columnas de fotos
-    columnas_fotos = {col for col in columnas_finales if 'foto' in col.lower() and 'categoría' in col.lower()}
-    columnas_comunes_reales = columnas_finales - columnas_fotos
+    # Esquema unificado: columnas comunes reales, fotos y orden final
+    columnas_comunes_reales, columnas_fotos, columnas_orden = calcular_esquema(lista_dfs)
+    columnas_finales = set(columnas_orden)
     
     print(f"\n✅ Columnas comunes en TODOS los archivos ({len(columnas_comunes_reales)}):")
     for col in sorted(columnas_comunes_reales):
@@ -96,26 +110,31 @@ def apilar_con_columnas_comunes(lista_dfs, nombres_archivos):
     print("📦 APILANDO DATOS")
     print("="*70)
     
-    lista_filtrada = []
-    for i, df in enumerate(lista_dfs):
-        # Agregar columnas faltantes (especialmente fotos) con None
-        df_expandido = df.copy()
-        for col in columnas_finales:
-            if col not in df_expandido.columns:
-                df_expandido[col] = None
-        
-        # Filtrar solo columnas finales
-        df_filtrado = df_expandido[sorted(columnas_finales)].copy()
-        
-        # Agregar columna de origen
-        df_filtrado['archivo_origen'] = nombres_archivos[i]
-        
-        lista_filtrada.append(df_filtrado)
-        
-        print(f"   ✅ {nombres_archivos[i]}: {len(df_filtrado):,} registros")
+    for nombre, df in zip(nombres_archivos, lista_dfs):
+        print(f"   ✅ {nombre}: {len(df):,} registros")
+    
+    # Tipo de cada columna en el primer archivo que la tiene: las columnas faltantes
+    # (especialmente fotos) se crean vacías con ese tipo para que concat no tenga
+    # que convertir la columna completa a object
+    tipos = {}
+    for df in lista_dfs:
+        for col, tipo in df.dtypes.items():
+            # Enteros y booleanos no admiten vacíos: esas columnas se dejan a concat
+            if tipo.kind not in 'iub':
+                tipos.setdefault(col, tipo)
+    
+    def reindexar(df):
+        faltantes = {col: tipos[col] for col in columnas_orden if col not in df.columns and col in tipos}
+        df = df.reindex(columns=columnas_orden)
+        return df.astype(faltantes) if faltantes else df
     
-    # Concatenar
-    df_apilado = pd.concat(lista_filtrada, ignore_index=True)
+    df_apilado = pd.concat([reindexar(df) for df in lista_dfs], ignore_index=True)
+    
+    # Agregar columna de origen
+    df_apilado['archivo_origen'] = np.repeat(
+        np.array(nombres_archivos, dtype=object),
+        [len(df) for df in lista_dfs]
+    )
     
     print(f"\n📊 RESULTADO:")
     print(f"   • Total de registros: {len(df_apilado):,}")
@@ -163,61 +182,72 @@ def reordenar_columnas_apiladas(df):
     
     return df[orden_final]
 
-def generar_reporte_apilado(df):
+def generar_reporte_apilado(df, perfil_completo=False):
     """
     Genera un reporte del archivo apilado
+    
+    Args:
+        df: DataFrame apilado
+        perfil_completo: Si es True se cuentan valores distintos y top de todas las columnas
+                         menos las de fotos (para la hoja de perfil); si no, solo de las
+                         que se muestran en el reporte
+    
+    Returns:
+        PerfilColumnas con la completitud de todas las columnas
     """
     print("\n" + "="*70)
     print("📊 REPORTE DE DATOS APILADOS")
     print("="*70)
     
+    # Completitud de todas las columnas en una sola pasada; los conteos (lo caro) solo donde se usan
+    cols_fotos = [col for col in df.columns if 'foto' in col.lower() and 'categoría' in col.lower()]
+    if perfil_completo:
+        contar = [col for col in df.columns if col not in cols_fotos]
+    else:
+        contar = ['archivo_origen', 'Proyecto', 'Estado', 'Id de Tienda']
+    perfil = PerfilColumnas(df, top_k=5, distribucion_completa=['archivo_origen', 'Proyecto'], contar=contar)
+    
     print(f"\n📈 RESUMEN:")
     print(f"   • Total de registros: {len(df):,}")
     print(f"   • Total de columnas: {len(df.columns)}")
     
     if 'archivo_origen' in df.columns:
         print(f"\n📂 DISTRIBUCIÓN POR ARCHIVO:")
-        dist = df['archivo_origen'].value_counts()
-        for archivo, count in dist.items():
+        for archivo, count in perfil.distribucion('archivo_origen').items():
             pct = (count / len(df) * 100)
             print(f"   • {archivo:35} → {count:>7,} registros ({pct:>5.1f}%)")
     
     if 'Proyecto' in df.columns:
         print(f"\n🎯 PROYECTOS:")
-        proyectos = df['Proyecto'].value_counts()
-        for proyecto, count in proyectos.items():
+        for proyecto, count in perfil.distribucion('Proyecto').items():
             pct = (count / len(df) * 100)
             print(f"   • {proyecto:35} → {count:>7,} registros ({pct:>5.1f}%)")
     
     if 'Estado' in df.columns:
         print(f"\n📍 COBERTURA GEOGRÁFICA:")
-        print(f"   • Estados únicos: {df['Estado'].nunique()}")
-        estados_top = df['Estado'].value_counts().head(5)
-        for estado, count in estados_top.items():
+        print(f"   • Estados únicos: {perfil.distintos['Estado']}")
+        for estado, count in perfil.distribucion('Estado', top=5).items():
             print(f"     - {estado:25} → {count:>6,} registros")
     
     if 'Id de Tienda' in df.columns:
-        print(f"   • Tiendas únicas: {df['Id de Tienda'].nunique()}")
+        print(f"   • Tiendas únicas: {perfil.distintos['Id de Tienda']}")
     
     # Fotos
-    cols_fotos = [col for col in df.columns if 'foto' in col.lower() and 'categoría' in col.lower()]
     if cols_fotos:
         print(f"\n📸 COLUMNAS DE FOTOS ({len(cols_fotos)}):")
         for col in cols_fotos:
-            con_foto = df[col].notna().sum()
-            pct = (con_foto / len(df) * 100) if len(df) > 0 else 0
+            con_foto = perfil.no_nulos[col]
+            pct = perfil.completitud(col)
             print(f"   • {col:35} → {con_foto:>6,} fotos ({pct:>5.1f}%)")
     
-    # Completitud
+    # Completitud (solo las columnas más importantes)
     print(f"\n📊 COMPLETITUD DE COLUMNAS:")
     for col in df.columns:
-        completos = df[col].notna().sum()
-        pct = (completos / len(df) * 100) if len(df) > 0 else 0
-        
-        # Solo mostrar las primeras 15 columnas más importantes
         if col in ['archivo_origen', 'Proyecto', 'Encuesta', 'Id de Tienda', 
                    'Estado', 'Municipio', 'Zona', 'Región', 'Fecha Subida',
                    'Encuestador/Tienda', 'Fecha Respuesta', '# Instancia']:
+            completos = perfil.no_nulos[col]
+            pct = perfil.completitud(col)
             simbolo = "✅" if pct >= 90 else "⚠️" if pct >= 50 else "❌"
             print(f"   {simbolo} {col:30} → {completos:>7,}/{len(df):,} ({pct:>5.1f}%)")
     
@@ -235,10 +265,17 @@ def generar_reporte_apilado(df):
             muestra_mostrar[col] = muestra_mostrar[col].astype(str).str[:30]
     
     print(muestra_mostrar.to_string(index=False))
+    
+    return perfil
 
-def guardar_excel(df, ruta):
+def guardar_excel(df, ruta, perfil=None):
     """
     Guarda el DataFrame en Excel
+    
+    Args:
+        df: DataFrame apilado
+        ruta: Ruta del archivo de salida
+        perfil: PerfilColumnas que se agrega como hoja aparte (opcional)
     """
     print(f"\n💾 Guardando archivo...")
     print(f"   📁 {ruta}")
@@ -255,8 +292,15 @@ def guardar_excel(df, ruta):
         # Reemplazar infinitos
         df_limpio = df_limpio.replace([float('inf'), float('-inf')], None)
         
-        # Guardar
-        df_limpio.to_excel(ruta, index=False, engine='openpyxl')
+        # Guardar en streaming (constant memory) + sidecar para Power BI
+        hojas = {'Sheet1': df_limpio}
+        if perfil is not None:
+            hojas[HOJA_PERFIL] = perfil.a_dataframe()
+        try:
+            guardar_hojas(ruta, hojas, sidecar=SIDECAR)
+        except ErrorSidecar as e:
+            # El Excel quedó completo; solo falta la copia para Power BI
+            print(f"⚠️  {e} (se borró el archivo a medias)")
         
         tamaño = Path(ruta).stat().st_size / (1024 * 1024)  # MB
         print(f"\n✅ Archivo guardado exitosamente!")
@@ -314,12 +358,12 @@ def main():
     df_apilado = reordenar_columnas_apiladas(df_apilado)
     
     # Generar reporte
-    generar_reporte_apilado(df_apilado)
+    perfil = generar_reporte_apilado(df_apilado, perfil_completo=ESCRIBIR_PERFIL)
     
     # Guardar
     ruta_salida = Path(CARPETA) / ARCHIVO_SALIDA
     
-    if guardar_excel(df_apilado, ruta_salida):
+    if guardar_excel(df_apilado, ruta_salida, perfil if ESCRIBIR_PERFIL else None):
         print("\n" + "="*70)
         print("✨ PROCESO COMPLETADO EXITOSAMENTE")
         print("="*70)
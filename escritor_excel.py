@@ -0,0 +1,320 @@
+"""
+Escritor de Excel en streaming
+Escribe las hojas fila por fila directo a disco (modo constant_memory de
+xlsxwriter o write_only de openpyxl), parte las hojas que pasan el límite de
+filas de Excel y puede dejar copias en Parquet/CSV para que Power BI las lea
+"""
+
+import re
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import xlsxwriter
+    XLSXWRITER_DISPONIBLE = True
+except ImportError:
+    XLSXWRITER_DISPONIBLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_DISPONIBLE = True
+except ImportError:
+    PARQUET_DISPONIBLE = False
+
+# Límite de filas de una hoja de Excel (incluye el encabezado)
+MAX_FILAS_EXCEL = 1_048_576
+MAX_NOMBRE_HOJA = 31
+FILAS_POR_BLOQUE = 50_000
+
+
+def _bloques(datos: Union[pd.DataFrame, Iterable[pd.DataFrame]], filas_por_bloque: int):
+    """Divide un DataFrame en bloques; si ya es un iterable de bloques lo recorre tal cual"""
+    if isinstance(datos, pd.DataFrame):
+        for inicio in range(0, max(len(datos), 1), filas_por_bloque):
+            yield datos.iloc[inicio:inicio + filas_por_bloque]
+    else:
+        yield from datos
+
+
+def _filas_para_excel(bloque: pd.DataFrame):
+    """Convierte un bloque en tuplas de valores nativos, con None en lugar de NaN/NaT/inf"""
+    valores = bloque.astype(object)
+    valores = valores.where(bloque.notna(), None)
+    valores = valores.replace([np.inf, -np.inf], None)
+    return valores.itertuples(index=False, name=None)
+
+
+def _tipos_estables(bloque: pd.DataFrame) -> pd.DataFrame:
+    """
+    Tipos que no cambian de un bloque a otro para el esquema del sidecar: los números
+    (enteros o flotantes, que con un nulo se vuelven float) quedan en float64, los
+    booleanos en boolean y los textos (object, str o categoría) en string
+    """
+    bloque = bloque.copy()
+    for col in bloque.columns:
+        tipo = bloque[col].dtype
+        if pd.api.types.is_bool_dtype(tipo):
+            bloque[col] = bloque[col].astype('boolean')
+        elif pd.api.types.is_numeric_dtype(tipo):
+            bloque[col] = bloque[col].astype('float64')
+        elif not pd.api.types.is_datetime64_any_dtype(tipo) and not pd.api.types.is_timedelta64_dtype(tipo):
+            bloque[col] = bloque[col].astype('string')
+    bloque.columns = [str(col) for col in bloque.columns]
+    return bloque
+
+
+def _nombre_hoja(nombre: str, parte: int) -> str:
+    """Nombre válido de hoja; a partir de la segunda parte se agrega un sufijo"""
+    nombre = re.sub(r'[\[\]:*?/\\]', '_', str(nombre))
+    if parte == 1:
+        return nombre[:MAX_NOMBRE_HOJA]
+    sufijo = f" ({parte})"
+    return nombre[:MAX_NOMBRE_HOJA - len(sufijo)] + sufijo
+
+
+class ErrorSidecar(Exception):
+    """No se pudo escribir el sidecar de una hoja (el Excel sí quedó completo)"""
+
+    def __init__(self, hoja: str, causa: Exception):
+        super().__init__(f"No se pudo escribir el sidecar de '{hoja}': {causa}")
+        self.hoja = hoja
+        self.causa = causa
+
+
+class EscritorExcelStreaming:
+    """Escribe hojas en un .xlsx sin construir el libro completo en memoria"""
+
+    def __init__(
+        self,
+        ruta,
+        motor: Optional[str] = None,
+        sidecar: Optional[str] = None,
+        filas_por_hoja: int = MAX_FILAS_EXCEL
+    ):
+        """
+        Inicializa el escritor
+
+        Args:
+            ruta: Ruta del archivo .xlsx de salida
+            motor: 'xlsxwriter' u 'openpyxl'. Si es None usa xlsxwriter si está instalado
+            sidecar: 'parquet', 'csv' o None. Escribe además cada hoja en ese formato
+                     junto al Excel, con nombre '<archivo>_<hoja>.<ext>'
+            filas_por_hoja: Filas máximas por hoja (incluye encabezado) antes de continuar en otra
+        """
+        self.ruta = Path(ruta)
+        self.motor = motor or ('xlsxwriter' if XLSXWRITER_DISPONIBLE else 'openpyxl')
+        self.sidecar = sidecar
+        self.filas_por_hoja = filas_por_hoja
+        self.archivos_sidecar: List[Path] = []
+
+        if self.sidecar == 'parquet' and not PARQUET_DISPONIBLE:
+            print("⚠️  pyarrow no está instalado, el sidecar se escribirá como CSV")
+            self.sidecar = 'csv'
+
+        if self.motor == 'xlsxwriter':
+            self.libro = xlsxwriter.Workbook(str(self.ruta), {
+                'constant_memory': True,
+                # Los textos van tal cual: una hoja admite solo 65,530 hipervínculos
+                # (las URLs de fotos los pasarían) y un texto con '=' no es fórmula
+                'strings_to_urls': False,
+                'strings_to_formulas': False,
+                'nan_inf_to_errors': True,
+                'remove_timezone': True,
+                'default_date_format': 'yyyy-mm-dd hh:mm:ss'
+            })
+        else:
+            from openpyxl import Workbook
+            self.libro = Workbook(write_only=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        self.cerrar()
+        return False
+
+    def _nueva_hoja(self, nombre: str, columnas: List[str]):
+        """Crea una hoja y escribe el encabezado"""
+        if self.motor == 'xlsxwriter':
+            hoja = self.libro.add_worksheet(nombre)
+            hoja.write_row(0, 0, columnas)
+        else:
+            hoja = self.libro.create_sheet(nombre)
+            hoja.append(columnas)
+        return hoja
+
+    def _escribir_fila(self, hoja, numero_fila: int, fila):
+        """Escribe una fila en la hoja (numero_fila empieza en 0 e incluye el encabezado)"""
+        if self.motor == 'xlsxwriter':
+            # xlsxwriter no lanza excepciones: devuelve un código negativo y deja la fila incompleta
+            codigo = hoja.write_row(numero_fila, 0, fila)
+            if codigo is not None and codigo < 0:
+                raise ValueError(f"xlsxwriter no pudo escribir la fila {numero_fila + 1} (código {codigo})")
+        else:
+            hoja.append(fila)
+
+    def escribir_hoja(
+        self,
+        nombre: str,
+        datos: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+        columnas: Optional[List[str]] = None,
+        para_excel: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None
+    ) -> int:
+        """
+        Escribe una hoja a partir de un DataFrame o de un iterable de bloques
+
+        Args:
+            nombre: Nombre de la hoja
+            datos: DataFrame o iterable de DataFrames con las mismas columnas
+            columnas: Orden de columnas. Si es None se usan las del primer bloque
+            para_excel: Transformación que se aplica solo a lo que va al Excel
+                        (ej. rellenar vacíos con ''); el sidecar recibe el bloque con sus tipos.
+                        Puede cambiar las columnas: el encabezado sale de su resultado
+
+        Returns:
+            Número de filas de datos escritas
+
+        Raises:
+            ErrorSidecar: Si el sidecar falló. Se lanza al terminar la hoja, así que el
+                          Excel queda completo; el sidecar a medias se borra
+        """
+        parte = 1
+        hoja = None
+        fila_hoja = 0
+        total = 0
+        escritor_sidecar = None
+        error_sidecar = None
+
+        try:
+            for bloque in _bloques(datos, FILAS_POR_BLOQUE):
+                if columnas is None:
+                    columnas = [str(col) for col in bloque.columns]
+                else:
+                    bloque = bloque.reindex(columns=columnas)
+
+                vista = para_excel(bloque) if para_excel else bloque
+                if hoja is None:
+                    columnas_excel = [str(col) for col in vista.columns]
+                    hoja = self._nueva_hoja(_nombre_hoja(nombre, parte), columnas_excel)
+                    fila_hoja = 1
+
+                for fila in _filas_para_excel(vista):
+                    # Continuar en otra hoja al llegar al límite de Excel
+                    if fila_hoja >= self.filas_por_hoja:
+                        parte += 1
+                        hoja = self._nueva_hoja(_nombre_hoja(nombre, parte), columnas_excel)
+                        fila_hoja = 1
+                    self._escribir_fila(hoja, fila_hoja, fila)
+                    fila_hoja += 1
+
+                total += len(bloque)
+
+                if self.sidecar and len(bloque) > 0 and error_sidecar is None:
+                    try:
+                        escritor_sidecar = self._escribir_sidecar(nombre, bloque, escritor_sidecar)
+                    except Exception as e:
+                        error_sidecar = e
+                        self._descartar_sidecar(nombre, escritor_sidecar)
+                        escritor_sidecar = None
+        finally:
+            if PARQUET_DISPONIBLE and isinstance(escritor_sidecar, pq.ParquetWriter):
+                escritor_sidecar.close()
+
+        # Una hoja vacía conserva al menos el encabezado
+        if hoja is None:
+            self._nueva_hoja(_nombre_hoja(nombre, 1), columnas or [])
+
+        if parte > 1:
+            print(f"  ↪ Hoja '{nombre}' dividida en {parte} hojas por el límite de {self.filas_por_hoja:,} filas")
+
+        if error_sidecar is not None:
+            raise ErrorSidecar(nombre, error_sidecar)
+
+        return total
+
+    def _ruta_sidecar(self, nombre: str) -> Path:
+        """Ruta del archivo sidecar de una hoja"""
+        nombre_limpio = re.sub(r'[^\w\-]+', '_', str(nombre)).strip('_')
+        return self.ruta.with_name(f"{self.ruta.stem}_{nombre_limpio}.{self.sidecar}")
+
+    def _escribir_sidecar(self, nombre: str, bloque: pd.DataFrame, escritor):
+        """
+        Agrega un bloque al sidecar de la hoja
+
+        El esquema se fija con el primer bloque (ver _tipos_estables) y los siguientes se
+        convierten a ese esquema; si alguno no se puede convertir se lanza la excepción
+
+        Returns:
+            Estado del escritor para el siguiente bloque (ParquetWriter, o True para CSV)
+        """
+        ruta = self._ruta_sidecar(nombre)
+        if self.sidecar == 'csv':
+            primera_vez = escritor is None
+            if primera_vez:
+                self.archivos_sidecar.append(ruta)
+            bloque.to_csv(ruta, mode='w' if primera_vez else 'a', header=primera_vez,
+                          index=False, encoding='utf-8-sig' if primera_vez else 'utf-8')
+            return True
+
+        tabla = pa.Table.from_pandas(_tipos_estables(bloque), preserve_index=False)
+        if escritor is None:
+            self.archivos_sidecar.append(ruta)
+            escritor = pq.ParquetWriter(ruta, tabla.schema)
+        else:
+            tabla = tabla.cast(escritor.schema)
+        escritor.write_table(tabla)
+        return escritor
+
+    def _descartar_sidecar(self, nombre: str, escritor):
+        """Cierra y borra el sidecar a medias de una hoja para que no pase por uno válido"""
+        if PARQUET_DISPONIBLE and isinstance(escritor, pq.ParquetWriter):
+            try:
+                escritor.close()
+            except Exception:
+                pass
+        ruta = self._ruta_sidecar(nombre)
+        if ruta in self.archivos_sidecar:
+            self.archivos_sidecar.remove(ruta)
+        ruta.unlink(missing_ok=True)
+
+    def cerrar(self):
+        """Cierra el libro y termina de escribirlo en disco"""
+        if self.libro is None:
+            return
+        if self.motor == 'xlsxwriter':
+            self.libro.close()
+        else:
+            self.libro.save(self.ruta)
+        self.libro = None
+
+
+def guardar_hojas(ruta, hojas: Dict[str, pd.DataFrame], sidecar: Optional[str] = None) -> Dict[str, int]:
+    """
+    Guarda varias hojas en streaming
+
+    Args:
+        ruta: Ruta del archivo .xlsx de salida
+        hojas: Diccionario nombre de hoja -> DataFrame (o iterable de bloques)
+        sidecar: 'parquet', 'csv' o None
+
+    Returns:
+        Diccionario nombre de hoja -> filas escritas
+
+    Raises:
+        ErrorSidecar: El primer sidecar que falló, después de escribir todas las hojas
+    """
+    filas = {}
+    error_sidecar = None
+    with EscritorExcelStreaming(ruta, sidecar=sidecar) as escritor:
+        for nombre, datos in hojas.items():
+            try:
+                filas[nombre] = escritor.escribir_hoja(nombre, datos)
+            except ErrorSidecar as e:
+                error_sidecar = error_sidecar or e
+    if error_sidecar is not None:
+        raise error_sidecar
+    return filas
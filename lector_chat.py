@@ -0,0 +1,180 @@
+"""
+Lector de chats exportados de WhatsApp (TXT)
+Lee el archivo por rangos de bytes que terminan en fin de línea, sin cargarlo
+completo en memoria. Cada rango pasa por una etapa de filtrado (una función
+generadora) en un proceso aparte y los resultados se entregan en el orden del
+archivo, así que la memoria no crece con el tamaño del chat
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+# Bytes por rango: cada proceso lee, filtra y devuelve un rango a la vez
+TAMANO_RANGO = 4 * 1024 * 1024
+
+# Bytes por lectura dentro de cada rango
+TAMANO_BLOQUE = 1024 * 1024
+
+# Etapa de filtrado: recibe las líneas de un rango y produce lo que se quiere conservar
+Etapa = Callable[[Iterator[str]], Iterable]
+
+
+def _lineas_del_texto(texto: str) -> List[str]:
+    """Líneas no vacías de un bloque de texto, cortando en '\n', '\r\n' o '\r' como el modo texto"""
+    if '\r' in texto:
+        texto = texto.replace('\r\n', '\n').replace('\r', '\n')
+    return [linea for linea in map(str.strip, texto.split('\n')) if linea]
+
+
+def bloques_del_rango(ruta, inicio: int = 0, fin: Optional[int] = None,
+                      tamano_bloque: int = TAMANO_BLOQUE) -> Iterator[List[str]]:
+    """
+    Líneas no vacías (sin espacios alrededor) que empiezan dentro de un rango de bytes,
+    en listas de un bloque de lectura cada una
+
+    Dan las mismas líneas que abrir el archivo en modo texto UTF-8 y hacer strip a cada
+    una. Cada bloque se decodifica de una vez hasta su último '\n' (un carácter UTF-8
+    nunca contiene ese byte, así que no se parte)
+
+    Args:
+        ruta: Archivo TXT en UTF-8
+        inicio: Byte donde empieza el rango (debe ser inicio de línea)
+        fin: Byte donde termina el rango (inicio de línea o fin del archivo).
+             Si es None hasta el final del archivo
+        tamano_bloque: Bytes por lectura
+    """
+    with open(ruta, 'rb') as f:
+        f.seek(inicio)
+        restante = None if fin is None else fin - inicio
+        pendiente = b''
+        while restante is None or restante > 0:
+            bloque = f.read(tamano_bloque if restante is None else min(tamano_bloque, restante))
+            if not bloque:
+                break
+            if restante is not None:
+                restante -= len(bloque)
+
+            # La línea incompleta del final pasa al siguiente bloque
+            bloque = pendiente + bloque
+            corte = bloque.rfind(b'\n') + 1
+            pendiente = bloque[corte:]
+            yield _lineas_del_texto(bloque[:corte].decode('utf-8'))
+
+        if pendiente:
+            yield _lineas_del_texto(pendiente.decode('utf-8'))
+
+
+def lineas_del_rango(ruta, inicio: int = 0, fin: Optional[int] = None,
+                     tamano_bloque: int = TAMANO_BLOQUE) -> Iterator[str]:
+    """Líneas no vacías de un rango de bytes, una por una (ver bloques_del_rango)"""
+    return chain.from_iterable(bloques_del_rango(ruta, inicio, fin, tamano_bloque))
+
+
+def _procesar_rango(ruta, inicio: int, fin: int, etapa: Etapa) -> Tuple[int, list]:
+    """
+    Pasa un rango por la etapa de filtrado (se ejecuta en los procesos)
+
+    Returns:
+        (líneas no vacías leídas, lista con lo que produjo la etapa)
+    """
+    contador = [0]
+
+    def _contar(bloques):
+        for bloque in bloques:
+            contador[0] += len(bloque)
+            yield bloque
+
+    resultados = list(etapa(chain.from_iterable(_contar(bloques_del_rango(ruta, inicio, fin)))))
+    return contador[0], resultados
+
+
+class LectorChat:
+    """Lectura en streaming de un chat por rangos de bytes, opcionalmente en varios procesos"""
+
+    def __init__(self, ruta, procesos: Optional[int] = None, tamano_rango: int = TAMANO_RANGO):
+        """
+        Args:
+            ruta: Archivo TXT en UTF-8
+            procesos: Procesos de filtrado. Si es None uno por CPU; con 1 todo se hace
+                      en el proceso actual
+            tamano_rango: Bytes por rango
+        """
+        self.ruta = ruta
+        self.tamano = os.path.getsize(ruta)
+        self.procesos = procesos or os.cpu_count() or 1
+        self.tamano_rango = tamano_rango
+
+        # Avance de la lectura (se actualiza conforme se consumen los resultados)
+        self.lineas = 0
+        self.bytes_procesados = 0
+
+    def rangos(self) -> Iterator[Tuple[int, int]]:
+        """Rangos (inicio, fin) de aproximadamente tamano_rango bytes, cortados en fin de línea"""
+        inicio = 0
+        with open(self.ruta, 'rb') as f:
+            while inicio < self.tamano:
+                f.seek(min(inicio + self.tamano_rango, self.tamano))
+                f.readline()  # Avanza hasta el inicio de la siguiente línea
+                fin = min(f.tell(), self.tamano)
+                yield inicio, fin
+                inicio = fin
+
+    @property
+    def porcentaje(self) -> float:
+        """Porcentaje del archivo ya procesado"""
+        return (self.bytes_procesados / self.tamano * 100) if self.tamano > 0 else 100
+
+    def procesar(self, etapa: Etapa) -> Iterator:
+        """
+        Pasa todo el chat por una etapa de filtrado
+
+        La etapa tiene que ser una función de nivel de módulo (o un functools.partial de
+        una) para poder enviarse a los procesos. Solo lo que produce la etapa regresa al
+        proceso principal, y hay a lo más dos rangos por proceso en vuelo
+
+        Args:
+            etapa: Función generadora que recibe las líneas de un rango
+
+        Yields:
+            Lo que produce la etapa, en el orden del archivo
+        """
+        self.lineas = 0
+        self.bytes_procesados = 0
+
+        # Un solo rango o un solo proceso: no vale la pena levantar procesos
+        if self.procesos <= 1 or self.tamano <= self.tamano_rango:
+            for inicio, fin in self.rangos():
+                yield from etapa(chain.from_iterable(self._contar(bloques_del_rango(self.ruta, inicio, fin))))
+                self.bytes_procesados = fin
+            return
+
+        rangos = self.rangos()
+        limite = self.procesos * 2  # Rangos en vuelo: los procesos nunca esperan al siguiente
+        en_vuelo = deque()
+
+        with ProcessPoolExecutor(max_workers=self.procesos) as executor:
+            for inicio, fin in rangos:
+                en_vuelo.append((executor.submit(_procesar_rango, self.ruta, inicio, fin, etapa), fin))
+                if len(en_vuelo) >= limite:
+                    break
+
+            # Se entregan en orden: se espera al rango más antiguo y se manda uno nuevo
+            while en_vuelo:
+                futuro, fin = en_vuelo.popleft()
+                siguiente = next(rangos, None)
+                if siguiente is not None:
+                    en_vuelo.append((executor.submit(_procesar_rango, self.ruta, *siguiente, etapa), siguiente[1]))
+
+                lineas, resultados = futuro.result()
+                self.lineas += lineas
+                self.bytes_procesados = fin
+                yield from resultados
+
+    def _contar(self, bloques: Iterator[List[str]]) -> Iterator[List[str]]:
+        """Cuenta las líneas leídas en el proceso actual"""
+        for bloque in bloques:
+            self.lineas += len(bloque)
+            yield bloque
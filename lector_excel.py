@@ -0,0 +1,148 @@
+"""
+Lector de Excel compartido
+Elige el motor más rápido disponible (calamine si está instalado, openpyxl en
+modo solo lectura si no) y lee únicamente las columnas que se van a usar
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import python_calamine  # noqa: F401
+    CALAMINE_DISPONIBLE = True
+except ImportError:
+    CALAMINE_DISPONIBLE = False
+
+# Extensiones que openpyxl puede abrir; el resto (.xls) lo resuelve pandas
+EXTENSIONES_OPENPYXL = ('.xlsx', '.xlsm', '.xltx', '.xltm')
+
+
+def motor_disponible() -> str:
+    """Devuelve el motor de lectura más rápido instalado"""
+    return 'calamine' if CALAMINE_DISPONIBLE else 'openpyxl'
+
+
+def _motor_para(ruta, motor=None):
+    """Resuelve el motor a usar para un archivo concreto"""
+    motor = motor or motor_disponible()
+    if motor == 'openpyxl' and Path(ruta).suffix.lower() not in EXTENSIONES_OPENPYXL:
+        return None
+    return motor
+
+
+def leer_excel(ruta, sheet_name=0, skiprows=None, columnas=None, motor=None, **kwargs) -> pd.DataFrame:
+    """
+    Lee una hoja de Excel con el motor más rápido disponible
+
+    Args:
+        ruta: Ruta del archivo Excel
+        sheet_name: Hoja a leer
+        skiprows: Filas a saltar antes del encabezado
+        columnas: Nombres de las columnas necesarias. Se comparan sin espacios
+                  alrededor y solo esas columnas se convierten a DataFrame.
+                  Si es None se leen todas
+        motor: 'calamine' u 'openpyxl'. Si es None se elige automáticamente
+        **kwargs: Parámetros adicionales para pd.read_excel
+
+    Returns:
+        DataFrame con las columnas en el orden del archivo
+    """
+    if columnas is not None:
+        necesarias = {str(col).strip() for col in columnas}
+        kwargs['usecols'] = lambda col: str(col).strip() in necesarias
+
+    return pd.read_excel(
+        ruta,
+        sheet_name=sheet_name,
+        skiprows=skiprows,
+        engine=_motor_para(ruta, motor),
+        **kwargs
+    )
+
+
+# ===================== BENCHMARK =====================
+
+def _crear_rutero_sintetico(ruta, filas):
+    """Genera un RUTERO sintético con el layout real (4 filas de título + encabezado)"""
+    rng = np.random.default_rng(0)
+    dias = ["LUNES", "MARTES", "MIERCOLES", "JUEVES", "VIERNES", "SABADO", "DOMINGO"]
+
+    df = pd.DataFrame({
+        'ID_TIENDA': [f"T{i:06d}" for i in range(filas)],
+        'TIENDA ID_CUBO': [f"{i}_{i % 9000} - BA TIENDA {i}" for i in range(filas)],
+        'Nombre Promotor': [f"PROMOTOR {i % 800}" for i in range(filas)],
+        'Usuario Virtual': [f"R{i % 800:04d}" for i in range(filas)],
+        'Usuario APP Promotor': [f"app{i % 800:04d}" for i in range(filas)],
+        'Nombre Supervisor': [f"SUPERVISOR {i % 60}" for i in range(filas)],
+        'Zona - Region': [f"ZONA {i % 8}" for i in range(filas)],
+        'Codigo RO': rng.integers(1000, 99999, filas),
+        'Nombre de Tienda': [f"TIENDA {i}" for i in range(filas)],
+        'Latitud': rng.uniform(14, 32, filas),
+        'Longitud': rng.uniform(-117, -86, filas),
+        'Area Nielsen': [f"AREA {i % 7}" for i in range(filas)],
+        'Canal de Distribución': [f"CANAL {i % 3}" for i in range(filas)],
+        'Cadena': [f"CADENA {i % 25}" for i in range(filas)],
+        'Formato': [f"FORMATO {i % 12}" for i in range(filas)],
+        'Numero de Visitas (Clasificacion)': rng.integers(1, 6, filas),
+    })
+    for semana in range(1, 6):
+        for dia in dias:
+            df[f"S{semana}-{dia}"] = rng.integers(0, 2, filas)
+
+    with pd.ExcelWriter(ruta, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name='RUTERO', index=False, startrow=4)
+
+
+def benchmark_motores(filas=50_000):
+    """
+    Compara motores de lectura sobre un RUTERO sintético, con y sin selección de columnas
+
+    Args:
+        filas: Número de filas del RUTERO sintético
+    """
+    columnas = ['ID_TIENDA', 'Usuario Virtual', 'Usuario APP Promotor', 'Nombre de Tienda',
+                'Numero de Visitas (Clasificacion)']
+
+    motores = ['openpyxl'] + (['calamine'] if CALAMINE_DISPONIBLE else [])
+
+    print("=" * 70)
+    print(f"⏱️  BENCHMARK DE LECTURA: RUTERO sintético de {filas:,} filas")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = Path(carpeta) / "Rutero Benchmark.xlsx"
+        print("\n🛠️  Generando archivo...")
+        _crear_rutero_sintetico(ruta, filas)
+        print(f"   • Tamaño: {ruta.stat().st_size / (1024 * 1024):.1f} MB")
+
+        referencia = None
+        print(f"\n{'Motor':12} {'Columnas':>10} {'Segundos':>10}")
+        for motor in motores:
+            for descripcion, cols in [('todas', None), ('5', columnas)]:
+                inicio = time.perf_counter()
+                df = leer_excel(ruta, sheet_name='RUTERO', skiprows=4, columnas=cols, motor=motor)
+                segundos = time.perf_counter() - inicio
+                print(f"{motor:12} {descripcion:>10} {segundos:>10.2f}")
+
+                # Verificar que la selección de columnas no cambia el resultado
+                if referencia is None and cols is None:
+                    referencia = df[columnas]
+                elif cols is not None:
+                    pd.testing.assert_frame_equal(
+                        df[columnas].reset_index(drop=True),
+                        referencia.reset_index(drop=True),
+                        check_dtype=False
+                    )
+
+        print("\n✅ Todas las lecturas devolvieron los mismos datos")
+        if not CALAMINE_DISPONIBLE:
+            print("ℹ️  Instale python-calamine para comparar también ese motor")
+
+
+if __name__ == "__main__":
+    benchmark_motores(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,103 @@
+"""
+Limpieza numérica vectorizada compartida por los normalizadores de precios
+Trabaja sobre columnas completas: cada valor distinto se limpia una sola vez
+y el resultado siempre es una columna float64
+"""
+
+import numpy as np
+import pandas as pd
+
+# Textos que se consideran vacíos (comparados en minúsculas y sin espacios)
+SENTINELAS_VACIO = ['', 'nan', 'none', 'n/a']
+
+MODOS = ('estricto', 'flexible')
+
+
+def _a_float(texto: str) -> float:
+    """float() que devuelve NaN en lugar de fallar"""
+    try:
+        return float(texto)
+    except (ValueError, OverflowError):
+        return np.nan
+
+
+def _preparar(serie: pd.Series, modo: str):
+    """
+    Factoriza la serie y aplica la limpieza de texto del modo a los valores distintos
+
+    Returns:
+        (códigos, texto limpio de cada valor distinto, máscara de vacíos)
+    """
+    if modo not in MODOS:
+        raise ValueError(f"Modo inválido '{modo}'. Use uno de: {', '.join(MODOS)}")
+
+    codigos, unicos = pd.factorize(serie)
+    # Texto con semántica de re de Python (\d incluye dígitos Unicode, igual que re.sub)
+    texto = pd.Series(unicos, dtype=object).astype(str).astype('string[python]').str.strip()
+    vacio = texto.str.lower().isin(SENTINELAS_VACIO).to_numpy(dtype=bool)
+
+    if modo == 'estricto':
+        # Eliminar TODO excepto números, puntos y signos negativos
+        texto = texto.str.replace(r'[^\d.\-]', '', regex=True)
+        # Varios puntos (ej: "1.234.56" -> "1234.56"): se quitan todos menos el último
+        texto = texto.str.replace(r'\.(?=[^.]*\.)', '', regex=True)
+    else:
+        # Solo se quitan las comas de miles (ej: "1,234.56")
+        texto = texto.str.replace(',', '', regex=False)
+
+    return codigos, texto, vacio
+
+
+def _expandir(codigos: np.ndarray, valores: np.ndarray, relleno) -> np.ndarray:
+    """Lleva los valores calculados por valor distinto a todas las filas (código -1 = nulo)"""
+    if len(valores) == 0:
+        return np.full(len(codigos), relleno, dtype=valores.dtype)
+    return np.where(codigos >= 0, valores[codigos], relleno)
+
+
+def limpiar_serie_numerica(serie: pd.Series, modo: str = 'estricto') -> pd.Series:
+    """
+    Convierte una columna a float64
+
+    Args:
+        serie: Columna con valores crudos de la encuesta
+        modo: 'estricto' elimina todo excepto dígitos, punto y signo negativo y colapsa
+              separadores de miles; 'flexible' solo quita comas y convierte con float()
+
+    Returns:
+        Serie float64 con NaN en vacíos ('', 'nan', 'none', 'n/a', nulos) y en valores no convertibles
+    """
+    codigos, texto, vacio = _preparar(serie, modo)
+
+    numeros = np.full(len(texto), np.nan)
+    if modo == 'estricto':
+        # Solo lo que float() acepta con estos caracteres: signo opcional, dígitos y un punto
+        valido = ~vacio & texto.str.fullmatch(r'-?(?:\d+\.?\d*|\.\d+)').to_numpy(dtype=bool)
+        numeros[valido] = texto[valido].to_numpy(dtype=object).astype('float64')
+    else:
+        numeros[~vacio] = [_a_float(t) for t in texto[~vacio]]
+
+    return pd.Series(_expandir(codigos, numeros, np.nan), index=serie.index, dtype='float64')
+
+
+def textos_no_numericos(serie: pd.Series) -> pd.Series:
+    """
+    Texto de los valores que el modo 'flexible' no pudo convertir (sin comas, como lo dejaba
+    la versión anterior); NA en el resto
+
+    Args:
+        serie: Columna con valores crudos de la encuesta
+
+    Returns:
+        Serie de texto alineada con la original
+    """
+    codigos, texto, vacio = _preparar(serie, 'flexible')
+
+    textos = np.full(len(texto), None, dtype=object)
+    for i in np.flatnonzero(~vacio):
+        try:
+            float(texto[i])
+        except (ValueError, OverflowError):
+            textos[i] = texto[i]
+
+    return pd.Series(_expandir(codigos, textos, None), index=serie.index, dtype=object)
@@ -1,86 +1,52 @@
+import numpy as np
 import pandas as pd
 from pathlib import Path
-import re
+import io
+import contextlib
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from escritor_excel import EscritorExcelStreaming, ErrorSidecar, FILAS_POR_BLOQUE
+from base_compacta import BaseNormalizada, EstadisticasExportacion
+from clasificador_columnas import cache_clasificacion
+from limpieza_numerica import limpiar_serie_numerica
 
 # ===================== CONFIGURACIÓN =====================
 CARPETA = r"C:\Users\lapmxdf558\Documents\Archivos Alejandro\Genomma Mayoreo\BI\precios\Competencia"
 ARCHIVO_SALIDA = "Base_PreciosCompetencia_Normalizada.xlsx"
+SIDECAR = 'parquet'  # Copia para Power BI: 'parquet', 'csv' o None
+PARALELO = True  # Procesar cada archivo en un proceso aparte
+MAX_WORKERS = None  # None = número de CPUs
+CACHE_COLUMNAS = Path(CARPETA) / '.clasificacion_columnas.json'  # Planes de columnas por encabezados
 
 # ===================== FUNCIONES =====================
 
-def extraer_nombre_producto(columna):
+def despivotear_productos(df, productos, columnas_por_medida):
     """
-    Extrae el nombre del producto limpiando prefijos de forma agresiva
-    """
-    texto = str(columna).strip()
-    
-    # Remover TODOS los prefijos posibles de forma más agresiva
-    # Importante: ordenar de más específico a menos específico
-    patrones_remover = [
-        # Precios con variaciones
-        r'^precio\s+promoción\s+o\s+descuento\s+precio\s+regular\s+',
-        r'^precio\s+regular\s+\([^)]+\)\s+de\s+',
-        r'^precio\s+regular\s+\([^)]+\)\s+',
-        r'^precio\s+promoción\s+o\s+descuento\s*',
-        r'^precio\s+promocion\s+o\s+descuento\s*',
-        r'^precio\s+promoción\s*',
-        r'^precio\s+promocion\s*',
-        r'^precio\s+regular\s+',
-        r'^precio\s+',
-        # Inventarios
-        r'^inventario\s+',
-        # Fotos
-        r'^foto\s+de\s+la\s+categoría\s*',
-    ]
-    
-    # Aplicar cada patrón
-    for patron in patrones_remover:
-        texto = re.sub(patron, '', texto, flags=re.IGNORECASE)
-    
-    # Limpieza final: remover espacios múltiples y strips
-    texto = re.sub(r'\s+', ' ', texto).strip()
+    Despivotea la encuesta de forma vectorizada: una fila por (fila original, producto).
+    La metadata no se repite: cada registro guarda en 'instancia' la posición de su fila
     
-    return texto
-
-def limpiar_valor_numerico(valor):
-    """
-    Convierte un valor a numérico PURO, eliminando TODO excepto números y puntos
+    Args:
+        df: Encuesta en formato ancho
+        productos: Productos en el orden de salida
+        columnas_por_medida: {'inventario': {producto: columna}, 'precio_regular': {...}, ...}
     """
-    if pd.isna(valor):
-        return None
-    
-    valor_str = str(valor).strip()
-    
-    # Si está vacío
-    if valor_str == '' or valor_str.lower() in ['nan', 'none', 'n/a']:
-        return None
-    
-    # LIMPIAR: Eliminar TODO excepto números, puntos y signos negativos
-    # Remover: letras, símbolos de moneda, comas, espacios, etc.
-    valor_limpio = re.sub(r'[^\d.\-]', '', valor_str)
-    
-    # Si después de limpiar queda vacío
-    if valor_limpio == '' or valor_limpio == '.':
-        return None
+    n_filas = len(df)
+    n_productos = len(productos)
+    
+    resultado = pd.DataFrame({
+        'instancia': np.repeat(np.arange(n_filas, dtype=np.int32), n_productos),
+        'producto': np.tile(np.array(productos, dtype=object), n_filas)
+    })
+    
+    # Cada medida se arma como matriz (filas × productos) alineada por producto y se aplana
+    for medida, columnas in columnas_por_medida.items():
+        matriz = np.full((n_filas, n_productos), None, dtype=object)
+        for j, producto in enumerate(productos):
+            if producto in columnas:
+                matriz[:, j] = df[columnas[producto]].to_numpy(dtype=object)
+        resultado[medida] = limpiar_serie_numerica(pd.Series(matriz.ravel()), modo='estricto')
     
-    # Manejar múltiples puntos (ej: "1.234.56" -> "1234.56")
-    partes = valor_limpio.split('.')
-    if len(partes) > 2:
-        # Si hay varios puntos, asumir que los primeros son separadores de miles
-        valor_limpio = ''.join(partes[:-1]) + '.' + partes[-1]
-    
-    # Intentar convertir a número
-    try:
-        numero = float(valor_limpio)
-        
-        # Si es un entero, devolverlo como entero
-        if numero.is_integer():
-            return int(numero)
-        
-        return numero
-    except:
-        # Si aún así falla, devolver None
-        return None
+    return resultado
 
 def procesar_archivo(ruta_archivo):
     """
@@ -98,55 +64,15 @@ def procesar_archivo(ruta_archivo):
         
         print(f"📊 Dimensiones: {df.shape[0]:,} filas × {df.shape[1]} columnas")
         
-        # Identificar columnas metadata (NO productos)
-        cols_metadata = []
-        for col in df.columns:
-            col_lower = str(col).lower()
-            es_metadata = any(x in col_lower for x in [
-                'instancia', 'proyecto', 'encuesta', 'tienda', 'encuestador',
-                'comunidad', 'estado', 'municipio', 'zona', 'región',
-                'fecha subida', 'geolocalización', 'sku', 
-                'descripción', 'cantidad', 'total', 'presentación'
-            ])
-            # Excluir Fecha Respuesta duplicadas pero NO las fotos
-            if es_metadata and not re.match(r'fecha respuesta\.\d+', col_lower):
-                cols_metadata.append(col)
-        
-        # Identificar columnas de producto
-        cols_inventario = {}
-        cols_precio_reg = {}
-        cols_precio_promo = {}
-        cols_foto = {}  # Para fotos asociadas a productos
-        
-        for col in df.columns:
-            if col in cols_metadata:
-                continue
-                
-            col_lower = str(col).lower()
-            
-            # INVENTARIO (solo columnas explícitas de "Inventario")
-            if 'inventario' in col_lower:
-                producto = extraer_nombre_producto(col)
-                cols_inventario[producto] = col
-            
-            # FOTO DE CATEGORÍA (asociar a productos si es posible)
-            elif 'foto' in col_lower and 'categoría' in col_lower:
-                cols_foto[col] = col
-            
-            # PRECIO REGULAR
-            elif 'precio regular' in col_lower or \
-                 ('sin descuento' in col_lower and 'precio' in col_lower) or \
-                 ('sin promoción' in col_lower and 'precio' in col_lower):
-                producto = extraer_nombre_producto(col)
-                if producto not in cols_precio_reg:
-                    cols_precio_reg[producto] = col
-            
-            # PRECIO PROMOCIÓN
-            elif 'promoción' in col_lower or 'promocion' in col_lower:
-                if 'precio' in col_lower or 'descuento' in col_lower:
-                    producto = extraer_nombre_producto(col)
-                    if producto not in cols_precio_promo:
-                        cols_precio_promo[producto] = col
+        # Clasificar columnas (el plan se reutiliza para encabezados ya vistos)
+        plan, desde_cache = cache_clasificacion(CACHE_COLUMNAS).obtener_plan(df.columns)
+        cols_metadata = plan['metadata']
+        cols_inventario = plan['inventario']
+        cols_precio_reg = plan['precio_regular']
+        cols_precio_promo = plan['precio_promocion']
+        cols_foto = plan['foto']
+        if desde_cache:
+            print("♻️  Columnas clasificadas desde caché (mismos encabezados)")
         
         print(f"\n📦 Columnas detectadas:")
         print(f"   • Metadata: {len(cols_metadata)}")
@@ -167,52 +93,30 @@ def procesar_archivo(ruta_archivo):
         
         print(f"   • Productos únicos: {len(todos_productos)}")
         
-        # Crear registros normalizados
-        registros = []
-        
-        for idx, row in df.iterrows():
-            # Datos base (metadata)
-            datos_base = {}
-            for col in cols_metadata:
-                if col in df.columns:
-                    datos_base[col] = row[col]
-            
-            # Agregar las fotos generales (no asociadas a productos específicos)
-            for col_foto in cols_foto:
-                datos_base[col_foto] = row[col_foto]
-            
-            datos_base['archivo_fuente'] = nombre
-            
-            # Por cada producto único, crear un registro
-            for producto in todos_productos:
-                registro = datos_base.copy()
-                registro['producto'] = producto
-                
-                # Inventario (limpiar y convertir a numérico)
-                val_inv = row[cols_inventario[producto]] if producto in cols_inventario else None
-                registro['inventario'] = limpiar_valor_numerico(val_inv)
-                
-                # Precio Regular (limpiar y convertir a numérico)
-                val_reg = row[cols_precio_reg[producto]] if producto in cols_precio_reg else None
-                registro['precio_regular'] = limpiar_valor_numerico(val_reg)
-                
-                # Precio Promoción (limpiar y convertir a numérico)
-                val_promo = row[cols_precio_promo[producto]] if producto in cols_precio_promo else None
-                registro['precio_promocion'] = limpiar_valor_numerico(val_promo)
-                
-                registros.append(registro)
-        
-        # Crear DataFrame
-        df_resultado = pd.DataFrame(registros)
+        # Crear registros normalizados: despivoteo vectorizado (productos en orden alfabético)
+        df_resultado = despivotear_productos(
+            df,
+            sorted(todos_productos),
+            {
+                'inventario': cols_inventario,
+                'precio_regular': cols_precio_reg,
+                'precio_promocion': cols_precio_promo
+            }
+        )
         
         # Eliminar filas completamente vacías
         df_resultado = df_resultado[
             df_resultado[['inventario', 'precio_regular', 'precio_promocion']].notna().any(axis=1)
         ]
         
-        print(f"✅ Registros normalizados: {len(df_resultado):,}")
+        # Metadata (y fotos) una sola vez por instancia
+        metadata = df[cols_metadata + list(cols_foto)].copy()
+        metadata['archivo_fuente'] = nombre
+        base = BaseNormalizada.desde_encuesta(metadata, df_resultado)
+        
+        print(f"✅ Registros normalizados: {len(base):,}")
         
-        return df_resultado
+        return base
         
     except Exception as e:
         print(f"❌ ERROR: {str(e)}")
@@ -220,9 +124,28 @@ def procesar_archivo(ruta_archivo):
         traceback.print_exc()
         return None
 
-def procesar_todos():
+def _procesar_archivo_capturado(ruta_archivo):
+    """
+    Procesa un archivo en un proceso aparte capturando su salida de consola,
+    para imprimirla completa y en orden desde el proceso principal
+    """
+    salida = io.StringIO()
+    with contextlib.redirect_stdout(salida), contextlib.redirect_stderr(salida):
+        try:
+            base = procesar_archivo(ruta_archivo)
+        except Exception:
+            print(f"❌ ERROR en {Path(ruta_archivo).name}:")
+            traceback.print_exc()
+            base = None
+    return base, salida.getvalue()
+
+def procesar_todos(paralelo=PARALELO, max_workers=MAX_WORKERS):
     """
     Procesa todos los archivos
+    
+    Args:
+        paralelo: Si es True cada archivo se procesa en un proceso aparte
+        max_workers: Número de procesos (None = número de CPUs)
     """
     print("\n" + "="*70)
     print("🚀 NORMALIZADOR DE ENCUESTAS DE PRECIOS")
@@ -241,13 +164,23 @@ def procesar_todos():
         return None
     
     # Procesar cada archivo
-    todos_df = []
-    for archivo in archivos:
-        df = procesar_archivo(archivo)
-        if df is not None and not df.empty:
-            todos_df.append(df)
+    bases = []
+    if paralelo and len(archivos) > 1:
+        print(f"\n⚡ Modo paralelo: {len(archivos)} archivos")
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            # map entrega los resultados en el orden de los archivos conforme terminan,
+            # así la consola queda igual que en modo secuencial
+            for base, salida in executor.map(_procesar_archivo_capturado, archivos):
+                print(salida, end='')
+                if base is not None and len(base) > 0:
+                    bases.append(base)
+    else:
+        for archivo in archivos:
+            base = procesar_archivo(archivo)
+            if base is not None and len(base) > 0:
+                bases.append(base)
     
-    if not todos_df:
+    if not bases:
         print("\n❌ No se pudo procesar ningún archivo")
         return None
     
@@ -256,47 +189,63 @@ def procesar_todos():
     print("🔗 COMBINANDO TODOS LOS ARCHIVOS")
     print("="*70)
     
-    # Unificar columnas
-    todas_columnas = set()
-    for df in todos_df:
-        todas_columnas.update(df.columns)
-    
-    # Asegurar que todos tengan las mismas columnas
-    for i, df in enumerate(todos_df):
-        for col in todas_columnas:
-            if col not in df.columns:
-                df[col] = None
-        todos_df[i] = df
-    
-    resultado = pd.concat(todos_df, ignore_index=True)
+    # Las columnas de metadata que falten en algún archivo quedan vacías
+    resultado = BaseNormalizada.combinar(bases)
     
     print(f"\n📊 RESULTADO FINAL:")
     print(f"   • Total de registros: {len(resultado):,}")
-    print(f"   • Productos únicos: {resultado['producto'].nunique():,}")
-    print(f"   • Archivos procesados: {resultado['archivo_fuente'].nunique()}")
+    print(f"   • Instancias: {len(resultado.instancias):,}")
+    print(f"   • Productos únicos: {resultado.productos['producto'].nunique():,}")
+    print(f"   • Archivos procesados: {resultado.instancias['archivo_fuente'].nunique()}")
+    print(f"   • Memoria: {resultado.memoria_mb():,.1f} MB")
     
     return resultado
 
-def guardar_excel(df):
+def _limpiar_bloque(bloque):
     """
-    Guarda el archivo Excel ordenado y LIMPIO
+    Limpia datos problemáticos de un bloque de la tabla ancha, conservando los tipos
+    de las medidas (el sidecar se escribe con este bloque)
     """
-    print("\n🔧 Limpiando datos antes de guardar...")
-    
-    # Limpiar datos problemáticos
-    df_limpio = df.copy()
+    # Convertir fechas a string para evitar problemas (cualquier resolución: ns, us...);
+    # las fechas faltantes quedan vacías y no como 'NaT'
+    for col in bloque.columns:
+        if pd.api.types.is_datetime64_any_dtype(bloque[col]):
+            bloque[col] = bloque[col].astype(str).where(bloque[col].notna())
+    
+    # Reemplazar valores problemáticos (NaN y no None, para que las medidas sigan siendo float)
+    return bloque.replace([float('inf'), float('-inf')], float('nan'))
+
+def _rellenar_vacios(bloque):
+    """Vacíos como '' (solo para lo que va al Excel)"""
+    return bloque.fillna('')
+
+def _bloques_exportacion(base, columnas, estadisticas):
+    """
+    Arma la tabla ancha bloque por bloque, la limpia y acumula las estadísticas,
+    para escribirla en streaming sin copiar la base completa
     
-    # Convertir fechas a string para evitar problemas
-    for col in df_limpio.columns:
-        if df_limpio[col].dtype == 'datetime64[ns]':
-            df_limpio[col] = df_limpio[col].astype(str)
+    Args:
+        base: BaseNormalizada de procesar_todos
+        columnas: {nombre limpio: columna de la base} en el orden de salida
+        estadisticas: EstadisticasExportacion que se actualiza con cada bloque
+    """
+    for bloque in base.bloques(FILAS_POR_BLOQUE, list(columnas.values())):
+        bloque = _limpiar_bloque(bloque)
+        bloque.columns = list(columnas)
+        estadisticas.actualizar(bloque)
+        yield bloque
+
+def guardar_excel(base):
+    """
+    Guarda el archivo Excel ordenado y LIMPIO, en streaming por bloques
     
-    # Reemplazar valores problemáticos
-    df_limpio = df_limpio.replace([float('inf'), float('-inf')], None)
-    df_limpio = df_limpio.fillna('')
+    Args:
+        base: BaseNormalizada de procesar_todos (la tabla ancha se arma bloque por bloque)
+    """
+    print("\n🔧 Limpiando datos antes de guardar...")
     
-    # Limpiar nombres de columnas
-    df_limpio.columns = [str(col).strip() for col in df_limpio.columns]
+    # Nombres de columnas limpios -> columna de la base
+    nombres = {str(col).strip(): col for col in base.columnas}
     
     # IMPORTANTE: Definir orden óptimo de columnas
     columnas_orden = [
@@ -326,16 +275,13 @@ def guardar_excel(df):
     ]
     
     # Agregar todas las columnas de fotos al final
-    columnas_fotos = sorted([col for col in df_limpio.columns if 'foto' in col.lower() and 'categoría' in col.lower()])
+    columnas_fotos = sorted([col for col in nombres if 'foto' in col.lower() and 'categoría' in col.lower()])
     
     # Combinar: orden definido + fotos al final
     columnas_finales = columnas_orden + columnas_fotos
     
     # Filtrar solo las columnas que existen y queremos
-    columnas_existentes = [col for col in columnas_finales if col in df_limpio.columns]
-    
-    # Crear DataFrame final SOLO con las columnas necesarias
-    df_final = df_limpio[columnas_existentes].copy()
+    columnas_existentes = {col: nombres[col] for col in columnas_finales if col in nombres}
     
     print(f"🗑️  Columnas no relacionadas eliminadas")
     print(f"✅ Columnas conservadas: {len(columnas_existentes)}")
@@ -345,26 +291,43 @@ def guardar_excel(df):
     print("💾 Guardando archivo...")
     ruta_salida = Path(CARPETA) / ARCHIVO_SALIDA
     
+    # Las estadísticas se cuentan mientras se escribe, sin volver a recorrer la base
+    estadisticas = EstadisticasExportacion()
     try:
-        df_final.to_excel(ruta_salida, index=False, engine='openpyxl')
+        # Escritura en streaming (constant memory) + sidecar para Power BI
+        with EscritorExcelStreaming(ruta_salida, sidecar=SIDECAR) as escritor:
+            escritor.escribir_hoja(
+                'Sheet1',
+                _bloques_exportacion(base, columnas_existentes, estadisticas),
+                columnas=list(columnas_existentes),
+                para_excel=_rellenar_vacios
+            )
+        print("✅ Guardado exitoso!")
+    except ErrorSidecar as e:
+        # El Excel quedó completo; solo falta la copia para Power BI
         print("✅ Guardado exitoso!")
+        print(f"⚠️  {e} (se borró el archivo a medias)")
     except Exception as e:
         print(f"❌ Error al guardar: {e}")
-        # Intentar guardar como CSV alternativo
+        # Intentar guardar como CSV alternativo, también por bloques
         ruta_csv = Path(CARPETA) / ARCHIVO_SALIDA.replace('.xlsx', '.csv')
-        df_final.to_csv(ruta_csv, index=False, encoding='utf-8-sig')
+        estadisticas = EstadisticasExportacion()
+        for i, bloque in enumerate(_bloques_exportacion(base, columnas_existentes, estadisticas)):
+            bloque.to_csv(ruta_csv, mode='w' if i == 0 else 'a', header=(i == 0), index=False,
+                          encoding='utf-8-sig' if i == 0 else 'utf-8')
         print(f"✅ Guardado como CSV alternativo: {ruta_csv.name}")
         return
     
     print(f"\n✅ ARCHIVO GUARDADO: {ruta_salida.name}")
     print(f"   Ubicación: {ruta_salida}")
-    print(f"   Dimensiones: {df_final.shape[0]:,} filas × {df_final.shape[1]} columnas")
+    print(f"   Dimensiones: {estadisticas.filas:,} filas × {len(columnas_existentes)} columnas")
     
     # Muestra de datos (sin fotos para no saturar)
     print(f"\n📋 MUESTRA DE DATOS (primeras 10 filas, sin URLs):")
     columnas_muestra = ['archivo_fuente', 'producto', 'inventario', 'precio_regular', 'precio_promocion', 'Estado']
-    columnas_muestra = [c for c in columnas_muestra if c in df_final.columns]
-    muestra = df_final[columnas_muestra].head(10).copy()
+    columnas_muestra = {c: columnas_existentes[c] for c in columnas_muestra if c in columnas_existentes}
+    muestra = next(_bloques_exportacion(base, columnas_muestra, EstadisticasExportacion()), None)
+    muestra = _rellenar_vacios(muestra.head(10)) if muestra is not None else pd.DataFrame(columns=list(columnas_muestra))
     
     # Acortar nombres largos para mejor visualización
     if 'producto' in muestra.columns:
@@ -375,45 +338,15 @@ def guardar_excel(df):
     print(muestra.to_string(index=False))
     
     # Estadísticas
-    print(f"\n📈 ESTADÍSTICAS:")
-    
-    # Contar valores reales (no None, no vacíos, no ceros)
-    if 'inventario' in df_final.columns:
-        con_inv = df_final['inventario'].notna() & (df_final['inventario'] != '') & (df_final['inventario'] != 0)
-        total_inv = con_inv.sum()
-    else:
-        total_inv = 0
-    
-    if 'precio_regular' in df_final.columns:
-        con_reg = df_final['precio_regular'].notna() & (df_final['precio_regular'] != '') & (df_final['precio_regular'] != 0)
-        total_reg = con_reg.sum()
-    else:
-        total_reg = 0
-    
-    if 'precio_promocion' in df_final.columns:
-        con_promo = df_final['precio_promocion'].notna() & (df_final['precio_promocion'] != '') & (df_final['precio_promocion'] != 0)
-        total_promo = con_promo.sum()
-    else:
-        total_promo = 0
-    
-    print(f"   • Registros con inventario: {total_inv:,}")
-    print(f"   • Registros con precio regular: {total_reg:,}")
-    print(f"   • Registros con precio promoción: {total_promo:,}")
-    
-    # Mostrar promedios si hay datos numéricos
-    if 'precio_regular' in df_final.columns:
-        precios_numericos = pd.to_numeric(df_final['precio_regular'], errors='coerce')
-        if precios_numericos.notna().any():
-            promedio = precios_numericos.mean()
-            print(f"   • Precio regular promedio: ${promedio:.2f}")
+    estadisticas.reportar()
 
 # ===================== EJECUTAR =====================
 
 if __name__ == "__main__":
-    df_final = procesar_todos()
+    base = procesar_todos()
     
-    if df_final is not None:
-        guardar_excel(df_final)
+    if base is not None:
+        guardar_excel(base)
         print("\n" + "="*70)
         print("✨ PROCESO COMPLETADO EXITOSAMENTE")
         print("="*70)
@@ -0,0 +1,128 @@
+"""
+Perfil de columnas en una sola pasada
+Calcula para todas las columnas de un DataFrame los valores no nulos (una sola
+llamada a notna().sum()), los valores distintos y los más frecuentes (un solo
+conteo por columna, del que salen ambos) y lo deja en un objeto que se puede
+consultar para el reporte de consola o escribir como hoja
+"""
+
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _contar_valores(serie: pd.Series, top: Optional[int]) -> Tuple[int, pd.Series]:
+    """
+    Valores distintos y conteos de mayor a menor sin ordenar todos los valores
+    distintos por conteo, como haría value_counts
+
+    Las columnas numéricas y de fechas se cuentan con np.unique (ordenar es más rápido
+    que el hash para floats; los empates quedan por valor) y el resto con
+    pd.factorize (los empates quedan en orden de aparición)
+
+    Args:
+        serie: Columna a contar (los nulos no cuentan)
+        top: Cuántos valores devolver. Si es None todos
+
+    Returns:
+        (número de valores distintos, Serie valor -> conteo)
+    """
+    if isinstance(serie.dtype, np.dtype) and serie.dtype.kind in 'iufbmM':
+        valores = serie.to_numpy()
+        if valores.dtype.kind == 'f':
+            valores = valores[~np.isnan(valores)]
+        elif valores.dtype.kind in 'mM':
+            valores = valores[~np.isnat(valores)]
+        unicos, conteos = np.unique(valores, return_counts=True)
+    else:
+        codigos, unicos = pd.factorize(serie)
+        conteos = np.bincount(codigos[codigos >= 0], minlength=len(unicos))
+
+    if top is not None and top < len(conteos):
+        # Solo se ordenan los candidatos al top: los que superan al k-ésimo conteo
+        # y los primeros empates con él que hagan falta
+        umbral = np.partition(conteos, len(conteos) - top)[len(conteos) - top]
+        mayores = np.flatnonzero(conteos > umbral)
+        empates = np.flatnonzero(conteos == umbral)[:top - len(mayores)]
+        candidatos = np.concatenate([mayores, empates])
+    else:
+        candidatos = np.arange(len(conteos))
+
+    orden = candidatos[np.argsort(-conteos[candidatos], kind='stable')]
+    resultado = pd.Series(conteos[orden], index=pd.Index(unicos.take(orden), name=serie.name), name='count')
+    return len(unicos), resultado
+
+
+class PerfilColumnas:
+    """Completitud, valores distintos y top-k de todas las columnas de un DataFrame"""
+
+    def __init__(self, df: pd.DataFrame, top_k: int = 5, distribucion_completa: Iterable[str] = (),
+                 contar: Optional[Iterable[str]] = None):
+        """
+        Perfila el DataFrame
+
+        Args:
+            df: DataFrame a perfilar
+            top_k: Valores más frecuentes que se guardan por columna
+            distribucion_completa: Columnas de las que se guardan TODOS los conteos
+                                   (ej. archivo_origen o Proyecto para el reporte)
+            contar: Columnas de las que se cuentan valores distintos y top-k. Si es None
+                    todas; las demás solo tienen completitud (contar columnas casi únicas,
+                    como URLs de fotos, es lo más caro del perfil)
+        """
+        self.filas = len(df)
+        self.top_k = top_k
+        self.tipos = df.dtypes
+
+        # Completitud de todas las columnas en una sola pasada
+        self.no_nulos: pd.Series = df.notna().sum()
+
+        # Un solo conteo por columna da los distintos y el top-k a la vez
+        completas = set(distribucion_completa)
+        self.distintos: Dict[str, int] = {}
+        self.conteos: Dict[str, pd.Series] = {}
+        for col in (df.columns if contar is None else [c for c in df.columns if c in set(contar)]):
+            self.distintos[col], self.conteos[col] = _contar_valores(
+                df[col], None if col in completas else top_k
+            )
+
+    @property
+    def columnas(self):
+        return list(self.no_nulos.index)
+
+    def completitud(self, columna: str) -> float:
+        """Porcentaje de valores no nulos de una columna"""
+        return (self.no_nulos[columna] / self.filas * 100) if self.filas > 0 else 0
+
+    def distribucion(self, columna: str, top: Optional[int] = None) -> pd.Series:
+        """
+        Conteos por valor de una columna, de mayor a menor
+
+        Args:
+            columna: Columna del perfil
+            top: Máximo de valores a devolver. Si es None todos los guardados
+        """
+        conteos = self.conteos[columna]
+        return conteos if top is None else conteos.head(top)
+
+    def a_dataframe(self) -> pd.DataFrame:
+        """
+        Perfil como tabla (una fila por columna) para escribirlo como hoja
+
+        Returns:
+            DataFrame con Columna, Tipo, No nulos, % Completo, Valores distintos y Valores más frecuentes
+        """
+        filas = []
+        for col in self.columnas:
+            # Las columnas que no se contaron quedan sin distintos ni top
+            top = self.conteos[col].head(self.top_k) if col in self.conteos else pd.Series(dtype='int64')
+            filas.append({
+                'Columna': str(col),
+                'Tipo': str(self.tipos[col]),
+                'No nulos': int(self.no_nulos[col]),
+                '% Completo': round(self.completitud(col), 1),
+                'Valores distintos': self.distintos.get(col),
+                'Valores más frecuentes': '; '.join(f"{valor} ({conteo:,})" for valor, conteo in top.items())
+            })
+        return pd.DataFrame(filas)
@@ -0,0 +1,215 @@
+"""
+Carga compartida del RUTERO
+Lee la hoja RUTERO una sola vez, despivotea las 35 columnas S1-LUNES … S5-DOMINGO
+una sola vez y deja el programa de visitas indexado por (promotor, tienda, semana, día)
+para responder consultas como "visitas de JUE-S3 por promotor" sin volver a despivotear
+"""
+
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from lector_excel import leer_excel
+
+HOJA_RUTERO = 'RUTERO'
+FILAS_TITULO = 4
+
+# (nombre de la columna en el rutero, abreviatura usada en los códigos DIA-SEMANA)
+DIAS = [
+    ("LUNES", "LUN"), ("MARTES", "MAR"), ("MIERCOLES", "MIER"), ("JUEVES", "JUE"),
+    ("VIERNES", "VIE"), ("SABADO", "SAB"), ("DOMINGO", "DOM")
+]
+SEMANAS = range(1, 6)
+
+# Columnas del programa en el orden del archivo: S1-LUNES … S1-DOMINGO, S2-LUNES, …
+COLUMNAS_PROGRAMA = [f"S{semana}-{dia}" for semana in SEMANAS for dia, _ in DIAS]
+
+# Código DIA-SEMANA de cada columna del programa ("S3-JUEVES" -> "JUE-S3")
+CODIGOS_PROGRAMA = {
+    f"S{semana}-{dia}": f"{abreviatura}-S{semana}"
+    for semana in SEMANAS for dia, abreviatura in DIAS
+}
+
+
+def buscar_rutero(ruta: str) -> Optional[str]:
+    """
+    Busca el primer archivo con 'Rutero' en el nombre
+
+    Args:
+        ruta: Carpeta donde buscar
+
+    Returns:
+        Ruta completa del archivo o None
+    """
+    archivos = [f for f in os.listdir(ruta) if 'Rutero' in f]
+    if not archivos:
+        print("No se encontró ningún archivo con 'Rutero' en el nombre.")
+        return None
+
+    print("Archivo cargado:", archivos[0])
+    return os.path.join(ruta, archivos[0])
+
+
+def cargar_rutero(ruta_archivo: str, columnas: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Lee la hoja RUTERO (saltando las filas de título) con encabezados limpios
+
+    Args:
+        ruta_archivo: Ruta del archivo de rutero
+        columnas: Columnas necesarias. Si es None se leen todas
+
+    Returns:
+        DataFrame del rutero
+    """
+    df = leer_excel(ruta_archivo, sheet_name=HOJA_RUTERO, skiprows=FILAS_TITULO, columnas=columnas)
+    df.columns = df.columns.str.strip()
+    return df
+
+
+class RuteroIndexado:
+    """Rutero con el programa de visitas despivoteado una vez e indexado para consultas directas"""
+
+    def __init__(self, df: pd.DataFrame, columna_promotor: str = "Usuario APP Promotor"):
+        """
+        Despivotea el programa y construye los índices
+
+        Args:
+            df: DataFrame del rutero (una fila por tienda)
+            columna_promotor: Columna que identifica al promotor en las consultas
+        """
+        self.df = df.reset_index(drop=True)
+        self.columna_promotor = columna_promotor
+
+        filas = len(self.df)
+        num_columnas = len(COLUMNAS_PROGRAMA)
+
+        # Despivoteo en el mismo orden que pd.melt: columna por columna, fila por fila
+        valores = self.df[COLUMNAS_PROGRAMA].apply(pd.to_numeric, errors='coerce')
+        visitas = valores.to_numpy().T.ravel()
+        posicion_columna = np.repeat(np.arange(num_columnas, dtype=np.int8), filas)
+
+        semanas = np.array([semana for semana in SEMANAS for _ in DIAS], dtype=np.int8)
+        dias = pd.Categorical([dia for _ in SEMANAS for dia, _ in DIAS], categories=[d for d, _ in DIAS])
+        codigos = [CODIGOS_PROGRAMA[col] for col in COLUMNAS_PROGRAMA]
+
+        promotores = pd.Categorical(self.df[columna_promotor])
+
+        # Programa compacto: una fila por (tienda del rutero, columna del programa)
+        self.programa = pd.DataFrame({
+            'fila': np.tile(np.arange(filas, dtype=np.int32), num_columnas),
+            'promotor': pd.Categorical.from_codes(
+                np.tile(promotores.codes, num_columnas), promotores.categories
+            ),
+            'semana': semanas[posicion_columna],
+            'dia': pd.Categorical.from_codes(dias.codes[posicion_columna], dias.categories),
+            'codigo': pd.Categorical.from_codes(posicion_columna, codigos),
+            'visitas': visitas
+        })
+
+        # Visitas programadas por promotor para cada código DIA-SEMANA, en un solo groupby
+        # sobre la tabla ancha (cada columna conserva su tipo, igual que con pivot_table)
+        suma = valores.groupby(self.df[columna_promotor], sort=True).sum()
+        self._visitas_por_codigo: Dict[str, pd.Series] = {
+            CODIGOS_PROGRAMA[col]: suma[col] for col in COLUMNAS_PROGRAMA
+        }
+
+        # Posiciones en self.programa de las visitas reales (> 0)
+        con_visita = self.programa[self.programa['visitas'] > 0]
+        posiciones = con_visita.index.to_numpy()
+
+        def indexar(claves):
+            grupos = con_visita.groupby(claves, observed=True).indices
+            return {clave: posiciones[idx] for clave, idx in grupos.items()}
+
+        self._por_semana = indexar('semana')
+        self._por_promotor_semana = indexar(['promotor', 'semana'])
+        self._por_promotor_semana_dia = indexar(['promotor', 'semana', 'dia'])
+
+        # Ya no se necesitan valores de 64 bits en el programa
+        self.programa['visitas'] = pd.to_numeric(self.programa['visitas'], downcast='float')
+
+    @classmethod
+    def desde_archivo(cls, ruta_archivo: str, columnas: Optional[List[str]] = None,
+                      columna_promotor: str = "Usuario APP Promotor") -> "RuteroIndexado":
+        """
+        Lee el rutero una vez y lo indexa
+
+        Args:
+            ruta_archivo: Ruta del archivo de rutero
+            columnas: Columnas adicionales al programa que se quieren conservar.
+                      Si es None se leen todas
+            columna_promotor: Columna que identifica al promotor
+        """
+        if columnas is not None:
+            columnas = list(dict.fromkeys([columna_promotor] + list(columnas) + COLUMNAS_PROGRAMA))
+        return cls(cargar_rutero(ruta_archivo, columnas), columna_promotor)
+
+    def visitas_programadas(self, codigo: str) -> pd.DataFrame:
+        """
+        Visitas programadas por promotor para un código DIA-SEMANA (ej. 'JUE-S3')
+
+        Returns:
+            DataFrame con la columna del promotor y 'Visitas Programadas', ordenado por promotor
+        """
+        serie = self._visitas_por_codigo.get(codigo)
+        if serie is None:
+            return pd.DataFrame(columns=[self.columna_promotor, "Visitas Programadas"])
+
+        df = serie.reset_index()
+        df.columns = [self.columna_promotor, "Visitas Programadas"]
+        return df
+
+    def tiendas(self, promotor, semana: int, dia: Optional[str] = None) -> pd.DataFrame:
+        """
+        Tiendas que visita un promotor en una semana (y opcionalmente un día, ej. 'JUEVES')
+
+        Returns:
+            Filas del rutero correspondientes, sin repetir tiendas
+        """
+        if dia is None:
+            posiciones = self._por_promotor_semana.get((promotor, semana))
+        else:
+            posiciones = self._por_promotor_semana_dia.get((promotor, semana, dia))
+
+        if posiciones is None:
+            return self.df.iloc[0:0]
+
+        filas = pd.unique(self.programa['fila'].to_numpy()[posiciones])
+        return self.df.iloc[filas]
+
+    def programa_semana(self, semana: int, columnas: List[str]) -> pd.DataFrame:
+        """
+        Visitas (> 0) de una semana en formato largo, en el mismo orden que un pd.melt
+        de las columnas S{semana}-LUNES … S{semana}-DOMINGO
+
+        Args:
+            semana: Número de semana (1-5)
+            columnas: Columnas del rutero que se agregan a cada visita
+
+        Returns:
+            DataFrame con las columnas pedidas más 'DIA' y 'VISITAS'
+        """
+        posiciones = self._por_semana.get(semana, np.array([], dtype=np.int64))
+        programa = self.programa.iloc[posiciones]
+
+        df = self.df[columnas].iloc[programa['fila'].to_numpy()].reset_index(drop=True)
+        df["DIA"] = programa['dia'].astype(str).to_numpy()
+        df["VISITAS"] = programa['visitas'].to_numpy()
+        return df
+
+    def programa_largo(self, columnas: List[str]) -> pd.DataFrame:
+        """
+        Programa completo en formato largo (equivalente a pd.melt sobre las 35 columnas)
+
+        Args:
+            columnas: Columnas del rutero que se agregan a cada fila
+
+        Returns:
+            DataFrame con las columnas pedidas más 'DIA-SEMANA' y 'Visitas Programadas'
+        """
+        df = self.df[columnas].iloc[self.programa['fila'].to_numpy()].reset_index(drop=True)
+        df["DIA-SEMANA"] = self.programa['codigo'].to_numpy()
+        df["Visitas Programadas"] = self.programa['visitas'].to_numpy()
+        return df
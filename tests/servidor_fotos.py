@@ -0,0 +1,134 @@
+"""
+Servidor HTTP local con fotos de muestra para las pruebas y benchmarks de
+"Validación de Fotos.py"
+"""
+
+import importlib.util
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+RUTA_VALIDACION = Path(__file__).resolve().parent.parent / "Validación de Fotos.py"
+
+
+def cargar_validacion_fotos():
+    """
+    Importa "Validación de Fotos.py" (el nombre no es un identificador de Python)
+
+    Se registra como 'validacion_fotos' en sys.modules para que sus funciones puedan
+    enviarse a los procesos de detección
+    """
+    if 'validacion_fotos' not in sys.modules:
+        spec = importlib.util.spec_from_file_location('validacion_fotos', RUTA_VALIDACION)
+        modulo = importlib.util.module_from_spec(spec)
+        sys.modules['validacion_fotos'] = modulo
+        spec.loader.exec_module(modulo)
+    return sys.modules['validacion_fotos']
+
+
+def imagenes_de_muestra(cantidad=8, ancho=640, alto=480):
+    """JPEGs sintéticos (degradado + figuras + ruido) para el servidor de prueba"""
+    rng = np.random.default_rng(0)
+    imagenes = []
+    for i in range(cantidad):
+        imagen = np.zeros((alto, ancho, 3), dtype=np.uint8)
+        imagen[:] = np.linspace(40, 220, ancho, dtype=np.uint8)[None, :, None]
+        centro = (int(rng.integers(ancho // 4, 3 * ancho // 4)), int(rng.integers(alto // 4, 3 * alto // 4)))
+        cv2.circle(imagen, centro, int(rng.integers(40, 120)), (int(rng.integers(0, 255)),) * 3, -1)
+        imagen = cv2.add(imagen, rng.integers(0, 30, imagen.shape, dtype=np.uint8))
+        _, jpg = cv2.imencode('.jpg', imagen)
+        imagenes.append(jpg.tobytes())
+    return imagenes
+
+
+class ServidorFotosPrueba:
+    """
+    Servidor HTTP local que simula el servidor de fotos: sirve imágenes de muestra
+    en /foto/<n>.jpg con latencia por petición, costo por conexión nueva (como el
+    handshake TCP/TLS) y, opcionalmente, un 503 cada cierto número de peticiones
+    """
+
+    def __init__(self, imagenes, latencia=0.03, latencia_conexion=0.05, error_cada=0):
+        """
+        Args:
+            imagenes: Lista de imágenes (bytes) a servir
+            latencia: Segundos de espera por petición
+            latencia_conexion: Segundos de espera al abrir cada conexión
+            error_cada: Responder 503 cada N peticiones (0 = nunca)
+        """
+        self.imagenes = imagenes
+        self.peticiones = 0
+        self.conexiones = 0
+        self.errores = 0
+        self.simultaneas = 0
+        self.max_simultaneas = 0
+        candado = threading.Lock()
+        servidor = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # Mantiene la conexión abierta entre peticiones
+
+            def setup(self):
+                super().setup()
+                with candado:
+                    servidor.conexiones += 1
+                time.sleep(latencia_conexion)
+
+            def do_GET(self):
+                with candado:
+                    servidor.peticiones += 1
+                    numero_peticion = servidor.peticiones
+                    servidor.simultaneas += 1
+                    servidor.max_simultaneas = max(servidor.max_simultaneas, servidor.simultaneas)
+                try:
+                    time.sleep(latencia)
+                    self._responder(numero_peticion)
+                finally:
+                    with candado:
+                        servidor.simultaneas -= 1
+
+            def _responder(self, numero_peticion):
+                if error_cada and numero_peticion % error_cada == 0:
+                    with candado:
+                        servidor.errores += 1
+                    self.send_response(503)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                try:
+                    numero = int(self.path.rsplit('/', 1)[-1].split('.')[0])
+                except ValueError:
+                    numero = 0
+                cuerpo = servidor.imagenes[numero % len(servidor.imagenes)]
+                self.send_response(200)
+                self.send_header('Content-Type', 'image/jpeg')
+                self.send_header('Content-Length', str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Manejador)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._hilo = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def urls(self, cantidad):
+        """URLs de prueba /foto/0.jpg ... /foto/<cantidad-1>.jpg"""
+        return [f"{self.url}/foto/{i}.jpg" for i in range(cantidad)]
+
+    def __enter__(self):
+        self._hilo.start()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        return False
@@ -0,0 +1,70 @@
+"""
+La consolidación vectorizada de asistencia da lo mismo que la implementación anterior
+con pivot_table (que se conserva aquí como referencia)
+"""
+
+import numpy as np
+import pandas as pd
+
+from AsistenciaPOO import ConfiguracionAsistencia, ProcesadorEfectividad
+
+
+def consolidar_asistencia_pivot(procesador: ProcesadorEfectividad, df: pd.DataFrame) -> pd.DataFrame:
+    """Implementación anterior (pivot_table con funciones de Python por grupo), usada como referencia"""
+    def horas_maximas(valores):
+        horas_validas = [h for h in valores if h > 0]
+        return max(horas_validas) if horas_validas else 0
+    
+    def horas_minimas(valores):
+        horas_validas = [h for h in valores if h > 0]
+        return min(horas_validas) if horas_validas else 0
+    
+    df_max = pd.pivot_table(df, index="Usuario Promotor", values="Check OUT HORAS", aggfunc=horas_maximas).reset_index()
+    df_min = pd.pivot_table(df, index="Usuario Promotor", values="Check IN HORAS", aggfunc=horas_minimas).reset_index()
+    df_checks = pd.merge(df_max, df_min, on="Usuario Promotor", how="inner")
+    df_checks["DIF"] = df_checks["Check OUT HORAS"] - df_checks["Check IN HORAS"]
+    
+    df_tpdv = pd.pivot_table(df, index="Usuario Promotor", values="PDV HNum", aggfunc="sum").reset_index()
+    df_hrs = pd.merge(df_checks, df_tpdv, on="Usuario Promotor", how="inner")
+    df_hrs = procesador._clasificar_asistencia(df_hrs)
+    
+    df_realizadas = pd.pivot_table(df, index="Usuario Promotor", values="Visitas Realizadas", aggfunc="sum").reset_index()
+    df_consolidado = pd.merge(df_hrs, df_realizadas, on="Usuario Promotor", how="inner")
+    return procesador._clasificar_cumplimiento(df_consolidado)
+
+
+def crear_efectividad_sintetica(filas: int, promotores: int = 2_000) -> pd.DataFrame:
+    """Genera un Efectividad sintético con el formato del archivo real (horas como texto)"""
+    rng = np.random.default_rng(0)
+    inicio = pd.Timestamp("2025-01-15")
+    
+    check_in = inicio + pd.to_timedelta(rng.integers(7 * 3600, 12 * 3600, filas), unit="s")
+    check_out = check_in + pd.to_timedelta(rng.integers(600, 5 * 3600, filas), unit="s")
+    check_in_txt = pd.Series(check_in.strftime("%d-%m-%Y - %H:%M:%S"))
+    check_out_txt = pd.Series(check_out.strftime("%d-%m-%Y - %H:%M:%S"))
+    
+    # Visitas sin check in/out (quedan en 0 y no deben contar para máximo/mínimo)
+    check_in_txt[rng.random(filas) < 0.05] = None
+    check_out_txt[rng.random(filas) < 0.08] = None
+    
+    segundos_pdv = rng.integers(0, 3 * 3600, filas)
+    tiempo_pdv = [f"{s // 3600:02d}:{s % 3600 // 60:02d}:{s % 60:02d}" for s in segundos_pdv]
+    
+    df = pd.DataFrame({col: "" for col in ProcesadorEfectividad.COLUMNAS}, index=range(filas))
+    df["Usuario Promotor"] = [f"app{i:05d}" for i in rng.integers(0, promotores, filas)]
+    df["Check IN"] = check_in_txt
+    df["Check OUT"] = check_out_txt
+    df["Visitas Programadas"] = 1
+    df["Visitas Realizadas"] = rng.integers(0, 2, filas)
+    df["Tiempo en PDV"] = tiempo_pdv
+    return df
+
+
+def test_consolidacion_igual_a_pivot_table():
+    procesador = ProcesadorEfectividad(ConfiguracionAsistencia())
+    df = procesador.procesar_efectividad(crear_efectividad_sintetica(20_000, promotores=500))
+
+    pd.testing.assert_frame_equal(
+        consolidar_asistencia_pivot(procesador, df),
+        procesador.consolidar_asistencia(df)
+    )
@@ -0,0 +1,25 @@
+import pandas as pd
+import pytest
+
+from escritor_excel import XLSXWRITER_DISPONIBLE, EscritorExcelStreaming
+
+
+@pytest.mark.skipif(not XLSXWRITER_DISPONIBLE, reason="xlsxwriter no está instalado")
+def test_hoja_con_mas_urls_que_el_limite_de_hipervinculos(tmp_path):
+    """Más de 65,530 URLs en una hoja se escriben completas y como texto"""
+    filas = 70_000
+    df = pd.DataFrame({
+        'instancia': range(filas),
+        'foto': [f"https://fotos.example.com/{i}.jpg" for i in range(filas)],
+        'formula': ['=1+1'] * filas,
+    })
+
+    ruta = tmp_path / 'urls.xlsx'
+    with EscritorExcelStreaming(ruta, motor='xlsxwriter') as escritor:
+        assert escritor.escribir_hoja('Fotos', df) == filas
+
+    leido = pd.read_excel(ruta)
+    assert len(leido) == filas
+    assert leido['foto'].iloc[-1] == f"https://fotos.example.com/{filas - 1}.jpg"
+    assert leido['instancia'].tolist() == list(range(filas))
+    assert (leido['formula'] == '=1+1').all()
@@ -0,0 +1,75 @@
+"""
+Descargas y validación de "Validación de Fotos.py" contra un servidor de fotos local
+"""
+
+import pandas as pd
+import pytest
+
+from servidor_fotos import ServidorFotosPrueba, cargar_validacion_fotos, imagenes_de_muestra
+
+vf = cargar_validacion_fotos()
+
+
+@pytest.fixture(scope='module')
+def imagenes():
+    return imagenes_de_muestra()
+
+
+def test_descarga_todas_las_fotos_reutilizando_conexiones(imagenes):
+    """Cada URL se descarga una vez, con su contenido, sobre pocas conexiones"""
+    with ServidorFotosPrueba(imagenes, latencia=0.01, latencia_conexion=0) as servidor:
+        urls = servidor.urls(60)
+        descargador = vf.DescargadorFotos(max_descargas=8, max_por_host=4)
+        resultados = dict(descargador.descargar_muchas((url, url) for url in urls))
+        descargador.cerrar()
+
+        assert set(resultados) == set(urls)
+        assert all(resultados[url] == imagenes[i % len(imagenes)] for i, url in enumerate(urls))
+        assert descargador.descargadas == len(urls)
+        assert descargador.fallidas == 0
+        assert servidor.peticiones == len(urls)
+        assert servidor.conexiones <= 8
+
+
+def test_reintenta_los_503(imagenes):
+    """Los 503 se reintentan hasta conseguir la foto"""
+    with ServidorFotosPrueba(imagenes, latencia=0, latencia_conexion=0, error_cada=4) as servidor:
+        urls = servidor.urls(30)
+        descargador = vf.DescargadorFotos(max_descargas=4, max_por_host=4, espera_reintento=0)
+        resultados = dict(descargador.descargar_muchas((url, url) for url in urls))
+        descargador.cerrar()
+
+        assert servidor.errores > 0
+        assert all(resultados[url] is not None for url in urls)
+        assert descargador.fallidas == 0
+        assert servidor.peticiones == len(urls) + servidor.errores
+
+
+def test_respeta_el_limite_por_servidor(imagenes):
+    """Nunca hay más descargas simultáneas a un servidor que max_por_host"""
+    with ServidorFotosPrueba(imagenes, latencia=0.05, latencia_conexion=0) as servidor:
+        descargador = vf.DescargadorFotos(max_descargas=12, max_por_host=3)
+        resultados = dict(descargador.descargar_muchas((url, url) for url in servidor.urls(30)))
+        descargador.cerrar()
+
+        assert len(resultados) == 30
+        assert servidor.max_simultaneas == 3
+
+
+def test_fotos_repetidas_se_detectan_una_vez(imagenes, tmp_path):
+    """La misma foto con otra URL, o en otra fila, no se vuelve a detectar en la corrida"""
+    with ServidorFotosPrueba(imagenes, latencia=0, latencia_conexion=0) as servidor:
+        urls = servidor.urls(3 * len(imagenes))
+        ruta = tmp_path / 'fotos.xlsx'
+        pd.DataFrame({'Foto Selfie (Obligatoria)': urls + urls[:2]}).to_excel(ruta, index=False)
+
+        validador = vf.ValidadorFotosSelfie()
+        detectar = validador.detector.detectar
+        detectadas = []
+        validador.detector.detectar = lambda imagen: detectadas.append(1) or detectar(imagen)
+
+        df = validador.procesar_excel(str(ruta), procesos=1, reanudar=False)
+
+    assert len(detectadas) == len(imagenes)
+    assert len(df) == len(urls) + 2
+    assert not df['Estado_Validacion'].isin(['Pendiente', 'Error de descarga']).any()